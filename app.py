@@ -1,21 +1,10 @@
 import streamlit as st
-from datetime import datetime
-from geopy.distance import geodesic
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-import random
-import logging
-import os
+import importlib
+from log_setup import configure_logging
+from profiling import start_profile
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('volunteer_system.log') if not os.getenv('STREAMLIT_SHARING') else logging.StreamHandler()
-    ]
-)
+configure_logging()
 
 # Page Configuration
 st.set_page_config(
@@ -25,8 +14,8 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# CSS Styling
-st.markdown("""
+# CSS Styling (injected after the health check, which renders no page chrome)
+PAGE_CSS = """
 <style>
 @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
 
@@ -255,415 +244,82 @@ st.markdown("""
     text-shadow: 2px 2px 4px rgba(114, 28, 36, 0.3);
 }
 </style>
-""", unsafe_allow_html=True)
-
-# Config
-CHURCH_LOCATION = (39.8637, -74.8284)
-MAX_DISTANCE_METERS = 50000  # 50km for testing - allows testing from anywhere nearby
-SHEET_NAME = "Volunteer Hours"
-PUNCH_SHEET = "Sheet1"
-REGISTRATION_SHEET = "Registration"
-
-volunteer_verses = [
-    "Each of you should use whatever gift you have received to serve others, as faithful stewards of God's grace. — 1 Peter 4:10",
-    "Whatever you do, work at it with all your heart, as working for the Lord, not for human masters. — Colossians 3:23",
-    "Serve wholeheartedly, as if you were serving the Lord, not people. — Ephesians 6:7",
-    "The greatest among you will be your servant. — Matthew 23:11",
-    "Carry each other's burdens, and in this way you will fulfill the law of Christ. — Galatians 6:2"
-]
-
-# Location Detection Functions
-@st.cache_data(ttl=300)
-def get_ip_location():
-    try:
-        import requests
-        
-        services = [
-            "https://ipapi.co/json/",
-            "http://ip-api.com/json/",
-            "https://ipinfo.io/json"
-        ]
-        
-        for service in services:
-            try:
-                response = requests.get(service, timeout=5)
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    if 'latitude' in data and 'longitude' in data:
-                        return {
-                            'latitude': data['latitude'],
-                            'longitude': data['longitude'],
-                            'city': data.get('city', 'Unknown'),
-                            'region': data.get('region_code', data.get('region', 'Unknown')),
-                            'country': data.get('country_name', data.get('country', 'Unknown')),
-                            'postal': data.get('postal', ''),
-                            'timezone': data.get('timezone', ''),
-                            'isp': data.get('org', data.get('isp', ''))
-                        }
-                    elif 'lat' in data and 'lon' in data:
-                        return {
-                            'latitude': data['lat'],
-                            'longitude': data['lon'],
-                            'city': data.get('city', 'Unknown'),
-                            'region': data.get('regionName', data.get('region', 'Unknown')),
-                            'country': data.get('country', 'Unknown'),
-                            'postal': data.get('zip', ''),
-                            'timezone': data.get('timezone', ''),
-                            'isp': data.get('isp', '')
-                        }
-                    elif 'loc' in data:
-                        lat, lon = data['loc'].split(',')
-                        return {
-                            'latitude': float(lat),
-                            'longitude': float(lon),
-                            'city': data.get('city', 'Unknown'),
-                            'region': data.get('region', 'Unknown'),
-                            'country': data.get('country', 'Unknown'),
-                            'postal': data.get('postal', ''),
-                            'timezone': data.get('timezone', ''),
-                            'isp': data.get('org', '')
-                        }
-            except Exception:
-                continue
-        
-        return {'error': 'Unable to determine location - all IP location services failed'}
-        
-    except Exception as e:
-        return {'error': str(e)}
-
-# Google Sheets Connection
-try:
-    scope = ["https://www.googleapis.com/auth/spreadsheets","https://www.googleapis.com/auth/drive"]
-    if hasattr(st, 'secrets') and "gcp_service_account" in st.secrets:
-        import json
-        account_info = json.loads(st.secrets["gcp_service_account"])
-        auth_creds = ServiceAccountCredentials.from_json_keyfile_dict(account_info, scope)
-    else:
-        auth_creds = ServiceAccountCredentials.from_json_keyfile_name("service_account.json", scope)
-    client = gspread.authorize(auth_creds)
-    punch_sheet = client.open(SHEET_NAME).worksheet(PUNCH_SHEET)
-    reg_sheet = client.open(SHEET_NAME).worksheet(REGISTRATION_SHEET)
-    SHEETS_ENABLED = True
-except Exception as e:
-    # Google Sheets not connected - app will store data locally for display
-    SHEETS_ENABLED = False
-    punch_sheet = None
-    reg_sheet = None
-
-# Health Check
-if st.query_params.get("health") == "check":
-    st.json({
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "version": "1.0.0",
-        "sheets_enabled": SHEETS_ENABLED,
-        "services": {
-            "google_sheets": "connected" if SHEETS_ENABLED else "disconnected",
-            "location_services": "available"
-        }
-    })
+"""
+
+# Page Routing
+# Each view lives in its own module under views/ and is imported only when its route is requested
+VIEWS = {
+    "health": ("views.health", "render"),
+    "health_deep": ("views.health", "render_deep"),
+    "punch_in": ("views.punch", "punch_in"),
+    "punch_out": ("views.punch", "punch_out"),
+    "registration": ("views.registration", "render"),
+}
+
+
+def current_route():
+    """Route name for the current query parameters"""
+    health = st.query_params.get("health")
+    if health == "check":
+        return "health"
+    if health == "deep":
+        return "health_deep"
+    action = st.query_params.get("action")
+    return action if action in ("punch_in", "punch_out") else "registration"
+
+
+@st.cache_resource
+def load_logo():
+    """Logo bytes, read from disk once per server process"""
+    with open("stanthonylogo.png", "rb") as f:
+        return f.read()
+
+
+def render_view(route):
+    module_name, function_name = VIEWS[route]
+    getattr(importlib.import_module(module_name), function_name)()
+
+
+route = current_route()
+
+# Health Check (answered before any other page work)
+if route in ("health", "health_deep"):
+    render_view(route)
     st.stop()
 
-# Header with Logo
-try:
-    # Center the logo above the title
-    st.markdown('<div style="text-align: center; margin-bottom: 20px;">', unsafe_allow_html=True)
-    st.image("stanthonylogo.png", width=150)
-    st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Title with logo positioned above "Anthony"
-    st.markdown("""
-    <div style="text-align: center; margin-top: -10px;">
-        <h1 style="color: #000000; font-size: 2.5rem; margin: 0; font-weight: 600;">
-            ⛪ St. Anthony Volunteer Form
-        </h1>
-    </div>
-    """, unsafe_allow_html=True)
-except FileNotFoundError:
-    st.markdown("""
-    <div style="text-align: center;">
-        <h1 style="color: #000000; font-size: 2.5rem; font-weight: 600;">
-            ⛪ St. Anthony Volunteer System
-        </h1>
-    </div>
-    """, unsafe_allow_html=True)
-
-# QR Code Parameter Handling
-qr_action = st.query_params.get("action")
-
-# Direct QR Code Actions
-if qr_action == "punch_in":
-    # Show only Punch In interface
-    st.success("🎯 QR Code Scanned: PUNCH IN")
-    st.markdown("<h1>🟢 Volunteer Punch In</h1>", unsafe_allow_html=True)
-    
-    # Name input
-    name = st.text_input("Full Name*", key="punch_in_name", placeholder="Enter your full name")
-    
-    if name:
-        # Punch In Section
-        st.markdown('<p style="text-align: center; color: #155724; margin-bottom: 20px;">Start your volunteer service</p>', unsafe_allow_html=True)
-        
-        if st.button("🟢 Punch In Now", key="qr_punch_in", use_container_width=True):
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            if SHEETS_ENABLED:
-                try:
-                    punch_sheet.append_row([name, "In", timestamp])
-                    st.success(f"👋 Welcome {name}! You've successfully punched in. 🌟")
-                    logging.info(f"Punch IN: {name} - {timestamp}")
-                except Exception as e:
-                    st.error(f"❌ Failed to save punch in: {str(e)}")
-                    st.info(f"📝 Punch data: {name} - In - {timestamp}")
-            else:
-                st.success(f"👋 Welcome {name}! You've successfully punched in. 🌟")
-                st.info(f"📝 Punch data: {name} - In - {timestamp}")
-            
-            verse = random.choice(volunteer_verses)
-            st.info(f"📖 Verse for you: {verse}")
-        
-        st.markdown('</div>', unsafe_allow_html=True)
-    else:
-        st.info("📝 Please enter your name to punch in.")
+# Profiling (opt-in with VOLUNTEER_PROFILE=1 or ?profile=1)
+profile = start_profile(f"app_{route}")
 
-elif qr_action == "punch_out":
-    # Show only Punch Out interface
-    st.success("🎯 QR Code Scanned: PUNCH OUT")
-    st.markdown("<h1>🔴 Volunteer Punch Out</h1>", unsafe_allow_html=True)
-    
-    # Name input
-    name = st.text_input("Full Name*", key="punch_out_name", placeholder="Enter your full name")
-    
-    if name:
-        # Punch Out Section
-        st.markdown('<div class="punch-out-panel">', unsafe_allow_html=True)
-        st.markdown('<div class="panel-header punch-out-header">🔴 PUNCH OUT</div>', unsafe_allow_html=True)
-        st.markdown('<p style="text-align: center; color: #721C24; margin-bottom: 20px;">Complete your volunteer service</p>', unsafe_allow_html=True)
-        
-        if st.button("🔴 Punch Out Now", key="qr_punch_out", use_container_width=True):
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            if SHEETS_ENABLED:
-                try:
-                    punch_sheet.append_row([name, "Out", timestamp])
-                    st.success(f"🎉 Great job, {name}! You've successfully punched out. 🙏")
-                    logging.info(f"Punch OUT: {name} - {timestamp}")
-                except Exception as e:
-                    st.error(f"❌ Failed to save punch out: {str(e)}")
-                    st.info(f"📝 Punch data: {name} - Out - {timestamp}")
-            else:
-                st.success(f"🎉 Great job, {name}! You've successfully punched out. 🙏")
-                st.info(f"📝 Punch data: {name} - Out - {timestamp}")
-            
-            verse = random.choice(volunteer_verses)
-            st.info(f"📖 Verse for you: {verse}")
-        
+with profile.section("css"):
+    st.markdown(PAGE_CSS, unsafe_allow_html=True)
+
+# Header with Logo
+with profile.section("header"):
+    try:
+        # Center the logo above the title
+        st.markdown('<div style="text-align: center; margin-bottom: 20px;">', unsafe_allow_html=True)
+        st.image(load_logo(), width=150)
         st.markdown('</div>', unsafe_allow_html=True)
-    else:
-        st.info("📝 Please enter your name to punch out.")
-
-else:
-    # Default view - Registration only
-    # Registration
-    st.markdown("<h1>Volunteer Registration Form </h1>", unsafe_allow_html=True)
-    st.markdown("<p>Please fill out your information below.</p>", unsafe_allow_html=True)
     
-    with st.form("registration_form"):
-        st.subheader("Personal Information")
-        col1, col2 = st.columns(2)
-        first_name = col1.text_input("First Name*", max_chars=50)
-        last_name = col2.text_input("Last Name*", max_chars=50)
-        cell_phone = st.text_input("Cell Phone*")
-        email = st.text_input("Email")
-        age = st.radio("Age*", ["14-18", "18+"])
-
-        st.subheader("Station Assignment")
-        st.markdown("**Select your preferred station and time slots:**")
-        
-        # Station tabs
-        station_tabs = st.tabs(["🎁 Prizes/Games", "💄 Cosmetology", "🎈 Inflatables", "🏀 Basketball", "🍿 Snacking"])
-        
-        # Initialize variables
-        station = ""
-        friday_slots = []
-        saturday_slots = []
-        sunday_slots = []
-        
-        # Station 1 - Prizes/Kids Games
-        with station_tabs[0]:
-            station = "Station 1 - Prizes/Kids Games"
-            st.markdown("**🎁 Station 1 - Prizes/Kids Games**")
-            
-            day_tabs = st.tabs(["Friday", "Saturday", "Sunday"])
-            
-            with day_tabs[0]:
-                st.markdown("**Friday Time Slots:**")
-                friday_slots = st.multiselect("Friday Availability", [
-                    "4:30 pm - 7:30 pm (Set up)",
-                    "7:15 pm - 10:15 pm (Clean up)"
-                ], key="station1_friday")
-            
-            with day_tabs[1]:
-                st.markdown("**Saturday Time Slots:**")
-                saturday_slots = st.multiselect("Saturday Availability", [
-                    "10:45 am - 1:45 pm (Set up)",
-                    "1:30 pm - 4:30 pm", 
-                    "4:15 pm - 7:15 pm",
-                    "7:00 pm - 10:00 pm"
-                ], key="station1_saturday")
-            
-            with day_tabs[2]:
-                st.markdown("**Sunday Time Slots:**")
-                sunday_slots = st.multiselect("Sunday Availability", [
-                    "11:45 am - 2:45 pm (Set up)",
-                    "2:30 pm - 5:30 pm (Clean up)"
-                ], key="station1_sunday")
-        
-        # Station 2 - Cosmetology
-        with station_tabs[1]:
-            station = "Station 2 - Cosmetology"
-            st.markdown("**💄 Station 2 - Cosmetology**")
-            
-            day_tabs = st.tabs(["Friday", "Saturday", "Sunday"])
-            
-            with day_tabs[0]:
-                st.markdown("**Friday Time Slots:**")
-                friday_slots = st.multiselect("Friday Availability", [
-                    "4:30 pm - 7:30 pm (Set up)",
-                    "7:15 pm - 10:15 pm (Clean up)"
-                ], key="station2_friday")
-            
-            with day_tabs[1]:
-                st.markdown("**Saturday Time Slots:**")
-                saturday_slots = st.multiselect("Saturday Availability", [
-                    "10:45 am - 1:45 pm (Set up)",
-                    "1:30 pm - 4:30 pm", 
-                    "4:15 pm - 7:15 pm",
-                    "7:00 pm - 10:00 pm"
-                ], key="station2_saturday")
-            
-            with day_tabs[2]:
-                st.markdown("**Sunday Time Slots:**")
-                sunday_slots = st.multiselect("Sunday Availability", [
-                    "11:45 am - 2:45 pm (Set up)",
-                    "2:30 pm - 5:30 pm (Clean up)"
-                ], key="station2_sunday")
-        
-        # Station 3 - Inflatables
-        with station_tabs[2]:
-            station = "Station 3 - Inflatables"
-            st.markdown("**🎈 Station 3 - Inflatables**")
-            
-            day_tabs = st.tabs(["Friday", "Saturday", "Sunday"])
-            
-            with day_tabs[0]:
-                st.markdown("**Friday Time Slots:**")
-                friday_slots = st.multiselect("Friday Availability", [
-                    "4:30 pm - 7:30 pm (Set up)",
-                    "7:15 pm - 10:15 pm (Clean up)"
-                ], key="station3_friday")
-            
-            with day_tabs[1]:
-                st.markdown("**Saturday Time Slots:**")
-                saturday_slots = st.multiselect("Saturday Availability", [
-                    "10:45 am - 1:45 pm (Set up)",
-                    "1:30 pm - 4:30 pm", 
-                    "4:15 pm - 7:15 pm",
-                    "7:00 pm - 10:00 pm"
-                ], key="station3_saturday")
-            
-            with day_tabs[2]:
-                st.markdown("**Sunday Time Slots:**")
-                sunday_slots = st.multiselect("Sunday Availability", [
-                    "11:45 am - 2:45 pm (Set up)",
-                    "2:30 pm - 5:30 pm (Clean up)"
-                ], key="station3_sunday")
-        
-        # Station 4 - Basketball
-        with station_tabs[3]:
-            station = "Station 4 - Basketball"
-            st.markdown("**🏀 Station 4 - Basketball**")
-            
-            day_tabs = st.tabs(["Friday", "Saturday", "Sunday"])
-            
-            with day_tabs[0]:
-                st.markdown("**Friday Time Slots:**")
-                friday_slots = st.multiselect("Friday Availability", [
-                    "4:30 pm - 7:30 pm (Set up)",
-                    "7:15 pm - 10:15 pm (Clean up)"
-                ], key="station4_friday")
-            
-            with day_tabs[1]:
-                st.markdown("**Saturday Time Slots:**")
-                saturday_slots = st.multiselect("Saturday Availability", [
-                    "10:45 am - 1:45 pm (Set up)",
-                    "1:30 pm - 4:30 pm", 
-                    "4:15 pm - 7:15 pm",
-                    "7:00 pm - 10:00 pm"
-                ], key="station4_saturday")
-            
-            with day_tabs[2]:
-                st.markdown("**Sunday Time Slots:**")
-                sunday_slots = st.multiselect("Sunday Availability", [
-                    "11:45 am - 2:45 pm (Set up)",
-                    "2:30 pm - 5:30 pm (Clean up)"
-                ], key="station4_sunday")
-        
-        # Station 5 - Snacking
-        with station_tabs[4]:
-            station = "Station 5 - Snacking"
-            st.markdown("**🍿 Station 5 - Snacking**")
-            
-            day_tabs = st.tabs(["Friday", "Saturday", "Sunday"])
-            
-            with day_tabs[0]:
-                st.markdown("**Friday Time Slots:**")
-                friday_slots = st.multiselect("Friday Availability", [
-                    "4:30 pm - 7:30 pm (Set up)",
-                    "7:15 pm - 10:15 pm (Clean up)"
-                ], key="station5_friday")
-            
-            with day_tabs[1]:
-                st.markdown("**Saturday Time Slots:**")
-                saturday_slots = st.multiselect("Saturday Availability", [
-                    "10:45 am - 1:45 pm (Set up)",
-                    "1:30 pm - 4:30 pm", 
-                    "4:15 pm - 7:15 pm",
-                    "7:00 pm - 10:00 pm"
-                ], key="station5_saturday")
-            
-            with day_tabs[2]:
-                st.markdown("**Sunday Time Slots:**")
-                sunday_slots = st.multiselect("Sunday Availability", [
-                    "11:45 am - 2:45 pm (Set up)",
-                    "2:30 pm - 5:30 pm (Clean up)"
-                ], key="station5_sunday")
-        
-        st.markdown('</div>', unsafe_allow_html=True)
-
-        submitted = st.form_submit_button("Submit Registration")
-        if submitted:
-            if not first_name or not last_name or not cell_phone or not station:
-                st.error("❌ Please fill out all required fields (*)")
-            else:
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                selected_slots = {
-                    'friday': ', '.join(friday_slots) if friday_slots else 'None',
-                    'saturday': ', '.join(saturday_slots) if saturday_slots else 'None', 
-                    'sunday': ', '.join(sunday_slots) if sunday_slots else 'None'
-                }
-                
-                if SHEETS_ENABLED:
-                    try:
-                        reg_sheet.append_row([
-                            first_name, last_name, cell_phone, email, age,
-                            station, selected_slots['friday'], selected_slots['saturday'], selected_slots['sunday'],
-                            timestamp
-                        ])
-                        st.success(f"✅ Thank you {first_name}! Your registration for {station} has been recorded. 🙏")
-                        logging.info(f"New volunteer registration: {first_name} {last_name} - {station}")
-                    except Exception as e:
-                        st.error(f"❌ Failed to save registration: {str(e)}")
-                        logging.error(f"Registration failed for {first_name} {last_name}: {str(e)}")
-                else:
-                    st.success(f"✅ Thank you {first_name}! Your registration for {station} has been recorded. 🙏")
-                    
+        # Title with logo positioned above "Anthony"
+        st.markdown("""
+        <div style="text-align: center; margin-top: -10px;">
+            <h1 style="color: #000000; font-size: 2.5rem; margin: 0; font-weight: 600;">
+                ⛪ St. Anthony Volunteer Form
+            </h1>
+        </div>
+        """, unsafe_allow_html=True)
+    except FileNotFoundError:
+        st.markdown("""
+        <div style="text-align: center;">
+            <h1 style="color: #000000; font-size: 2.5rem; font-weight: 600;">
+                ⛪ St. Anthony Volunteer System
+            </h1>
+        </div>
+        """, unsafe_allow_html=True)
+
+# Selected View
+with profile.section(f"view:{route}"):
+    render_view(route)
+
+profile.finish()
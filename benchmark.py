@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks for St. Anthony Volunteer System
+Run a single benchmark with: python benchmark.py <name>
+"""
+
+import argparse
+import statistics
+import time
+
+
+def summarize(label, samples):
+    """Print mean/p50/p95/max for a list of durations in seconds"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{label:<48} n={len(samples):<6} "
+          f"mean={statistics.mean(samples) * 1000:9.3f} ms  "
+          f"p50={statistics.median(samples) * 1000:9.3f} ms  "
+          f"p95={p95 * 1000:9.3f} ms  "
+          f"max={ordered[-1] * 1000:9.3f} ms")
+
+
+def timed(fn, repeat):
+    """Call fn repeat times and return the individual durations"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def legacy_connection_block():
+    """The connection block every page used to run at top level on each rerun"""
+    import gspread
+    import sheets
+
+    client = gspread.authorize(sheets.load_credentials())
+    punch_sheet = client.open(sheets.SHEET_NAME).worksheet(sheets.PUNCH_SHEET)
+    reg_sheet = client.open(sheets.SHEET_NAME).worksheet(sheets.REGISTRATION_SHEET)
+    return punch_sheet, reg_sheet
+
+
+def bench_connection(args):
+    """Per-rerun cost of the Sheets connection block, uncached vs cached"""
+    import sheets
+
+    print("🔌 Google Sheets connection (per Streamlit rerun)")
+    try:
+        before = timed(legacy_connection_block, args.repeat)
+    except Exception as e:
+        print(f"❌ Could not connect to Google Sheets: {str(e)}")
+        print("   This benchmark needs service_account.json or Streamlit secrets")
+        return
+
+    cold = timed(lambda: (sheets.get_punch_sheet(), sheets.get_reg_sheet()), 1)
+    after = timed(lambda: (sheets.get_punch_sheet(), sheets.get_reg_sheet()), args.repeat)
+
+    summarize("before: authorize + 2x open every rerun", before)
+    summarize("after: first rerun (cold)", cold)
+    summarize("after: cached handles", after)
+
+
+def bench_storage(args):
+    """Same punch/registration workload against each storage backend"""
+    import tempfile
+    import storage
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = [
+            storage.MemoryBackend(),
+            storage.MemoryBackend(latency=args.latency_ms / 1000),
+            storage.SQLiteBackend(f"{tmp}/bench.db"),
+            storage.JsonlBackend(f"{tmp}/jsonl"),
+        ]
+        if args.include_sheets:
+            backends.append(storage.SheetsBackend())
+
+        print(f"🗄️  Storage backends ({args.repeat} punches + {args.repeat} registrations each)")
+        for backend in backends:
+            label = backend.name
+            if isinstance(backend, storage.MemoryBackend) and backend.latency:
+                label = f"memory (+{args.latency_ms:g} ms latency)"
+            counter = iter(range(args.repeat * 2))
+            punches = timed(lambda: backend.record_punch(f"Volunteer {next(counter)}", "In", "2025-01-01 10:00:00"), args.repeat)
+            registrations = timed(lambda: backend.record_registration(
+                ["First", "Last", "555-0100", "first@example.com", "18+", "Station 1 - Prizes/Kids Games",
+                 "None", "None", "None", "2025-01-01 10:00:00"]), args.repeat)
+            listing = timed(backend.list_punches, 1)
+            summarize(f"{label}: record_punch", punches)
+            summarize(f"{label}: record_registration", registrations)
+            summarize(f"{label}: list_punches", listing)
+
+
+def bench_geofence(args):
+    """Single-point checks and a batch audit against the church geofence"""
+    import random
+
+    from geofence import CHURCH_GEOFENCE, CHURCH_LOCATION
+
+    rng = random.Random(42)
+    points = [(CHURCH_LOCATION[0] + rng.uniform(-1.0, 1.0), CHURCH_LOCATION[1] + rng.uniform(-1.0, 1.0))
+              for _ in range(args.points)]
+    lats = [lat for lat, _ in points]
+    lons = [lon for _, lon in points]
+
+    print(f"📍 Geofence ({args.points} points, {args.repeat} runs)")
+    try:
+        from geopy.distance import geodesic
+    except ImportError:
+        geodesic = None
+    if geodesic is not None:
+        summarize("before: geopy geodesic loop", timed(
+            lambda: [geodesic(CHURCH_LOCATION, point).meters <= CHURCH_GEOFENCE.radius_meters for point in points],
+            args.repeat))
+    summarize("after: bbox + haversine loop", timed(
+        lambda: [CHURCH_GEOFENCE.contains(lat, lon) for lat, lon in points], args.repeat))
+    summarize("after: NumPy batch", timed(lambda: CHURCH_GEOFENCE.contains_many(lats, lons), args.repeat))
+    summarize("after: single check", timed(lambda: CHURCH_GEOFENCE.contains(*points[0]), max(args.repeat, 1000)))
+
+
+def bench_ipdb(args):
+    """Load a synthetic CIDR CSV into the offline IP database and time lookups"""
+    import csv
+    import random
+    import tempfile
+
+    from ip_database import IPDatabase
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = f"{tmp}/ranges.csv"
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["network", "latitude", "longitude", "city", "region", "country"])
+            for _ in range(args.ranges):
+                network = f"{rng.randrange(1, 224)}.{rng.randrange(256)}.{rng.randrange(256)}.0/{rng.choice((16, 20, 24))}"
+                writer.writerow([network, rng.uniform(-90, 90), rng.uniform(-180, 180), "City", "ST", "US"])
+
+        print(f"🗺️  Offline IP database ({args.ranges} ranges)")
+        databases = []
+        summarize("load CSV into trie", timed(lambda: databases.append(IPDatabase.load(path)), 1))
+        database = databases[0]
+        addresses = [f"{rng.randrange(1, 224)}.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}"
+                     for _ in range(1000)]
+        counter = iter(range(10 ** 9))
+        summarize("lookup", timed(lambda: database.lookup(addresses[next(counter) % len(addresses)]), max(args.repeat, 10000)))
+        trie = database._tries[4]
+        print(f"   trie nodes: {len(trie)} (~{len(trie) * 12 / 1e6:.1f} MB)")
+
+
+STARTUP_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=60)
+for key, value in (pair.split("=") for pair in sys.argv[3:]):
+    at.query_params[key] = value
+before = set(sys.modules)
+first = time.perf_counter()
+at.run()
+cold = time.perf_counter() - first
+modules = len(set(sys.modules) - before)
+reruns = []
+for _ in range(int(sys.argv[2])):
+    rerun = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - rerun)
+print(cold, modules, *reruns)
+"""
+
+
+def bench_schedule(args):
+    """Assign synthetic registrations with the min-cost flow scheduler"""
+    import random
+
+    from catalog import get_catalog
+    from scheduler import build_schedule, load_volunteers
+
+    catalog = get_catalog()
+    rng = random.Random(42)
+    rows = []
+    for number in range(args.volunteers):
+        station = rng.choice(catalog.stations)
+        days = [", ".join(rng.sample(station.day_slots(day), rng.randint(0, len(station.day_slots(day))))) or "None"
+                for day in catalog.days]
+        rows.append([f"Volunteer{number}", "Test", "555-0100", "", rng.choice(["14-18", "18+"]), station.name]
+                    + days + ["2025-01-01 10:00:00"])
+
+    print(f"🗓️ Scheduler ({args.volunteers} registrations, {args.repeat} runs)")
+    volunteers = load_volunteers(rows, catalog)
+    summarize("load registrations", timed(lambda: load_volunteers(rows, catalog), args.repeat))
+    summarize("build schedule", timed(lambda: build_schedule(volunteers, catalog), args.repeat))
+    schedule = build_schedule(volunteers, catalog)
+    print(f"{len(schedule['assignments'])} shifts assigned, {sum(schedule['open_spots'].values())} spots open")
+
+
+def bench_startup(args):
+    """Cold first run and warm reruns of each app.py route, each in a fresh interpreter"""
+    import subprocess
+    import sys
+
+    routes = [
+        ("punch_in", ["action=punch_in"]),
+        ("punch_out", ["action=punch_out"]),
+        ("registration", []),
+        ("health", ["health=check"]),
+    ]
+    print(f"🚀 Startup of {args.app} ({args.repeat} reruns per route)")
+    for route, params in routes:
+        output = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT, args.app, str(args.repeat), *params],
+            capture_output=True, text=True, check=True
+        ).stdout.split()
+        cold, modules, reruns = float(output[0]), int(output[1]), [float(value) for value in output[2:]]
+        summarize(f"{route}: cold first run ({modules} modules)", [cold])
+        summarize(f"{route}: rerun", reruns)
+
+
+BENCHMARKS = {
+    "connection": bench_connection,
+    "geofence": bench_geofence,
+    "ipdb": bench_ipdb,
+    "schedule": bench_schedule,
+    "startup": bench_startup,
+    "storage": bench_storage,
+}
+
+
+def main():
+    """Run the requested benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmarks for St. Anthony Volunteer System")
+    parser.add_argument("name", choices=sorted(BENCHMARKS), help="Benchmark to run")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed iterations (default: 5)")
+    parser.add_argument("--latency-ms", dest="latency_ms", type=float, default=50.0, help="Injected latency for the slow in-memory backend (default: 50)")
+    parser.add_argument("--points", type=int, default=10000, help="Coordinates per geofence run (default: 10000)")
+    parser.add_argument("--ranges", type=int, default=300000, help="CIDR ranges for the ipdb benchmark (default: 300000)")
+    parser.add_argument("--volunteers", type=int, default=5000, help="Registrations for the schedule benchmark (default: 5000)")
+    parser.add_argument("--app", default="app.py", help="Streamlit script for the startup benchmark (default: app.py)")
+    parser.add_argument("--include-sheets", dest="include_sheets", action="store_true", help="Also benchmark the Google Sheets backend")
+    args = parser.parse_args()
+
+    BENCHMARKS[args.name](args)
+
+
+if __name__ == "__main__":
+    main()
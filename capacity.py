@@ -0,0 +1,293 @@
+"""
+Per-slot registration counts for capacity limits
+Built once from the stored registrations and updated on each submission, so the form can show
+remaining spots and refuse full slots without reading the Registration sheet on every render
+"""
+
+import logging
+import threading
+import time
+
+from catalog import get_catalog
+from shifts import normalize_name
+from slots import BookingIndex
+from storage import same_row
+
+
+def phone_key(phone):
+    """Last ten digits of a phone number ('' without digits), so formatting and a leading 1 don't matter"""
+    return "".join(ch for ch in str(phone) if ch.isdigit())[-10:]
+
+
+def email_key(email):
+    return str(email).strip().lower()
+
+
+def volunteer_key(phone, email, name=""):
+    """Identity of a registrant: phone (else email) together with the normalized name
+
+    Either half alone can be shared: two people with the same name, or siblings
+    signing up with a parent's phone or email.
+    """
+    if phone_key(phone):
+        contact = f"phone:{phone_key(phone)}"
+    elif email_key(email):
+        contact = f"email:{email_key(email)}"
+    else:
+        contact = ""
+    if not contact and not normalize_name(name):
+        return ""
+    return f"{contact}|{normalize_name(name)}"
+
+
+def registrant_key(registration):
+    """volunteer_key() of a parse_registration() result"""
+    return volunteer_key(registration["phone"], registration["email"], registration["name"])
+
+
+def parse_registration(row, catalog):
+    """Registrant details and {day: {station: [slots]}} for a stored registration row, or None for headers and unknown rows
+
+    Two layouts share the Registration sheet: the app.py form writes
+    [first, last, phone, email, age, station, <one column per day>, timestamp] and
+    registration.py writes [timestamp, name, email, phone, contact, age, experience, schedule, notes]
+    with schedule as "Day: Station (slot, slot) | Day: ...".
+    """
+    days = catalog.days
+    if len(row) >= 6 + len(days) and catalog.station(row[5]) is not None:
+        schedule = {}
+        for day, cell in zip(days, row[6:6 + len(days)]):
+            if cell and cell != "None":
+                schedule[day] = {row[5]: cell.split(", ")}
+        return {"name": f"{row[0]} {row[1]}".strip(), "phone": row[2], "email": row[3], "age": row[4], "schedule": schedule}
+    if len(row) >= 8 and row[7]:
+        schedule = _parse_schedule(row[7], catalog)
+        if schedule:
+            return {"name": row[1], "phone": row[3], "email": row[2], "age": row[5], "schedule": schedule}
+    return None
+
+
+def _parse_schedule(text, catalog):
+    """{day: {station: [slots]}} from registration.py's schedule column"""
+    schedule = {}
+    for part in text.split(" | "):
+        day, _, rest = part.partition(": ")
+        station_name, _, slots = rest.partition(" (")
+        if day not in catalog.days or catalog.station(station_name) is None or not slots.endswith(")"):
+            continue
+        schedule.setdefault(day, {})[station_name] = slots[:-1].split(", ")
+    return schedule
+
+
+class CapacityIndex:
+    """Registration count per (station, day, slot), checked against the catalog's per-slot capacity
+
+    Also keeps each volunteer's booked slots per day, so overlapping sign-ups are caught.
+    cursor counts the committed registration rows already counted, so refresh() can pick up
+    rows other processes wrote; rows this process counted before they were committed (its own
+    saves, or rows pending at rebuild) are held in _unseen and skipped once they show up.
+    """
+
+    def __init__(self, catalog=None):
+        self.catalog = catalog or get_catalog()
+        self._counts = {}
+        self._bookings = BookingIndex()
+        self._unseen = []
+        self._lock = threading.Lock()
+        self.cursor = 0
+
+    def rebuild(self, registration_rows, pending_rows=()):
+        """Count committed rows, then rows not committed yet"""
+        counts = {}
+        bookings = BookingIndex()
+        for row in list(registration_rows) + list(pending_rows):
+            self._count_row(row, counts, bookings, 1)
+        with self._lock:
+            self._counts = counts
+            self._bookings = bookings
+            self._unseen = [list(row) for row in pending_rows]
+            self.cursor = len(registration_rows)
+
+    def refresh(self, start, new_rows):
+        """Count committed rows read from position start that this index hasn't counted yet"""
+        with self._lock:
+            # A concurrent refresh may already have covered some of them
+            for row in new_rows[max(0, self.cursor - start):]:
+                seen = next((own for own in self._unseen if same_row(row, own)), None)
+                if seen is not None:
+                    self._unseen.remove(seen)
+                else:
+                    self._count_row(row, self._counts, self._bookings, 1)
+            self.cursor = max(self.cursor, start + len(new_rows))
+
+    def note_saved(self, row, replaced=None):
+        """Record a row this process saved after reserving its slots, so refresh() doesn't count it again
+
+        For an update, pass the row it replaced; only a replaced row still waiting to be
+        seen matters, since an older one sits before the cursor.
+        """
+        with self._lock:
+            if replaced is None:
+                self._unseen.append(list(row))
+                return
+            for position, own in enumerate(self._unseen):
+                if same_row(own, replaced):
+                    self._unseen[position] = list(row)
+                    return
+
+    def add_row(self, row):
+        """Count a stored registration row, e.g. putting back one a failed resubmission was replacing"""
+        with self._lock:
+            self._count_row(row, self._counts, self._bookings, 1)
+
+    def remove_row(self, row):
+        """Stop counting a stored registration row, e.g. while a resubmission replaces it"""
+        with self._lock:
+            self._count_row(row, self._counts, self._bookings, -1)
+
+    def _count_row(self, row, counts, bookings, step):
+        registration = parse_registration(row, self.catalog)
+        if registration is None:
+            return
+        volunteer = registrant_key(registration)
+        for day, stations in registration["schedule"].items():
+            for name, day_slots in stations.items():
+                for slot in day_slots:
+                    key = (name, day, slot)
+                    counts[key] = max(0, counts.get(key, 0) + step)
+                if volunteer and self.catalog.invalid_slots(name, day, day_slots) == []:
+                    if step > 0:
+                        bookings.book(volunteer, day, day_slots)
+                    else:
+                        bookings.release(volunteer, day, day_slots)
+
+    def conflicts(self, volunteer, slots_by_day):
+        """(day, slot, booked slot) for requested slots overlapping the earlier sign-ups of volunteer (a volunteer_key())"""
+        with self._lock:
+            return [(day, slot, booked) for day, day_slots in slots_by_day.items()
+                    for slot, booked in self._bookings.conflicts(volunteer, day, day_slots)]
+
+    def count(self, station_name, day, slot):
+        with self._lock:
+            return self._counts.get((station_name, day, slot), 0)
+
+    def remaining(self, station_name, day, slot):
+        """Open spots in a slot, or None when the station has no capacity limit"""
+        station = self.catalog.station(station_name)
+        if station is None or station.capacity is None:
+            return None
+        return max(0, station.capacity - self.count(station.name, day, slot))
+
+    def reserve(self, station_name, slots_by_day, volunteer=None):
+        """Count a registration unless it would overfill a slot; returns the full (day, slot) pairs
+
+        Nothing is counted when any slot is full, so a refused form can be resubmitted as is.
+        With volunteer (a volunteer_key()) the slots are also booked against that volunteer.
+        """
+        keys = [(station_name, day, slot) for day, day_slots in slots_by_day.items() for slot in day_slots]
+        return [(day, slot) for _, day, slot in self._reserve(keys, volunteer)]
+
+    def reserve_schedule(self, schedule, volunteer=None):
+        """reserve() for a {day: (station name, [slots])} schedule, all or nothing; returns the full keys"""
+        keys = [(station_name, day, slot) for day, (station_name, day_slots) in schedule.items() for slot in day_slots]
+        return self._reserve(keys, volunteer)
+
+    def release(self, station_name, slots_by_day, volunteer=None):
+        """Undo reserve() for a registration that could not be saved"""
+        self._release([(station_name, day, slot) for day, day_slots in slots_by_day.items() for slot in day_slots], volunteer)
+
+    def release_schedule(self, schedule, volunteer=None):
+        self._release([(station_name, day, slot) for day, (station_name, day_slots) in schedule.items() for slot in day_slots], volunteer)
+
+    def _reserve(self, keys, volunteer=None):
+        with self._lock:
+            full = []
+            for key in keys:
+                station = self.catalog.station(key[0])
+                if station is not None and station.capacity is not None and self._counts.get(key, 0) >= station.capacity:
+                    full.append(key)
+            if full:
+                return full
+            for key in keys:
+                self._counts[key] = self._counts.get(key, 0) + 1
+            if volunteer:
+                for _, day, slot in keys:
+                    self._bookings.book(volunteer, day, [slot])
+        return []
+
+    def _release(self, keys, volunteer=None):
+        with self._lock:
+            for key in keys:
+                if self._counts.get(key, 0) > 0:
+                    self._counts[key] -= 1
+            if volunteer:
+                for _, day, slot in keys:
+                    self._bookings.release(volunteer, day, [slot])
+
+    def slot_count(self):
+        with self._lock:
+            return len(self._counts)
+
+    def volunteer_count(self):
+        with self._lock:
+            return self._bookings.volunteer_count()
+
+
+# Process-wide index, rebuilt once from storage on first use
+_index = None
+_index_built_at = None
+_index_lock = threading.Lock()
+
+
+def get_capacity_index():
+    """Return the process-wide capacity index, or None while stored registrations cannot be read"""
+    global _index, _index_built_at
+    with _index_lock:
+        if _index is None:
+            from storage import get_storage
+
+            index = CapacityIndex()
+            storage = get_storage()
+            try:
+                index.rebuild(storage.read_registrations(0), storage.pending_registrations())
+            except Exception as e:
+                # Try again on the next render rather than counting against a partial history
+                logging.warning(f"Could not build capacity index: {str(e)}")
+                return None
+            _index = index
+            _index_built_at = time.time()
+        return _index
+
+
+def refresh_capacity_index():
+    """Count registrations other processes saved since the index last read storage
+
+    Another app (registration.py next to app.py, or a second server) writes to the same
+    Registration sheet, so call this before a submission's capacity and overlap checks.
+    """
+    with _index_lock:
+        index = _index
+    if index is None:
+        return None
+    from storage import get_storage
+
+    start = index.cursor
+    try:
+        index.refresh(start, get_storage().read_registrations(start))
+    except Exception as e:
+        logging.warning(f"Could not refresh capacity index: {str(e)}")
+    return index
+
+
+def index_state():
+    """Cached index figures for health reporting; never builds the index"""
+    with _index_lock:
+        if _index is None:
+            return {"built": False}
+        return {
+            "built": True,
+            "age_seconds": round(time.time() - _index_built_at, 1),
+            "slots": _index.slot_count(),
+            "volunteers": _index.volunteer_count(),
+            "cursor": _index.cursor
+        }
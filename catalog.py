@@ -0,0 +1,117 @@
+"""
+Station and time-slot catalog for volunteer registration
+Loaded once per process from stations.json (or VOLUNTEER_CATALOG); the registration forms
+and the registration backend are both generated from it
+"""
+
+import json
+import logging
+import os
+import threading
+
+from slots import parse_slot
+
+CATALOG_PATH = os.getenv("VOLUNTEER_CATALOG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "stations.json"))
+
+# Age answers from both registration forms that mean under 18
+MINOR_AGE_GROUPS = ("14-18", "Under 18")
+
+
+class Station:
+    """One volunteer station with its time slots per day"""
+
+    def __init__(self, id, name, icon="", label="", description="", requirements="", capacity=None,
+                 adults_only=False, slots=None):
+        self.id = id
+        self.name = name
+        self.icon = icon
+        self.label = label or name
+        self.description = description
+        self.requirements = requirements
+        # Volunteers wanted per slot; None means no limit
+        self.capacity = capacity
+        # Stations that only take volunteers 18 and over
+        self.adults_only = adults_only
+        # Tuples, so the lists handed to widgets can't be mutated between sessions
+        self.slots = {day: tuple(labels) for day, labels in (slots or {}).items()}
+
+    @property
+    def title(self):
+        return f"{self.icon} {self.label}".strip()
+
+    def day_slots(self, day):
+        return self.slots.get(day, ())
+
+    def accepts(self, age):
+        """Whether a volunteer who answered age may work here"""
+        return not (self.adults_only and age in MINOR_AGE_GROUPS)
+
+
+class Catalog:
+    """Stations and event days, with lookups by station name or id"""
+
+    def __init__(self, days, stations):
+        self.days = tuple(days)
+        self.stations = tuple(stations)
+        self._by_key = {}
+        for station in self.stations:
+            unknown_days = set(station.slots) - set(self.days)
+            if unknown_days:
+                raise ValueError(f"{station.name} has slots for unknown days: {', '.join(sorted(unknown_days))}")
+            for labels in station.slots.values():
+                for label in labels:
+                    parse_slot(label)
+            self._by_key[station.id] = station
+            self._by_key[station.name] = station
+
+    def __len__(self):
+        return len(self.stations)
+
+    def station(self, key):
+        """Station by id or full name, or None"""
+        return self._by_key.get(key)
+
+    def station_names(self):
+        return [station.name for station in self.stations]
+
+    def day_slots(self, day):
+        """Every slot offered on day by any station, in catalog order"""
+        seen = {}
+        for station in self.stations:
+            for label in station.day_slots(day):
+                seen.setdefault(label, None)
+        return tuple(seen)
+
+    def invalid_slots(self, station_key, day, selected):
+        """Selected slots the station does not offer on day (all of them for an unknown station)"""
+        station = self.station(station_key)
+        offered = station.day_slots(day) if station is not None else ()
+        return [label for label in selected if label not in offered]
+
+    @classmethod
+    def from_dict(cls, data):
+        try:
+            stations = [Station(**entry) for entry in data["stations"]]
+            return cls(data["days"], stations)
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Malformed station catalog: {str(e)}")
+
+    @classmethod
+    def load(cls, path=None):
+        with open(path or CATALOG_PATH, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+# Process-wide catalog, loaded once on first use
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """Return the process-wide catalog; a missing or malformed file raises so the form isn't built empty"""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = Catalog.load()
+            logging.info(f"Station catalog loaded: {len(_catalog)} stations from {CATALOG_PATH}")
+        return _catalog
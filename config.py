@@ -4,29 +4,15 @@ Shared configuration and functions for St. Anthony Volunteer System
 
 import streamlit as st
 from datetime import datetime
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import random
-import logging
-import os
+from geofence import CHURCH_LOCATION, MAX_DISTANCE_METERS
+from log_setup import configure_logging
+from sheets import SHEET_NAME, PUNCH_SHEET, REGISTRATION_SHEET, get_punch_sheet, get_reg_sheet, is_configured as sheets_configured
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('volunteer_system.log') if not os.getenv('STREAMLIT_SHARING') else logging.StreamHandler()
-    ]
-)
+configure_logging()
 
 # Config
-CHURCH_LOCATION = (39.8637, -74.8284)
-MAX_DISTANCE_METERS = 50000  # 50km for testing
-SHEET_NAME = "Volunteer Hours"
-PUNCH_SHEET = "Sheet1"
-REGISTRATION_SHEET = "Registration"
-
 volunteer_verses = [
     "Each of you should use whatever gift you have received to serve others, as faithful stewards of God's grace. — 1 Peter 4:10",
     "Whatever you do, work at it with all your heart, as working for the Lord, not for human masters. — Colossians 3:23",
@@ -35,24 +21,8 @@ volunteer_verses = [
     "Carry each other's burdens, and in this way you will fulfill the law of Christ. — Galatians 6:2"
 ]
 
-# Google Sheets Connection
-try:
-    scope = ["https://www.googleapis.com/auth/spreadsheets","https://www.googleapis.com/auth/drive"]
-    if hasattr(st, 'secrets') and "gcp_service_account" in st.secrets:
-        import json
-        account_info = json.loads(st.secrets["gcp_service_account"])
-        auth_creds = ServiceAccountCredentials.from_json_keyfile_dict(account_info, scope)
-    else:
-        auth_creds = ServiceAccountCredentials.from_json_keyfile_name("service_account.json", scope)
-    client = gspread.authorize(auth_creds)
-    punch_sheet = client.open(SHEET_NAME).worksheet(PUNCH_SHEET)
-    reg_sheet = client.open(SHEET_NAME).worksheet(REGISTRATION_SHEET)
-    SHEETS_ENABLED = True
-except Exception as e:
-    # Google Sheets not connected - app will store data locally for display
-    SHEETS_ENABLED = False
-    punch_sheet = None
-    reg_sheet = None
+# Google Sheets Connection (authorized lazily once per server process, see sheets.py)
+SHEETS_ENABLED = sheets_configured()
 
 def get_common_css():
     """Return common CSS styling for all apps"""
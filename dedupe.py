@@ -0,0 +1,172 @@
+"""
+Duplicate registration detection by phone number or email plus name
+Built once from the stored registrations and kept current on each write, so a resubmitted form
+(or a double-clicked submit button) updates the registrant's existing row instead of adding another.
+A shared phone or email alone isn't enough, since siblings often sign up with a parent's.
+"""
+
+import logging
+import threading
+import time
+
+from capacity import email_key, parse_registration, phone_key
+from catalog import get_catalog
+from shifts import normalize_name
+
+
+class RegistrationIndex:
+    """Positions of stored rows hashed by phone and by email, each with the registrant's name
+
+    Positions follow list_registrations() order, which is the order rows are appended.
+    """
+
+    def __init__(self, catalog=None):
+        self.catalog = catalog or get_catalog()
+        self._phones = {}
+        self._emails = {}
+        self._rows = {}
+        self._names = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return self._size
+
+    def rebuild(self, registration_rows):
+        phones, emails, rows, names = {}, {}, {}, {}
+        for position, row in enumerate(registration_rows):
+            self._index_row(position, row, phones, emails, rows, names)
+        with self._lock:
+            self._phones, self._emails, self._rows, self._names = phones, emails, rows, names
+            self._size = len(registration_rows)
+
+    def find(self, phone, email, name):
+        """(position, row) of the latest registration sharing phone or email (phone first) and name, or (None, None)"""
+        phone, email, name = phone_key(phone), email_key(email), normalize_name(name)
+        with self._lock:
+            candidates = (self._phones.get(phone, []) if phone else []) + (self._emails.get(email, []) if email else [])
+            for position in sorted(candidates, reverse=True):
+                if self._names[position] == name:
+                    return position, list(self._rows[position])
+            return None, None
+
+    def row(self, position):
+        """Indexed row at position, or None"""
+        with self._lock:
+            row = self._rows.get(position)
+            return list(row) if row is not None else None
+
+    def append(self, row, write):
+        """Store row with write(row) and index it at the end; returns write's result
+
+        The write happens under the lock so positions match the storage order.
+        """
+        with self._lock:
+            saved = write(row)
+            if saved:
+                self._index_row(self._size, row, self._phones, self._emails, self._rows, self._names)
+                self._size += 1
+            return saved
+
+    def replace(self, position, row):
+        """Re-index position after its row was overwritten; the old phone and email no longer point at it"""
+        with self._lock:
+            previous = self._rows.pop(position, None)
+            self._names.pop(position, None)
+            if previous is not None:
+                registration = parse_registration(previous, self.catalog)
+                _unindex(self._phones, phone_key(registration["phone"]), position)
+                _unindex(self._emails, email_key(registration["email"]), position)
+            self._index_row(position, row, self._phones, self._emails, self._rows, self._names)
+
+    def _index_row(self, position, row, phones, emails, rows, names):
+        registration = parse_registration(row, self.catalog)
+        if registration is None:
+            return
+        phone, email = phone_key(registration["phone"]), email_key(registration["email"])
+        if not phone and not email:
+            return
+        if phone:
+            phones.setdefault(phone, []).append(position)
+        if email:
+            emails.setdefault(email, []).append(position)
+        rows[position] = list(row)
+        names[position] = normalize_name(registration["name"])
+
+    def key_count(self):
+        with self._lock:
+            return len(self._phones) + len(self._emails)
+
+
+def _unindex(keys, key, position):
+    positions = keys.get(key)
+    if positions and position in positions:
+        positions.remove(position)
+        if not positions:
+            del keys[key]
+
+
+# Process-wide index, rebuilt once from storage on first use
+_index = None
+_index_built_at = None
+_index_lock = threading.Lock()
+
+
+def get_registration_index():
+    """Return the process-wide registration index, or None while stored registrations cannot be read"""
+    global _index, _index_built_at
+    with _index_lock:
+        if _index is None:
+            from storage import get_storage
+
+            index = RegistrationIndex()
+            try:
+                index.rebuild(get_storage().list_registrations())
+            except Exception as e:
+                # Without the full history positions would be wrong, so don't dedupe until it loads
+                logging.warning(f"Could not build registration index: {str(e)}")
+                return None
+            _index = index
+            _index_built_at = time.time()
+        return _index
+
+
+def save_registration(row, position=None):
+    """Store a registration row, overwriting the row at position when the form matched an earlier one
+
+    Returns (saved, updated). A failed update (Sheets refused it, or the row moved because
+    another process wrote to the sheet) falls back to an append so the submission isn't lost,
+    and the index is rebuilt on next use.
+    """
+    global _index
+    from storage import get_storage
+
+    storage = get_storage()
+    index = get_registration_index()
+    if index is None:
+        return storage.record_registration(row), False
+    if position is not None:
+        previous = index.row(position)
+        if previous is not None and storage.update_registration(position, row, previous):
+            index.replace(position, row)
+            return True, True
+        logging.warning(f"Could not update registration row {position}, appending instead")
+        with _index_lock:
+            if _index is index:
+                _index = None
+        return storage.record_registration(row), False
+    return index.append(row, storage.record_registration), False
+
+
+def index_state():
+    """Cached index figures for health reporting; never builds the index"""
+    with _index_lock:
+        if _index is None:
+            return {"built": False}
+        return {
+            "built": True,
+            "age_seconds": round(time.time() - _index_built_at, 1),
+            "rows": len(_index),
+            "keys": _index.key_count()
+        }
@@ -0,0 +1,77 @@
+"""
+Structured JSON events for punches, registrations, health checks and Sheets calls
+Each event carries a monotonic sequence number, per-phase durations and an outcome
+Events go through the logging queue and are written one JSON object per line by the listener
+They also feed the counters and histograms in metrics.py
+"""
+
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import metrics
+from log_setup import EVENT_LOGGER
+
+_logger = logging.getLogger(EVENT_LOGGER)
+# Sequence numbers are unique per process; next() on a count is atomic under the GIL
+_sequence = itertools.count(1)
+
+
+def emit(kind, outcome, duration_ms=None, phases=None, **fields):
+    """Log one event; the dict is serialized to JSON on the listener thread"""
+    event = {
+        "seq": next(_sequence),
+        "ts": datetime.now().isoformat(timespec="milliseconds"),
+        "event": kind,
+        "outcome": outcome
+    }
+    if duration_ms is not None:
+        event["duration_ms"] = round(duration_ms, 3)
+    if phases:
+        event["phases"] = {name: round(ms, 3) for name, ms in phases.items()}
+    event.update(fields)
+    _logger.info(event)
+    metrics.observe_event(event)
+    return event
+
+
+class Event:
+    """Timer for one request, split into named phases and emitted once"""
+
+    def __init__(self, kind, **fields):
+        self.kind = kind
+        self.fields = fields
+        self.phases = {}
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.emitted = False
+
+    def mark(self, name):
+        """Close a phase that ran from the previous mark (or the start) until now"""
+        now = time.perf_counter()
+        self.phases[name] = self.phases.get(name, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as a phase"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self.phases[name] = self.phases.get(name, 0.0) + (now - started) * 1000
+            self._last = now
+
+    def emit(self, outcome, **fields):
+        if self.emitted:
+            return None
+        self.emitted = True
+        return emit(
+            self.kind, outcome,
+            duration_ms=(time.perf_counter() - self.started) * 1000,
+            phases=self.phases,
+            **{**self.fields, **fields}
+        )
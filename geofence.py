@@ -0,0 +1,86 @@
+"""
+Geofence around the church for location checks
+A bounding-box prefilter rejects far-away points before the haversine distance is computed
+"""
+
+import math
+
+CHURCH_LOCATION = (39.8637, -74.8284)
+MAX_DISTANCE_METERS = 50000  # 50km for testing - allows testing from anywhere nearby
+
+# Mean Earth radius used by the haversine formula
+EARTH_RADIUS_METERS = 6371008.8
+
+
+def haversine_meters(lat1, lon1, lat2, lon2):
+    """Great-circle distance in meters between two points given in degrees"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(min(1.0, math.sqrt(a)))
+
+
+class Geofence:
+    """Circle of radius_meters around center, with a precomputed bounding box"""
+
+    def __init__(self, center=CHURCH_LOCATION, radius_meters=MAX_DISTANCE_METERS):
+        self.center = center
+        self.radius_meters = radius_meters
+        lat, lon = center
+        lat_delta = math.degrees(radius_meters / EARTH_RADIUS_METERS)
+        # Longitude degrees shrink with latitude; near the poles the box spans every longitude
+        cos_lat = math.cos(math.radians(min(90.0, abs(lat) + lat_delta)))
+        lon_delta = 180.0 if cos_lat <= 1e-12 else min(180.0, lat_delta / cos_lat)
+        self.min_lat = lat - lat_delta
+        self.max_lat = lat + lat_delta
+        self.min_lon = lon - lon_delta
+        self.max_lon = lon + lon_delta
+        self._wraps = lon_delta >= 180.0 or self.min_lon < -180.0 or self.max_lon > 180.0
+
+    def distance_meters(self, lat, lon):
+        """Distance from the center to (lat, lon)"""
+        return haversine_meters(self.center[0], self.center[1], lat, lon)
+
+    def in_bounding_box(self, lat, lon):
+        """Cheap check that can only rule points out"""
+        if not self.min_lat <= lat <= self.max_lat:
+            return False
+        return self._wraps or self.min_lon <= lon <= self.max_lon
+
+    def contains(self, lat, lon):
+        """True when (lat, lon) lies inside the fence"""
+        if not self.in_bounding_box(lat, lon):
+            return False
+        return self.distance_meters(lat, lon) <= self.radius_meters
+
+    def contains_location(self, location):
+        """Check a get_ip_location style dict; None when it has no coordinates"""
+        try:
+            return self.contains(float(location['latitude']), float(location['longitude']))
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def contains_many(self, lats, lons):
+        """Vectorized contains for audits over many coordinates; returns a NumPy bool array"""
+        import numpy as np
+
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        inside = (lats >= self.min_lat) & (lats <= self.max_lat)
+        if not self._wraps:
+            inside &= (lons >= self.min_lon) & (lons <= self.max_lon)
+        candidates = np.flatnonzero(inside)
+        if candidates.size:
+            phi1 = math.radians(self.center[0])
+            phi2 = np.radians(lats[candidates])
+            d_lambda = np.radians(lons[candidates] - self.center[1])
+            a = np.sin((phi2 - phi1) / 2) ** 2 + math.cos(phi1) * np.cos(phi2) * np.sin(d_lambda / 2) ** 2
+            distances = 2 * EARTH_RADIUS_METERS * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+            inside[candidates] = distances <= self.radius_meters
+        return inside
+
+
+# Fence around the church used by the punch pages
+CHURCH_GEOFENCE = Geofence()
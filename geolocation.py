@@ -0,0 +1,272 @@
+"""
+Geolocation for the punch pages
+The browser's own coordinates are preferred; IP lookup is the fallback when the browser has none
+All IP providers are queried at once and the first valid answer wins, under one shared deadline
+Answers are cached per client IP so repeat scans from the same network skip the lookup
+"""
+
+import ipaddress
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+import requests
+import streamlit as st
+import streamlit.components.v1 as components
+from requests.adapters import HTTPAdapter
+
+import metrics
+from ip_database import get_ip_database
+
+# Provider URLs for the server's own address and for a given client IP
+PROVIDERS = [
+    "https://ipapi.co/json/",
+    "http://ip-api.com/json/",
+    "https://ipinfo.io/json"
+]
+CLIENT_PROVIDERS = [
+    "https://ipapi.co/{ip}/json/",
+    "http://ip-api.com/json/{ip}",
+    "https://ipinfo.io/{ip}/json"
+]
+
+# Overall budget for a lookup, shared by every provider
+LOCATION_DEADLINE_SECONDS = 5.0
+
+# Cached answers per client IP
+LOCATION_CACHE_SIZE = 1024
+LOCATION_CACHE_TTL_SECONDS = 300
+
+# How long the browser may take to produce a position, and how old a cached one may be
+BROWSER_LOCATION_TIMEOUT_MS = 10000
+BROWSER_LOCATION_MAX_AGE_MS = 60000
+
+# Keep-alive session reused by every lookup in this server process
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=len(PROVIDERS), pool_maxsize=8))
+_session.mount("https://", HTTPAdapter(pool_connections=len(PROVIDERS), pool_maxsize=8))
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="geolocation")
+
+PROVIDER_SECONDS = metrics.histogram(
+    "volunteer_location_provider_seconds", "IP geolocation latency per provider", ("provider", "outcome")
+)
+
+# Invisible component that asks the browser Geolocation API for the phone's position
+_browser_location = components.declare_component(
+    "browser_location",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "browser_location")
+)
+
+
+def parse_location(data):
+    """Normalize a provider response (ipapi.co, ip-api.com or ipinfo.io) or return None"""
+    if 'latitude' in data and 'longitude' in data:
+        return {
+            'latitude': data['latitude'],
+            'longitude': data['longitude'],
+            'city': data.get('city', 'Unknown'),
+            'region': data.get('region_code', data.get('region', 'Unknown')),
+            'country': data.get('country_name', data.get('country', 'Unknown')),
+            'postal': data.get('postal', ''),
+            'timezone': data.get('timezone', ''),
+            'isp': data.get('org', data.get('isp', ''))
+        }
+    if 'lat' in data and 'lon' in data:
+        return {
+            'latitude': data['lat'],
+            'longitude': data['lon'],
+            'city': data.get('city', 'Unknown'),
+            'region': data.get('regionName', data.get('region', 'Unknown')),
+            'country': data.get('country', 'Unknown'),
+            'postal': data.get('zip', ''),
+            'timezone': data.get('timezone', ''),
+            'isp': data.get('isp', '')
+        }
+    if 'loc' in data:
+        lat, lon = data['loc'].split(',')
+        return {
+            'latitude': float(lat),
+            'longitude': float(lon),
+            'city': data.get('city', 'Unknown'),
+            'region': data.get('region', 'Unknown'),
+            'country': data.get('country', 'Unknown'),
+            'postal': data.get('postal', ''),
+            'timezone': data.get('timezone', ''),
+            'isp': data.get('org', '')
+        }
+    return None
+
+
+def _query(url, timeout):
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        response = _session.get(url, timeout=timeout)
+        if response.status_code != 200:
+            outcome = f"http_{response.status_code}"
+            return None
+        location = parse_location(response.json())
+        outcome = "ok" if location is not None else "no_location"
+        return location
+    finally:
+        # Label by host only; client URLs carry the volunteer's IP
+        PROVIDER_SECONDS.observe(time.perf_counter() - started, provider=urlparse(url).hostname, outcome=outcome)
+
+
+def lookup_ip_location(providers=PROVIDERS, deadline=LOCATION_DEADLINE_SECONDS):
+    """Query every provider concurrently and return the first valid location"""
+    expires = time.monotonic() + deadline
+    pending = {_executor.submit(_query, url, deadline): url for url in providers}
+    try:
+        while pending:
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = pending.pop(future)
+                try:
+                    location = future.result()
+                except Exception as e:
+                    logging.info(f"Location provider {url} failed: {str(e)}")
+                    continue
+                if location is not None:
+                    return location
+    finally:
+        # Slower providers are abandoned; their per-request timeout ends them
+        for future in pending:
+            future.cancel()
+    return {'error': 'Unable to determine location - all IP location services failed'}
+
+
+class LocationCache:
+    """Bounded LRU cache of locations keyed by IP, with a time-to-live per entry"""
+
+    def __init__(self, max_entries=LOCATION_CACHE_SIZE, ttl=LOCATION_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Cached location for key, or None when missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, location):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), location)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            oldest = min((stored for stored, _ in self._entries.values()), default=None)
+            return {
+                "entries": len(self._entries),
+                "oldest_age_seconds": round(time.monotonic() - oldest, 1) if oldest is not None else None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+# Process-wide cache, shared by every Streamlit session in this server
+_cache = LocationCache()
+metrics.gauge(
+    "volunteer_location_cache_lookups", "Location cache lookups by result",
+    lambda: {("hit",): _cache.hits, ("miss",): _cache.misses}, ("result",)
+)
+
+
+def client_ip():
+    """Public IP of the volunteer's browser, or None when it cannot be told apart from the server"""
+    try:
+        forwarded = st.context.headers.get("X-Forwarded-For", "")
+        candidate = forwarded.split(",")[0].strip() or st.context.headers.get("X-Real-Ip") or st.context.ip_address
+    except Exception:
+        return None
+    try:
+        address = ipaddress.ip_address(str(candidate).strip())
+    except ValueError:
+        return None
+    # Private and loopback addresses mean the volunteer is on the server's own network
+    return str(address) if address.is_global else None
+
+
+def get_client_location(ip=None):
+    """Location for the client IP (or the server's own address), served from the cache when fresh"""
+    ip = ip or client_ip()
+    # The offline database answers in microseconds with no network, so it is not cached
+    database = get_ip_database()
+    if database is not None and ip is not None:
+        location = database.lookup(ip)
+        if location is not None:
+            return location
+    key = ip or "server"
+    location = _cache.get(key)
+    if location is not None:
+        return location
+    if ip is None:
+        location = lookup_ip_location()
+    else:
+        location = lookup_ip_location([url.format(ip=ip) for url in CLIENT_PROVIDERS])
+    # Failures are not cached so the next scan tries again
+    if 'error' not in location:
+        _cache.put(key, location)
+    return location
+
+
+def cache_stats():
+    """Location cache figures for health reporting"""
+    return _cache.stats()
+
+
+def browser_location(key="browser_location"):
+    """Coordinates reported by the volunteer's browser
+
+    Returns a location dict, an {'error': ...} dict when the browser refused,
+    or None while the browser has not answered yet.
+    """
+    value = _browser_location(
+        timeout_ms=BROWSER_LOCATION_TIMEOUT_MS,
+        maximum_age_ms=BROWSER_LOCATION_MAX_AGE_MS,
+        key=key,
+        default=None
+    )
+    if not value:
+        return None
+    if 'error' in value:
+        return {'error': value['error']}
+    try:
+        return {
+            'latitude': float(value['latitude']),
+            'longitude': float(value['longitude']),
+            'accuracy': float(value.get('accuracy') or 0.0),
+            'source': 'browser'
+        }
+    except (KeyError, TypeError, ValueError):
+        return {'error': 'Browser returned an unreadable position'}
+
+
+def resolve_location(browser_coords):
+    """Browser coordinates when available, otherwise the cached IP lookup"""
+    if browser_coords and 'error' not in browser_coords:
+        return browser_coords
+    return get_client_location()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Incremental volunteer hours for St. Anthony Volunteer System
+Remembers the last processed punch row and folds only new rows into running totals
+"""
+
+import argparse
+import json
+import os
+
+from shifts import normalize_name, parse_timestamp
+
+CACHE_PATH = os.getenv("VOLUNTEER_HOURS_CACHE", "hours_cache.json")
+
+
+def _empty_state(backend):
+    return {
+        "backend": backend,
+        "cursor": 0,
+        "volunteers": {},
+        "days": {},
+        "open": {}
+    }
+
+
+class HoursAggregator:
+    """Running per-volunteer and per-day totals over the punch rows"""
+
+    def __init__(self, storage, cache_path=CACHE_PATH):
+        self.storage = storage
+        self.cache_path = cache_path
+        self.state = self._load()
+
+    def refresh(self):
+        """Fold punch rows added since the last refresh; returns how many were read"""
+        rows = self.storage.read_punches(self.state["cursor"])
+        for row in rows:
+            self._fold(row)
+        self.state["cursor"] += len(rows)
+        if rows:
+            self._save()
+        return len(rows)
+
+    def reset(self):
+        """Forget the cursor and totals so the next refresh starts from the first row"""
+        self.state = _empty_state(self.storage.name)
+        self._save()
+
+    def volunteer_totals(self):
+        """(name, hours, shifts) for every volunteer, most hours first"""
+        totals = [
+            (entry["name"], entry["seconds"] / 3600, entry["shifts"])
+            for entry in self.state["volunteers"].values()
+        ]
+        return sorted(totals, key=lambda total: total[1], reverse=True)
+
+    def day_totals(self):
+        """(day, hours) for every day with a completed shift, in date order"""
+        return [(day, seconds / 3600) for day, seconds in sorted(self.state["days"].items())]
+
+    def open_shifts(self):
+        """(name, punch-in timestamp) for volunteers who have not punched out yet"""
+        return [(shift["name"], shift["since"]) for shift in self.state["open"].values()]
+
+    def _fold(self, row):
+        if len(row) < 3:
+            return
+        started = parse_timestamp(row[2])
+        if started is None:
+            return
+        key = normalize_name(row[0])
+        if row[1] == "In":
+            self.state["open"].setdefault(key, {"name": row[0].strip(), "since": row[2].strip()})
+        elif row[1] == "Out":
+            opened = self.state["open"].pop(key, None)
+            if opened is None:
+                return
+            shift_start = parse_timestamp(opened["since"])
+            seconds = max(0.0, (started - shift_start).total_seconds())
+            entry = self.state["volunteers"].setdefault(key, {"name": opened["name"], "seconds": 0.0, "shifts": 0})
+            entry["seconds"] += seconds
+            entry["shifts"] += 1
+            # Shifts count toward the day they started
+            day = shift_start.strftime("%Y-%m-%d")
+            self.state["days"][day] = self.state["days"].get(day, 0.0) + seconds
+
+    def _load(self):
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return _empty_state(self.storage.name)
+        # A cursor only means something for the backend that produced it
+        if state.get("backend") != self.storage.name:
+            return _empty_state(self.storage.name)
+        return state
+
+    def _save(self):
+        temp_path = f"{self.cache_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(temp_path, self.cache_path)
+
+
+def main():
+    """Print volunteer and daily hour totals"""
+    parser = argparse.ArgumentParser(description="Volunteer hour totals for St. Anthony Volunteer System")
+    parser.add_argument("--reset", action="store_true", help="Discard the cached totals and recount every punch")
+    args = parser.parse_args()
+
+    from storage import get_storage
+
+    aggregator = HoursAggregator(get_storage())
+    if args.reset:
+        aggregator.reset()
+    new_rows = aggregator.refresh()
+    print(f"📥 Processed {new_rows} new punch rows (cursor at row {aggregator.state['cursor']})")
+    print()
+
+    print("🙋 Hours by volunteer")
+    for name, hours, shifts in aggregator.volunteer_totals():
+        print(f"   {name:<30} {hours:6.2f} h  ({shifts} shifts)")
+    print()
+
+    print("📅 Hours by day")
+    for day, hours in aggregator.day_totals():
+        print(f"   {day}  {hours:7.2f} h")
+
+    open_shifts = aggregator.open_shifts()
+    if open_shifts:
+        print()
+        print(f"🟢 Currently punched in: {len(open_shifts)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Bulk import of paper and Google Form sign-ups from CSV
+Run with: python import_registrations.py signups.csv [--rejects rejects.csv] [--dry-run]
+
+The CSV is read in chunks; phone, email, age group, station and slot columns are normalized
+with vectorized pandas string operations, rows already registered (same phone or email) are
+skipped, and accepted rows are written with batched append_rows in the app.py form's layout.
+Every rejected row goes to the reject report with its line number and reason.
+"""
+
+import argparse
+import csv
+import logging
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from capacity import email_key, parse_registration, phone_key
+from catalog import get_catalog
+from slots import find_overlaps
+
+CHUNK_ROWS = 5000
+
+# Accepted header spellings for each field, after lowercasing and collapsing spaces to underscores
+COLUMN_ALIASES = {
+    "first_name": ("first_name", "first", "firstname", "given_name"),
+    "last_name": ("last_name", "last", "lastname", "surname", "family_name"),
+    "name": ("name", "full_name"),
+    "phone": ("phone", "cell_phone", "phone_number", "cell", "mobile"),
+    "email": ("email", "email_address", "e-mail"),
+    "age": ("age", "age_group"),
+    "station": ("station", "preferred_station"),
+    "timestamp": ("timestamp", "submitted", "submitted_at"),
+}
+REQUIRED_FIELDS = ("phone", "age", "station")
+
+EMAIL_PATTERN = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+ADULT_AGES = ("18+", "18", "adult", "over 18", "18 and over", "18-25", "26-40", "41-60", "over 60")
+MINOR_AGES = ("14-18", "14-17", "minor", "teen", "under 18")
+
+
+def normalize_columns(frame, days):
+    """Rename recognised headers to field names; day columns become lowercase day names"""
+    renames = {}
+    day_names = {day.lower(): day.lower() for day in days}
+    for column in frame.columns:
+        key = "_".join(str(column).strip().lower().split())
+        for field, aliases in COLUMN_ALIASES.items():
+            if key in aliases:
+                renames[column] = field
+        if key in day_names:
+            renames[column] = day_names[key]
+    return frame.rename(columns=renames)
+
+
+def normalize_phones(phones):
+    """'555-555-0100' for ten-digit numbers (a leading US 1 is dropped), '' otherwise"""
+    digits = phones.str.replace(r"\D", "", regex=True)
+    digits = digits.where(~((digits.str.len() == 11) & digits.str.startswith("1")), digits.str[1:])
+    valid = digits.str.len() == 10
+    formatted = digits.str[:3] + "-" + digits.str[3:6] + "-" + digits.str[6:]
+    return formatted.where(valid, "")
+
+
+def normalize_emails(emails):
+    """Lowercased address, '' when blank; invalid addresses come back as None"""
+    cleaned = emails.str.strip().str.lower()
+    valid = (cleaned == "") | cleaned.str.match(EMAIL_PATTERN)
+    return cleaned.where(valid, None)
+
+
+def normalize_ages(ages):
+    """'18+' or '14-18' (the app.py choices), '' when unrecognised; numeric ages are bucketed"""
+    cleaned = ages.str.strip().str.lower()
+    result = pd.Series("", index=ages.index)
+    result[cleaned.isin(ADULT_AGES)] = "18+"
+    result[cleaned.isin(MINOR_AGES)] = "14-18"
+    numbers = pd.to_numeric(cleaned, errors="coerce")
+    result[numbers >= 18] = "18+"
+    result[(numbers >= 14) & (numbers < 18)] = "14-18"
+    return result
+
+
+def normalize_stations(stations, catalog):
+    """Catalog station name for a name, id or label (any case), '' when unknown"""
+    lookup = {}
+    for station in catalog.stations:
+        for key in (station.name, station.id, station.label, station.title):
+            lookup[" ".join(key.lower().split())] = station.name
+    cleaned = stations.str.lower().str.split().str.join(" ")
+    return cleaned.map(lookup).fillna("")
+
+
+def normalize_slots(frame, day, catalog):
+    """Slots for one day column as the station's catalog labels joined with ', ' ('None' when empty)
+
+    Returns (labels, invalid mask) where invalid marks rows naming a slot their station doesn't offer.
+    """
+    lookup = {}
+    for station in catalog.stations:
+        for label in station.day_slots(day):
+            lookup[(station.name, " ".join(label.lower().split()))] = label
+    column = day.lower()
+    if column not in frame:
+        return pd.Series("None", index=frame.index), pd.Series(False, index=frame.index)
+
+    exploded = frame[column].str.split(r"\s*[;,]\s*(?=\d)", regex=True).explode().str.strip()
+    exploded = exploded[exploded.fillna("") != ""]
+    keys = list(zip(frame.loc[exploded.index, "station"], exploded.str.lower().str.split().str.join(" ")))
+    labels = pd.Series([lookup.get(key) for key in keys], index=exploded.index, dtype=object)
+    invalid = labels.isna().groupby(level=0).any().reindex(frame.index, fill_value=False)
+    joined = labels.dropna().groupby(level=0).agg(", ".join).reindex(frame.index, fill_value="None")
+    return joined, invalid
+
+
+def existing_keys(registration_rows, catalog):
+    """Phone digits and emails of everyone already registered"""
+    phones, emails = set(), set()
+    for row in registration_rows:
+        registration = parse_registration(row, catalog)
+        if registration is None:
+            continue
+        phone = phone_key(registration["phone"])
+        if phone:
+            phones.add(phone)
+        email = email_key(registration["email"])
+        if email:
+            emails.add(email)
+    return phones, emails
+
+
+def prepare_chunk(chunk, catalog, seen_phones, seen_emails, first_line):
+    """Normalize one chunk; returns (accepted rows, rejected frame with line and reason columns)
+
+    seen_phones and seen_emails are updated with the accepted rows, so later chunks dedupe against them.
+    """
+    frame = normalize_columns(chunk, catalog.days).fillna("").astype(str)
+    frame["line"] = range(first_line, first_line + len(frame))
+    if "first_name" not in frame and "name" in frame:
+        parts = frame["name"].str.strip().str.split(n=1, expand=True).reindex(columns=[0, 1])
+        frame["first_name"] = parts[0].fillna("")
+        frame["last_name"] = parts[1].fillna("")
+    for field in ("first_name", "last_name", "email", "timestamp"):
+        if field not in frame:
+            frame[field] = ""
+
+    frame["first_name"] = frame["first_name"].str.strip()
+    frame["last_name"] = frame["last_name"].str.strip()
+    frame["phone"] = normalize_phones(frame["phone"])
+    frame["email"] = normalize_emails(frame["email"])
+    frame["age"] = normalize_ages(frame["age"])
+    frame["station"] = normalize_stations(frame["station"], catalog)
+
+    reason = pd.Series("", index=frame.index)
+
+    def reject(mask, text):
+        reason[mask & (reason == "")] = text
+
+    reject(frame["first_name"] == "", "missing name")
+    reject(frame["phone"] == "", "invalid phone")
+    reject(frame["email"].isna(), "invalid email")
+    reject(frame["age"] == "", "unrecognised age group")
+    reject(frame["station"] == "", "unknown station")
+    adults_only = [station.name for station in catalog.stations if station.adults_only]
+    reject(frame["station"].isin(adults_only) & (frame["age"] == "14-18"), "station is 18+ only")
+
+    any_slots = pd.Series(False, index=frame.index)
+    for day in catalog.days:
+        labels, invalid = normalize_slots(frame, day, catalog)
+        frame[day] = labels
+        reject(invalid, f"unknown {day} slot")
+        any_slots |= labels != "None"
+        overlapping = labels.map(lambda value: value != "None" and bool(find_overlaps(value.split(", "))))
+        reject(overlapping, f"overlapping {day} slots")
+    reject(~any_slots, "no time slots")
+
+    # Duplicates against earlier rows of the file and existing registrations, by phone or email
+    phone_digits = frame["phone"].str.replace("-", "", regex=False)
+    emails = frame["email"].fillna("")
+    pending = reason == ""
+    duplicate = (
+        phone_digits.isin(seen_phones)
+        | (emails.ne("") & emails.isin(seen_emails))
+        | (pending & phone_digits.where(pending).duplicated())
+        | (pending & emails.ne("") & emails.where(pending & emails.ne("")).duplicated())
+    )
+    reject(duplicate, "already registered")
+
+    accepted = frame[reason == ""]
+    seen_phones.update(phone_digits[accepted.index])
+    seen_emails.update(email for email in emails[accepted.index] if email)
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    timestamps = accepted["timestamp"].where(accepted["timestamp"].str.strip() != "", now)
+    columns = [accepted["first_name"], accepted["last_name"], accepted["phone"], accepted["email"].fillna(""),
+               accepted["age"], accepted["station"]] + [accepted[day] for day in catalog.days] + [timestamps]
+    rows = [list(values) for values in zip(*columns)]
+
+    rejected = chunk.loc[reason != ""].copy()
+    rejected.insert(0, "reason", reason[reason != ""])
+    rejected.insert(0, "line", frame.loc[reason != "", "line"])
+    return rows, rejected
+
+
+def import_registrations(path, storage, rejects_path=None, chunk_rows=CHUNK_ROWS, dry_run=False, catalog=None):
+    """Import a CSV into storage; returns {"read", "accepted", "written", "rejected"} counts"""
+    catalog = catalog or get_catalog()
+    seen_phones, seen_emails = existing_keys(storage.list_registrations(), catalog)
+    counts = {"read": 0, "accepted": 0, "written": 0, "rejected": 0}
+    reject_writer = None
+    reject_file = open(rejects_path, "w", newline="", encoding="utf-8") if rejects_path else None
+    try:
+        # Line 1 is the header
+        line = 2
+        for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_rows):
+            missing = [field for field in REQUIRED_FIELDS if field not in normalize_columns(chunk.head(0), catalog.days)]
+            if missing:
+                raise ValueError(f"{path} is missing required columns: {', '.join(missing)}")
+            rows, rejected = prepare_chunk(chunk, catalog, seen_phones, seen_emails, line)
+            line += len(chunk)
+            counts["read"] += len(chunk)
+            counts["accepted"] += len(rows)
+            counts["rejected"] += len(rejected)
+
+            if rows and not dry_run:
+                written = storage.record_registrations(rows)
+                counts["written"] += written
+                if written < len(rows):
+                    logging.error(f"Import stopped: {len(rows) - written} accepted rows from {path} were not written")
+                    break
+
+            if reject_file is not None and len(rejected):
+                if reject_writer is None:
+                    reject_writer = csv.writer(reject_file)
+                    reject_writer.writerow(list(rejected.columns))
+                reject_writer.writerows(rejected.itertuples(index=False, name=None))
+    finally:
+        if reject_file is not None:
+            reject_file.close()
+    return counts
+
+
+def main():
+    """Import a CSV of sign-ups into the configured storage backend"""
+    from log_setup import configure_logging
+    from storage import get_storage
+
+    parser = argparse.ArgumentParser(description="Import volunteer registrations from a CSV file")
+    parser.add_argument("csv", help="CSV with phone, age, station and day columns (first/last name or name, email optional)")
+    parser.add_argument("--rejects", default="rejected_registrations.csv", help="Reject report path (default: rejected_registrations.csv)")
+    parser.add_argument("--chunk-rows", dest="chunk_rows", type=int, default=CHUNK_ROWS, help=f"Rows per chunk (default: {CHUNK_ROWS})")
+    parser.add_argument("--dry-run", dest="dry_run", action="store_true", help="Validate and write the reject report without storing anything")
+    args = parser.parse_args()
+
+    configure_logging()
+    started = time.perf_counter()
+    counts = import_registrations(args.csv, get_storage(), args.rejects, args.chunk_rows, args.dry_run)
+    elapsed = time.perf_counter() - started
+    logging.info(f"Imported {args.csv}: {counts}")
+    print(f"📥 {counts['read']} rows read in {elapsed:.1f}s")
+    print(f"✅ {counts['accepted']} accepted, {counts['written']} written{' (dry run)' if args.dry_run else ''}")
+    print(f"❌ {counts['rejected']} rejected, see {args.rejects}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Offline IP-to-location database for deployments without reliable internet
+CIDR blocks from a CSV are loaded into array-backed binary radix tries, one per IP version
+Point VOLUNTEER_IP_DATABASE at a CSV with columns network,latitude,longitude,city,region,country
+"""
+
+import csv
+import ipaddress
+import logging
+import os
+import socket
+import threading
+from array import array
+
+IP_DATABASE_PATH = os.getenv("VOLUNTEER_IP_DATABASE", "")
+
+
+class CidrTrie:
+    """Binary trie over address bits stored in parallel int arrays; longest-prefix lookups"""
+
+    def __init__(self, bits):
+        self.bits = bits
+        # Node 0 is the root; 0 in a child slot means "no child" since the root is never a child
+        self._zero = array("i", [0])
+        self._one = array("i", [0])
+        self._value = array("i", [-1])
+
+    def __len__(self):
+        return len(self._value)
+
+    def insert(self, network, prefix_length, value):
+        """Store value for the block whose first address is the integer network"""
+        zero, one, values = self._zero, self._one, self._value
+        node = 0
+        for shift in range(self.bits - 1, self.bits - 1 - prefix_length, -1):
+            children = one if (network >> shift) & 1 else zero
+            child = children[node]
+            if child == 0:
+                child = len(values)
+                zero.append(0)
+                one.append(0)
+                values.append(-1)
+                children[node] = child
+            node = child
+        values[node] = value
+
+    def lookup(self, address):
+        """Value of the most specific block containing the integer address, or -1"""
+        zero, one, values = self._zero, self._one, self._value
+        node = 0
+        found = values[0]
+        for shift in range(self.bits - 1, -1, -1):
+            node = one[node] if (address >> shift) & 1 else zero[node]
+            if node == 0:
+                break
+            if values[node] != -1:
+                found = values[node]
+        return found
+
+
+class IPDatabase:
+    """IPv4 and IPv6 CIDR tries sharing one list of (latitude, longitude, city, region, country) records"""
+
+    def __init__(self):
+        self._tries = {4: CidrTrie(32), 6: CidrTrie(128)}
+        self._records = []
+
+    def __len__(self):
+        return len(self._records)
+
+    def add(self, network, latitude, longitude, city='Unknown', region='Unknown', country='Unknown'):
+        """Add a CIDR block given as 'address/prefix'"""
+        version, address, prefix_length = parse_cidr(network)
+        self._records.append((float(latitude), float(longitude), city, region, country))
+        self._tries[version].insert(address, prefix_length, len(self._records) - 1)
+
+    def lookup(self, ip):
+        """Location dict for ip, or None when no block covers it"""
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return None
+        found = self._tries[address.version].lookup(int(address))
+        if found == -1:
+            return None
+        latitude, longitude, city, region, country = self._records[found]
+        return {
+            'latitude': latitude,
+            'longitude': longitude,
+            'city': city,
+            'region': region,
+            'country': country,
+            'postal': '',
+            'timezone': '',
+            'isp': '',
+            'source': 'database'
+        }
+
+    @classmethod
+    def load(cls, path):
+        """Build a database from a CSV of CIDR blocks; malformed rows are skipped"""
+        database = cls()
+        skipped = 0
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            try:
+                columns = [header.index(column) for column in ("network", "latitude", "longitude")]
+            except ValueError:
+                raise ValueError(f"IP database {path} needs network, latitude and longitude columns")
+            # City, region and country are optional
+            optional = [header.index(column) if column in header else None for column in ("city", "region", "country")]
+            for row in reader:
+                try:
+                    labels = [row[index] or 'Unknown' if index is not None else 'Unknown' for index in optional]
+                    database.add(row[columns[0]], row[columns[1]], row[columns[2]], *labels)
+                except (IndexError, ValueError, OSError):
+                    skipped += 1
+        if skipped:
+            logging.warning(f"IP database {path}: skipped {skipped} malformed rows")
+        return database
+
+
+def parse_cidr(network):
+    """(version, first address as int, prefix length) for an 'address/prefix' string"""
+    address, _, prefix = network.strip().partition("/")
+    if ":" not in address:
+        # IPv4 fast path; inet_aton is far cheaper than ipaddress for bulk loads
+        prefix_length = int(prefix) if prefix else 32
+        if not 0 <= prefix_length <= 32 or address.count(".") != 3:
+            raise ValueError(f"Invalid IPv4 network {network}")
+        value = int.from_bytes(socket.inet_aton(address), "big")
+        return 4, value & ~((1 << (32 - prefix_length)) - 1) & 0xFFFFFFFF, prefix_length
+    parsed = ipaddress.ip_network(network.strip(), strict=False)
+    return parsed.version, int(parsed.network_address), parsed.prefixlen
+
+
+# Process-wide database, loaded once on first use
+_database = None
+_database_loaded = False
+_database_lock = threading.Lock()
+
+
+def get_ip_database():
+    """Return the process-wide IP database, or None when none is configured or it failed to load"""
+    global _database, _database_loaded
+    with _database_lock:
+        if not _database_loaded:
+            _database_loaded = True
+            if IP_DATABASE_PATH:
+                try:
+                    _database = IPDatabase.load(IP_DATABASE_PATH)
+                    logging.info(f"IP database loaded: {len(_database)} ranges from {IP_DATABASE_PATH}")
+                except (OSError, ValueError) as e:
+                    logging.warning(f"Could not load IP database {IP_DATABASE_PATH}: {str(e)}")
+        return _database
@@ -0,0 +1,159 @@
+"""
+Local SQLite journal for punches and registrations
+Every record is committed here first and synced to Google Sheets in the background
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # No flock on Windows; there a journal file must only be synced by one process
+    fcntl = None
+
+JOURNAL_PATH = os.getenv("VOLUNTEER_JOURNAL_PATH", "volunteer_journal.db")
+
+# Record kinds, one watermark each
+PUNCH = "punch"
+REGISTRATION = "registration"
+
+
+class Journal:
+    """Append-only record journal in WAL mode with a synced watermark per kind"""
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL + NORMAL keeps commits to a few microseconds while surviving process crashes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                row TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_kind_id ON entries (kind, id)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS watermarks (
+                kind TEXT PRIMARY KEY,
+                synced_id INTEGER NOT NULL
+            )
+        """)
+
+    def append(self, kind, row):
+        """Commit one row and return its journal id"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO entries (kind, row, created_at) VALUES (?, ?, ?)",
+                (kind, json.dumps(list(row)), time.time())
+            )
+            return cursor.lastrowid
+
+    def append_many(self, kind, rows):
+        """Commit rows in one transaction"""
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT INTO entries (kind, row, created_at) VALUES (?, ?, ?)",
+                    [(kind, json.dumps(list(row)), now) for row in rows]
+                )
+
+    def replace(self, kind, position, row):
+        """Overwrite the row at position among rows of kind; False if there is no such row"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE entries SET row = ? WHERE id = "
+                "(SELECT id FROM entries WHERE kind = ? ORDER BY id LIMIT 1 OFFSET ?)",
+                (json.dumps(list(row)), kind, position)
+            )
+            return cursor.rowcount == 1
+
+    def unsynced(self, kind, limit):
+        """Oldest rows past the watermark, as (id, row) pairs"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT id, row FROM entries WHERE kind = ? AND id > ? ORDER BY id LIMIT ?",
+                (kind, self._watermark(kind), limit)
+            )
+            return [(entry_id, json.loads(row)) for entry_id, row in cursor.fetchall()]
+
+    def mark_synced(self, kind, entry_id):
+        """Advance the watermark for kind to entry_id"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO watermarks (kind, synced_id) VALUES (?, ?) "
+                "ON CONFLICT(kind) DO UPDATE SET synced_id = MAX(synced_id, excluded.synced_id)",
+                (kind, entry_id)
+            )
+
+    def pending_count(self, kind):
+        """Number of rows not yet synced"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT COUNT(*) FROM entries WHERE kind = ? AND id > ?",
+                (kind, self._watermark(kind))
+            )
+            return cursor.fetchone()[0]
+
+    def rows(self, kind, offset=0):
+        """Journaled rows of kind, oldest first, skipping the first offset rows"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT row FROM entries WHERE kind = ? ORDER BY id LIMIT -1 OFFSET ?", (kind, offset)
+            )
+            return [json.loads(row) for (row,) in cursor.fetchall()]
+
+    @contextmanager
+    def sync_lock(self, kind):
+        """Non-blocking claim on syncing rows of kind, exclusive across every process sharing this file
+
+        Yields True when claimed. Whoever holds it reads the watermark, writes and advances it,
+        so two processes opening the same journal never send the same rows.
+        """
+        if fcntl is None or self.path == ":memory:":
+            yield True
+            return
+        with open(f"{self.path}.{kind}.lock", "a") as handle:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _watermark(self, kind):
+        cursor = self._conn.execute("SELECT synced_id FROM watermarks WHERE kind = ?", (kind,))
+        found = cursor.fetchone()
+        return found[0] if found else 0
+
+
+# Process-wide journal, shared by every Streamlit session in this server
+_journal = None
+_journal_lock = threading.Lock()
+
+
+def get_journal():
+    """Return the process-wide journal, opening it on first use"""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = Journal()
+        return _journal
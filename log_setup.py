@@ -0,0 +1,115 @@
+"""
+Process-wide logging for St. Anthony Volunteer System
+Log calls only enqueue the record; a background listener formats it and writes the rotating log file
+Structured events (see events.py) share the queue and go to their own JSON Lines file
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+
+LOG_FILE = os.getenv("VOLUNTEER_LOG_FILE", "volunteer_system.log")
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+EVENTS_FILE = os.getenv("VOLUNTEER_EVENTS_FILE", "volunteer_events.jsonl")
+EVENT_LOGGER = "volunteer.events"
+
+# Process start, for uptime in health reports (every page configures logging first)
+PROCESS_STARTED_AT = time.time()
+
+# Rotate at LOG_MAX_BYTES, keeping LOG_BACKUP_COUNT old files
+LOG_MAX_BYTES = int(os.getenv("VOLUNTEER_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("VOLUNTEER_LOG_BACKUP_COUNT", "5"))
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread
+
+    The stock prepare() formats every record in the caller's thread; here only
+    %-style arguments are merged so the record is safe to hand to another thread.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line for records whose message is a dict"""
+
+    def format(self, record):
+        if isinstance(record.msg, dict):
+            return json.dumps(record.msg, default=str)
+        return json.dumps({"message": record.getMessage()})
+
+
+def _is_event(record):
+    return record.name == EVENT_LOGGER
+
+
+def _is_not_event(record):
+    return record.name != EVENT_LOGGER
+
+
+# Process-wide listener, started once no matter how many pages configure logging
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def configure_logging(level=logging.INFO):
+    """Route the root logger through a queue to the console and the rotating log file"""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            return
+        formatter = logging.Formatter(LOG_FORMAT)
+        handlers = [logging.StreamHandler()]
+        # Streamlit Community Cloud has no persistent disk, so log to the console only
+        if not os.getenv('STREAMLIT_SHARING'):
+            handlers.append(logging.handlers.RotatingFileHandler(
+                LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+            ))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+            handler.addFilter(_is_not_event)
+
+        # Structured events stay out of the text log and go to their own file
+        if not os.getenv('STREAMLIT_SHARING'):
+            events_handler = logging.handlers.RotatingFileHandler(
+                EVENTS_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+            )
+        else:
+            events_handler = logging.StreamHandler()
+        events_handler.setFormatter(JsonFormatter())
+        events_handler.addFilter(_is_event)
+        handlers.append(events_handler)
+
+        log_queue = queue.SimpleQueue()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(DeferredQueueHandler(log_queue))
+        root.setLevel(level)
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+
+
+def shutdown_logging():
+    """Flush queued records to the handlers and stop the listener"""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(shutdown_logging)
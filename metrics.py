@@ -0,0 +1,259 @@
+"""
+Counters and histograms exported in Prometheus text format
+Set VOLUNTEER_METRICS_FILE to write the exposition to a file (for node_exporter's textfile collector)
+and/or VOLUNTEER_METRICS_PORT to serve it at http://<host>:<port>/metrics
+"""
+
+import atexit
+import bisect
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_FILE = os.getenv("VOLUNTEER_METRICS_FILE", "volunteer_metrics.prom")
+METRICS_PORT = int(os.getenv("VOLUNTEER_METRICS_PORT", "0"))
+METRICS_INTERVAL_SECONDS = 15
+
+# Latency buckets in seconds, from a cache hit up to a slow Sheets call
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_text(labelnames, values):
+    if not labelnames:
+        return ""
+    pairs = []
+    for name, value in zip(labelnames, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, one series per label combination"""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, _label_text(self.labelnames, key), value) for key, value in sorted(self._values.items())]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with sum and count, one series per label combination"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            return series[2] if series else 0
+
+    def samples(self):
+        lines = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    labels = _label_text(self.labelnames + ("le",), key + (_number(bound),))
+                    lines.append((f"{self.name}_bucket", labels, cumulative))
+                labels = _label_text(self.labelnames, key)
+                lines.append((f"{self.name}_sum", labels, total))
+                lines.append((f"{self.name}_count", labels, count))
+        return lines
+
+
+class Gauge:
+    """Value read from a callback at export time; the callback returns a number or {labels tuple: number}"""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, callback, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.callback = callback
+        self.labelnames = tuple(labelnames)
+
+    def samples(self):
+        try:
+            value = self.callback()
+        except Exception as e:
+            logging.warning(f"Metric {self.name} callback failed: {str(e)}")
+            return []
+        if value is None:
+            return []
+        if isinstance(value, dict):
+            return [(self.name, _label_text(self.labelnames, key), number) for key, number in sorted(value.items())]
+        return [(self.name, "", value)]
+
+
+class Registry:
+    """Named metrics, rendered together in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Add metric, or return the one already registered under its name"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry, shared by every Streamlit session in this server
+REGISTRY = Registry()
+
+
+def counter(name, help_text, labelnames=()):
+    return REGISTRY.register(Counter(name, help_text, labelnames))
+
+
+def histogram(name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return REGISTRY.register(Histogram(name, help_text, labelnames, buckets))
+
+
+def gauge(name, help_text, callback, labelnames=()):
+    return REGISTRY.register(Gauge(name, help_text, callback, labelnames))
+
+
+def write_metrics(path=None):
+    """Write the exposition atomically so scrapers never read a partial file"""
+    path = path or METRICS_FILE
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(REGISTRY.render())
+    os.replace(temp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would drown the application log
+        pass
+
+
+def _write_loop():
+    while True:
+        time.sleep(METRICS_INTERVAL_SECONDS)
+        try:
+            write_metrics()
+        except OSError as e:
+            logging.warning(f"Could not write metrics file {METRICS_FILE}: {str(e)}")
+
+
+# Exporters start once per process, on the first recorded metric
+_exporter_started = False
+_exporter_lock = threading.Lock()
+
+
+def start_exporter():
+    """Start the metrics file writer and/or HTTP endpoint if configured"""
+    global _exporter_started
+    with _exporter_lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+        if METRICS_FILE:
+            threading.Thread(target=_write_loop, name="metrics-file", daemon=True).start()
+            atexit.register(write_metrics)
+        if METRICS_PORT:
+            try:
+                server = ThreadingHTTPServer(("0.0.0.0", METRICS_PORT), _MetricsHandler)
+            except OSError as e:
+                logging.warning(f"Could not serve metrics on port {METRICS_PORT}: {str(e)}")
+                return
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+            logging.info(f"Serving metrics at http://0.0.0.0:{METRICS_PORT}/metrics")
+
+
+# Metrics recorded from structured events (see events.py)
+EVENTS_TOTAL = counter(
+    "volunteer_events_total", "Punches, registrations, health checks and Sheets calls by outcome",
+    ("event", "action", "outcome")
+)
+EVENT_SECONDS = histogram(
+    "volunteer_event_duration_seconds", "Wall-clock duration of each event",
+    ("event", "action")
+)
+PHASE_SECONDS = histogram(
+    "volunteer_phase_duration_seconds", "Duration of each phase within an event (render, validation, geolocation, storage_write, ...)",
+    ("event", "phase")
+)
+
+
+def observe_event(event):
+    """Fold one structured event into the counters and histograms"""
+    start_exporter()
+    kind = event["event"]
+    action = event.get("action") or ""
+    EVENTS_TOTAL.inc(event=kind, action=action, outcome=event["outcome"])
+    if event.get("duration_ms") is not None:
+        EVENT_SECONDS.observe(event["duration_ms"] / 1000, event=kind, action=action)
+    for phase, ms in (event.get("phases") or {}).items():
+        PHASE_SECONDS.observe(ms / 1000, event=kind, phase=phase)
@@ -0,0 +1,149 @@
+"""
+Opt-in per-rerun profiling for Streamlit pages
+Enable with VOLUNTEER_PROFILE=1 or ?profile=1; named sections of each rerun are timed and
+aggregated per page into a folded-stack flame file and a summary table under PROFILE_DIR
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+import streamlit as st
+
+PROFILE_DIR = os.getenv("VOLUNTEER_PROFILE_DIR", "profiles")
+PROFILE_ENV = os.getenv("VOLUNTEER_PROFILE", "") not in ("", "0", "false")
+
+
+class PageProfile:
+    """Aggregated section timings for one page across every profiled rerun in this process"""
+
+    def __init__(self, page):
+        self.page = page
+        self.reruns = 0
+        # "rerun;section;subsection" -> [calls, total seconds, max seconds]
+        self.stacks = {}
+        self._lock = threading.Lock()
+
+    def add(self, timings):
+        with self._lock:
+            self.reruns += 1
+            for stack, seconds in timings:
+                entry = self.stacks.setdefault(stack, [0, 0.0, 0.0])
+                entry[0] += 1
+                entry[1] += seconds
+                entry[2] = max(entry[2], seconds)
+
+    def folded(self):
+        """Folded stacks (one 'a;b;c microseconds' line each) with self time, for flamegraph tools"""
+        with self._lock:
+            totals = {stack: entry[1] for stack, entry in self.stacks.items()}
+        lines = []
+        for stack, total in sorted(totals.items()):
+            children = sum(value for other, value in totals.items()
+                           if other.startswith(stack + ";") and ";" not in other[len(stack) + 1:])
+            self_time = max(0.0, total - children)
+            lines.append(f"{stack} {round(self_time * 1e6)}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Per-section table, slowest first"""
+        with self._lock:
+            reruns = self.reruns
+            rows = sorted(self.stacks.items(), key=lambda item: item[1][1], reverse=True)
+        lines = [f"Page {self.page}: {reruns} profiled reruns",
+                 f"{'section':<56} {'calls':>6} {'mean ms':>9} {'max ms':>9} {'per rerun ms':>13}"]
+        for stack, (calls, total, longest) in rows:
+            lines.append(f"{stack:<56} {calls:>6} {total / calls * 1000:9.3f} {longest * 1000:9.3f} "
+                         f"{total / max(reruns, 1) * 1000:13.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory=None):
+        directory = directory or PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        for suffix, content in (("folded", self.folded()), ("txt", self.summary())):
+            path = os.path.join(directory, f"{self.page}.{suffix}")
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(temp_path, path)
+
+
+class Profiler:
+    """Times nested sections of a single rerun"""
+
+    def __init__(self, page):
+        self.page = page
+        self.started = time.perf_counter()
+        self.timings = []
+        self._stack = ["rerun"]
+
+    @contextmanager
+    def section(self, name):
+        self._stack.append(name)
+        path = ";".join(self._stack)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings.append((path, time.perf_counter() - started))
+            self._stack.pop()
+
+    def finish(self):
+        """Fold this rerun into the page profile and rewrite its files"""
+        self.timings.append(("rerun", time.perf_counter() - self.started))
+        profile = _page_profile(self.page)
+        profile.add(self.timings)
+        try:
+            profile.write()
+        except OSError as e:
+            logging.warning(f"Could not write profile for {self.page}: {str(e)}")
+
+
+class _DisabledProfiler:
+    """Stand-in when profiling is off; sections cost one attribute lookup"""
+
+    def section(self, name):
+        return nullcontext()
+
+    def finish(self):
+        pass
+
+
+_DISABLED = _DisabledProfiler()
+
+# Process-wide page profiles; the running profiler is per script thread (one per session rerun)
+_profiles = {}
+_profiles_lock = threading.Lock()
+_current = threading.local()
+
+
+def _page_profile(page):
+    with _profiles_lock:
+        profile = _profiles.get(page)
+        if profile is None:
+            profile = _profiles[page] = PageProfile(page)
+        return profile
+
+
+def profiling_enabled():
+    """True when VOLUNTEER_PROFILE is set or the URL carries ?profile=1"""
+    if PROFILE_ENV:
+        return True
+    try:
+        return st.query_params.get("profile") in ("1", "true")
+    except Exception:
+        return False
+
+
+def start_profile(page):
+    """Begin timing this rerun of page; returns a profiler whose sections are no-ops when disabled"""
+    profiler = Profiler(page) if profiling_enabled() else _DISABLED
+    _current.profiler = profiler
+    return profiler
+
+
+def section(name):
+    """Time a block under the profiler started for this rerun, if any"""
+    return getattr(_current, "profiler", _DISABLED).section(name)
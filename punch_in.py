@@ -5,29 +5,18 @@ QR Code Punch In System for Volunteers
 
 import streamlit as st
 from datetime import datetime
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import random
 import logging
-import os
+from events import Event
+from log_setup import configure_logging
+from sheets import is_configured as sheets_configured
+from shifts import get_shift_index
+from storage import get_storage
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('volunteer_system.log') if not os.getenv('STREAMLIT_SHARING') else logging.StreamHandler()
-    ]
-)
+configure_logging()
 
 # Config
-CHURCH_LOCATION = (39.8637, -74.8284)
-MAX_DISTANCE_METERS = 50000  # 50km for testing
-SHEET_NAME = "Volunteer Hours"
-PUNCH_SHEET = "Sheet1"
-REGISTRATION_SHEET = "Registration"
-
 volunteer_verses = [
     "Each of you should use whatever gift you have received to serve others, as faithful stewards of God's grace. — 1 Peter 4:10",
     "Whatever you do, work at it with all your heart, as working for the Lord, not for human masters. — Colossians 3:23",
@@ -36,24 +25,9 @@ volunteer_verses = [
     "Carry each other's burdens, and in this way you will fulfill the law of Christ. — Galatians 6:2"
 ]
 
-# Google Sheets Connection
-try:
-    scope = ["https://www.googleapis.com/auth/spreadsheets","https://www.googleapis.com/auth/drive"]
-    if hasattr(st, 'secrets') and "gcp_service_account" in st.secrets:
-        import json
-        account_info = json.loads(st.secrets["gcp_service_account"])
-        auth_creds = ServiceAccountCredentials.from_json_keyfile_dict(account_info, scope)
-    else:
-        auth_creds = ServiceAccountCredentials.from_json_keyfile_name("service_account.json", scope)
-    client = gspread.authorize(auth_creds)
-    punch_sheet = client.open(SHEET_NAME).worksheet(PUNCH_SHEET)
-    reg_sheet = client.open(SHEET_NAME).worksheet(REGISTRATION_SHEET)
-    SHEETS_ENABLED = True
-except Exception as e:
-    # Google Sheets not connected - app will store data locally for display
-    SHEETS_ENABLED = False
-    punch_sheet = None
-    reg_sheet = None
+# Google Sheets Connection (authorized lazily once per server process, see sheets.py)
+# Punches go through the storage backend, which connects to Sheets on its own
+SHEETS_ENABLED = sheets_configured()
 
 def get_common_css():
     """Return common CSS styling"""
@@ -154,11 +128,21 @@ def get_common_css():
 </style>
 """
 
+@st.cache_resource
+def load_logo():
+    """Logo bytes, read from disk once per server process"""
+    try:
+        with open("stanthonylogo.png", "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
 def display_logo():
     """Display the church logo"""
-    try:
-        st.image("stanthonylogo.png", width=150)
-    except:
+    logo = load_logo()
+    if logo:
+        st.image(logo, width=150)
+    else:
         st.markdown("### ⛪ St. Anthony Coptic Orthodox Church")
 
 def get_random_verse():
@@ -186,45 +170,61 @@ st.markdown('<div class="punch-in-panel">', unsafe_allow_html=True)
 st.markdown('<div class="panel-header punch-in-header">🟢 PUNCH IN</div>', unsafe_allow_html=True)
 st.markdown('<p style="text-align: center; color: #155724; margin-bottom: 20px; font-size: 18px;">Start your volunteer service at St. Anthony</p>', unsafe_allow_html=True)
 
-# Name input
-name = st.text_input("Full Name*", key="punch_in_name", placeholder="Enter your full name")
-
-if name:
-    # Punch In Button
-    if st.button("🟢 Punch In Now", key="punch_in_btn", use_container_width=True):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Save to Google Sheets
-        if SHEETS_ENABLED:
-            try:
-                punch_sheet.append_row([name, "In", timestamp])
+# Punch Form
+# A fragment, so typing a name or pressing the button reruns only this form, not the logo, CSS and instructions
+@st.fragment
+def punch_in_form():
+    """Name input and punch button"""
+    # Request timing, emitted as a structured event when a punch is submitted
+    punch_event = Event("punch", action="In", page="punch_in")
+
+    # Name input
+    name = st.text_input("Full Name*", key="punch_in_name", placeholder="Enter your full name")
+
+    if name:
+        # Punch In Button
+        if st.button("🟢 Punch In Now", key="punch_in_btn", use_container_width=True):
+            punch_event.mark("render")
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+            with punch_event.phase("shift_index"):
+                shift_index = get_shift_index()
+            # Saved through the configured storage backend (journaled and synced for Sheets)
+            with punch_event.phase("storage_write"):
+                saved = get_storage().record_punch(name, "In", timestamp)
+            if saved:
                 st.success(f"👋 Welcome {name}! You've successfully punched in. 🌟")
                 logging.info(f"Punch IN: {name} - {timestamp}")
-                
+                previous_start = shift_index.punch_in(name, timestamp) if shift_index is not None else None
+                if previous_start is not None:
+                    st.info(f"ℹ️ You were already punched in since {previous_start.strftime('%I:%M %p')}.")
+                if not SHEETS_ENABLED:
+                    st.info(f"📝 Punch data: {name} - In - {timestamp}")
+                    st.info("📋 Google Sheets not connected - using local storage")
+
                 # Show balloons animation
                 st.balloons()
-                
-            except Exception as e:
-                st.error(f"❌ Failed to save punch in: {str(e)}")
+            else:
+                st.error("❌ Your punch in could not be saved.")
                 st.info(f"📝 Manual record: {name} - In - {timestamp}")
                 st.info("💡 Please inform the volunteer coordinator of this punch in.")
-        else:
-            st.success(f"👋 Welcome {name}! You've successfully punched in. 🌟")
-            st.info(f"📝 Punch data: {name} - In - {timestamp}")
-            st.info("📋 Google Sheets not connected - using local storage")
-        
-        # Show inspirational verse
-        verse = get_random_verse()
-        st.info(f"📖 Verse for you: {verse}")
-        
-        # Additional encouragement
-        st.markdown("### 🙏 Thank you for serving!")
-        st.markdown("Your service makes a difference in our community. May God bless your volunteer work today!")
-        
-else:
-    st.info("📝 Please enter your name to punch in.")
-    st.markdown("### ✨ Welcome Volunteer!")
-    st.markdown("You're about to start your volunteer service. Thank you for dedicating your time to serve others!")
+                logging.error(f"Punch IN not saved: {name} - {timestamp}")
+
+            # Show inspirational verse
+            verse = get_random_verse()
+            st.info(f"📖 Verse for you: {verse}")
+            punch_event.emit("saved" if saved else "failed")
+
+            # Additional encouragement
+            st.markdown("### 🙏 Thank you for serving!")
+            st.markdown("Your service makes a difference in our community. May God bless your volunteer work today!")
+
+    else:
+        st.info("📝 Please enter your name to punch in.")
+        st.markdown("### ✨ Welcome Volunteer!")
+        st.markdown("You're about to start your volunteer service. Thank you for dedicating your time to serve others!")
+
+punch_in_form()
 
 st.markdown('</div>', unsafe_allow_html=True)
 
@@ -0,0 +1,139 @@
+"""
+Quota-aware rate limiting and retries for Google Sheets calls
+Every Sheets API call goes through call_sheets so bursts stay under the per-minute quota
+"""
+
+import logging
+import random
+import threading
+import time
+
+from events import Event
+
+# Google Sheets allows 60 read and 60 write requests per minute per user
+READ_REQUESTS_PER_MINUTE = 60
+WRITE_REQUESTS_PER_MINUTE = 60
+
+# Retries use full-jitter exponential backoff between BASE and MAX delay
+MAX_ATTEMPTS = 5
+BASE_RETRY_DELAY_SECONDS = 1.0
+MAX_RETRY_DELAY_SECONDS = 32.0
+
+# Retry budget: each call earns RETRY_BUDGET_RATIO retries, capped at RETRY_BUDGET_MAX
+RETRY_BUDGET_RATIO = 0.2
+RETRY_BUDGET_MAX = 20.0
+
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at rate tokens per second"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available; returns the seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class RetryBudget:
+    """Caps retries to a fraction of calls so an outage does not multiply traffic"""
+
+    def __init__(self, ratio=RETRY_BUDGET_RATIO, maximum=RETRY_BUDGET_MAX):
+        self.ratio = ratio
+        self.maximum = maximum
+        self._balance = maximum
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._balance = min(self.maximum, self._balance + self.ratio)
+
+    def withdraw(self):
+        """Spend one retry; False when the budget is exhausted"""
+        with self._lock:
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+
+
+def is_retryable(error):
+    """Rate limits, server errors and network failures are worth retrying"""
+    import gspread
+    import requests
+
+    if isinstance(error, gspread.exceptions.APIError):
+        return error.response.status_code in RETRYABLE_STATUS
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff for the given retry attempt (1-based)"""
+    return random.uniform(0, min(MAX_RETRY_DELAY_SECONDS, BASE_RETRY_DELAY_SECONDS * 2 ** (attempt - 1)))
+
+
+# Process-wide limiter state, shared by every Streamlit session in this server
+_read_bucket = TokenBucket(READ_REQUESTS_PER_MINUTE / 60, READ_REQUESTS_PER_MINUTE / 6)
+_write_bucket = TokenBucket(WRITE_REQUESTS_PER_MINUTE / 60, WRITE_REQUESTS_PER_MINUTE / 6)
+_budget = RetryBudget()
+_counters = {"calls": 0, "throttled": 0, "retried": 0, "failed": 0}
+_counters_lock = threading.Lock()
+
+
+def _count(name):
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def call_sheets(fn, *args, write=False, **kwargs):
+    """Call a gspread function under the read or write quota, retrying transient errors"""
+    bucket = _write_bucket if write else _read_bucket
+    call_event = Event("sheets_call", call=getattr(fn, '__name__', 'call'), write=write)
+    attempt = 0
+    _count("calls")
+    while True:
+        attempt += 1
+        with call_event.phase("throttle"):
+            waited = bucket.acquire()
+        if waited > 0:
+            _count("throttled")
+        try:
+            with call_event.phase("request"):
+                result = fn(*args, **kwargs)
+        except Exception as e:
+            if not is_retryable(e) or attempt >= MAX_ATTEMPTS or not _budget.withdraw():
+                _count("failed")
+                call_event.emit("failed", attempts=attempt, error=str(e))
+                raise
+            delay = backoff_delay(attempt)
+            _count("retried")
+            logging.warning(f"Google Sheets call {call_event.fields['call']} failed, retry {attempt} in {delay:.1f}s: {str(e)}")
+            with call_event.phase("backoff"):
+                time.sleep(delay)
+            continue
+        _budget.deposit()
+        call_event.emit("ok", attempts=attempt)
+        return result
+
+
+def stats():
+    """Counters for sizing the quota at peak load"""
+    with _counters_lock:
+        return dict(_counters)
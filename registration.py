@@ -5,29 +5,23 @@ Volunteer Registration with Station Selection
 
 import streamlit as st
 from datetime import datetime
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import random
 import logging
-import os
+from capacity import get_capacity_index, refresh_capacity_index, volunteer_key
+from catalog import get_catalog
+from dedupe import get_registration_index, save_registration
+from events import Event
+from log_setup import configure_logging
+from sheets import is_configured as sheets_configured
+from slots import find_overlaps
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('volunteer_system.log') if not os.getenv('STREAMLIT_SHARING') else logging.StreamHandler()
-    ]
-)
+configure_logging()
 
-# Config
-CHURCH_LOCATION = (39.8637, -74.8284)
-MAX_DISTANCE_METERS = 50000  # 50km for testing
-SHEET_NAME = "Volunteer Hours"
-PUNCH_SHEET = "Sheet1"
-REGISTRATION_SHEET = "Registration"
+# Request timing, emitted as a structured event when the form is submitted
+registration_event = Event("registration", page="registration")
 
+# Config
 volunteer_verses = [
     "Each of you should use whatever gift you have received to serve others, as faithful stewards of God's grace. — 1 Peter 4:10",
     "Whatever you do, work at it with all your heart, as working for the Lord, not for human masters. — Colossians 3:23",
@@ -36,24 +30,8 @@ volunteer_verses = [
     "Carry each other's burdens, and in this way you will fulfill the law of Christ. — Galatians 6:2"
 ]
 
-# Google Sheets Connection
-try:
-    scope = ["https://www.googleapis.com/auth/spreadsheets","https://www.googleapis.com/auth/drive"]
-    if hasattr(st, 'secrets') and "gcp_service_account" in st.secrets:
-        import json
-        account_info = json.loads(st.secrets["gcp_service_account"])
-        auth_creds = ServiceAccountCredentials.from_json_keyfile_dict(account_info, scope)
-    else:
-        auth_creds = ServiceAccountCredentials.from_json_keyfile_name("service_account.json", scope)
-    client = gspread.authorize(auth_creds)
-    punch_sheet = client.open(SHEET_NAME).worksheet(PUNCH_SHEET)
-    reg_sheet = client.open(SHEET_NAME).worksheet(REGISTRATION_SHEET)
-    SHEETS_ENABLED = True
-except Exception as e:
-    # Google Sheets not connected - app will store data locally for display
-    SHEETS_ENABLED = False
-    punch_sheet = None
-    reg_sheet = None
+# Google Sheets Connection (authorized lazily once per server process, see sheets.py)
+SHEETS_ENABLED = sheets_configured()
 
 def get_common_css():
     """Return common CSS styling"""
@@ -183,73 +161,32 @@ with st.form("volunteer_registration"):
     # Station Selection with Tabs
     st.markdown("### Station Preference & Schedule")
     
-    # Station Information
-    stations = {
-        "🎁 Prizes and Games": {
-            "description": "Help run carnival games and distribute prizes to children",
-            "requirements": "Energetic, good with kids, patient"
-        },
-        "💄 Cosmetology": {
-            "description": "Face painting, temporary tattoos, and beauty activities",
-            "requirements": "Artistic skills preferred, attention to detail"
-        },
-        "🎈 Inflatables": {
-            "description": "Supervise bounce houses and inflatable activities",
-            "requirements": "Active, safety-conscious, good with children"
-        },
-        "🏀 Basketball": {
-            "description": "Organize basketball games and sports activities",
-            "requirements": "Sports knowledge helpful, energetic"
-        },
-        "🍿 Snacking": {
-            "description": "Food preparation, serving, and kitchen assistance",
-            "requirements": "Food safety awareness, teamwork"
-        }
-    }
-    
+    # Stations and time slots come from the shared catalog (stations.json)
+    catalog = get_catalog()
+    station_options = ["Select a station"] + catalog.station_names()
+
+    def station_title(name):
+        station = catalog.station(name)
+        return station.title if station is not None else name
+
     # Create tabs for each day
-    tab1, tab2, tab3 = st.tabs(["📅 Friday", "📅 Saturday", "📅 Sunday"])
+    day_tabs = st.tabs([f"📅 {day}" for day in catalog.days])
     
     selected_times = {}
     
-    with tab1:
-        st.markdown("#### Friday Schedule")
-        friday_times = ["5:00 PM - 8:00 PM", "8:00 PM - 11:00 PM"]
-        
-        station_pref_fri = st.selectbox("Preferred Station - Friday", ["Select a station"] + list(stations.keys()), key="fri_station")
-        if station_pref_fri != "Select a station":
-            st.info(f"**Description:** {stations[station_pref_fri]['description']}")
-            st.info(f"**Requirements:** {stations[station_pref_fri]['requirements']}")
-        
-        time_pref_fri = st.multiselect("Available Time Slots - Friday", friday_times, key="fri_times")
-        if time_pref_fri:
-            selected_times["Friday"] = {"station": station_pref_fri, "times": time_pref_fri}
-    
-    with tab2:
-        st.markdown("#### Saturday Schedule")
-        saturday_times = ["10:00 AM - 1:00 PM", "1:00 PM - 4:00 PM", "4:00 PM - 7:00 PM", "7:00 PM - 10:00 PM"]
-        
-        station_pref_sat = st.selectbox("Preferred Station - Saturday", ["Select a station"] + list(stations.keys()), key="sat_station")
-        if station_pref_sat != "Select a station":
-            st.info(f"**Description:** {stations[station_pref_sat]['description']}")
-            st.info(f"**Requirements:** {stations[station_pref_sat]['requirements']}")
-        
-        time_pref_sat = st.multiselect("Available Time Slots - Saturday", saturday_times, key="sat_times")
-        if time_pref_sat:
-            selected_times["Saturday"] = {"station": station_pref_sat, "times": time_pref_sat}
-    
-    with tab3:
-        st.markdown("#### Sunday Schedule")
-        sunday_times = ["12:00 PM - 3:00 PM", "3:00 PM - 6:00 PM"]
-        
-        station_pref_sun = st.selectbox("Preferred Station - Sunday", ["Select a station"] + list(stations.keys()), key="sun_station")
-        if station_pref_sun != "Select a station":
-            st.info(f"**Description:** {stations[station_pref_sun]['description']}")
-            st.info(f"**Requirements:** {stations[station_pref_sun]['requirements']}")
-        
-        time_pref_sun = st.multiselect("Available Time Slots - Sunday", sunday_times, key="sun_times")
-        if time_pref_sun:
-            selected_times["Sunday"] = {"station": station_pref_sun, "times": time_pref_sun}
+    for day, day_tab in zip(catalog.days, day_tabs):
+        with day_tab:
+            st.markdown(f"#### {day} Schedule")
+            day_key = day[:3].lower()
+            
+            station_pref = st.selectbox(f"Preferred Station - {day}", station_options, format_func=station_title, key=f"{day_key}_station")
+            if station_pref != "Select a station":
+                st.info(f"**Description:** {catalog.station(station_pref).description}")
+                st.info(f"**Requirements:** {catalog.station(station_pref).requirements}")
+            
+            time_pref = st.multiselect(f"Available Time Slots - {day}", catalog.day_slots(day), key=f"{day_key}_times")
+            if time_pref:
+                selected_times[day] = {"station": station_pref, "times": time_pref}
     
     # Additional Information
     st.markdown("### Additional Information")
@@ -259,66 +196,114 @@ with st.form("volunteer_registration"):
     submit_button = st.form_submit_button("Register as Volunteer", use_container_width=True)
     
     if submit_button:
+        registration_event.mark("render")
         # Validation
-        required_fields = [name, email, phone, emergency_contact]
-        if not all(required_fields) or age_group == "Select age group" or experience == "Select experience level":
+        with registration_event.phase("validation"):
+            required_fields = [name, email, phone, emergency_contact]
+            complete = all(required_fields) and age_group != "Select age group" and experience != "Select experience level"
+        if not complete:
             st.error("❌ Please fill in all required fields marked with *")
+            registration_event.emit("invalid")
         elif not selected_times:
             st.error("❌ Please select at least one station and time slot")
+            registration_event.emit("invalid")
+        elif any(catalog.invalid_slots(info["station"], day, info["times"]) for day, info in selected_times.items()):
+            st.error("❌ Please choose a station offering each selected time slot")
+            registration_event.emit("invalid")
+        elif not all(catalog.station(info["station"]).accepts(age_group) for info in selected_times.values()):
+            st.error("❌ One of your chosen stations needs volunteers 18 or older")
+            registration_event.emit("invalid")
+        elif any(find_overlaps(info["times"]) for info in selected_times.values()):
+            overlaps = [f"{day} {first} / {second}" for day, info in selected_times.items() for first, second in find_overlaps(info["times"])]
+            st.error("❌ These time slots overlap, please pick one of each pair: " + "; ".join(overlaps))
+            registration_event.emit("invalid")
         else:
-            # Process registration
-            registration_data = {
-                "name": name,
-                "email": email,
-                "phone": phone,
-                "emergency_contact": emergency_contact,
-                "age_group": age_group,
-                "experience": experience,
-                "selected_times": selected_times,
-                "special_skills": special_skills,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
+            # Claim the slots in the in-memory capacity index before writing
+            capacity_index = get_capacity_index()
+            # Pick up sign-ups other apps saved since the counts were built before deciding
+            refresh_capacity_index()
+            # A resubmission (same phone or email, and name) replaces the earlier row, so that row's
+            # slots are set aside while this one is checked and put back if it isn't saved
+            registration_index = get_registration_index()
+            position, previous = registration_index.find(phone, email, name) if registration_index is not None else (None, None)
+            if previous is not None and capacity_index is not None:
+                capacity_index.remove_row(previous)
+            replaced = False
+            try:
+                schedule = {day: (info["station"], info["times"]) for day, info in selected_times.items()}
+                volunteer = volunteer_key(phone, email, name)
+                booked = capacity_index.conflicts(volunteer, {day: info["times"] for day, info in selected_times.items()}) if capacity_index is not None else []
+                with registration_event.phase("capacity"):
+                    full_slots = capacity_index.reserve_schedule(schedule, volunteer) if capacity_index is not None and not booked else []
+                if booked:
+                    st.error("❌ You're already signed up at overlapping times: " + "; ".join(f"{day} {slot} (overlaps {existing})" for day, slot, existing in booked))
+                    registration_event.emit("conflict")
+                elif full_slots:
+                    st.error("❌ These time slots are full, please choose others: " + ", ".join(f"{day} {slot}" for _, day, slot in full_slots))
+                    registration_event.emit("full")
+                else:
+                    # Process registration
+                    registration_data = {
+                        "name": name,
+                        "email": email,
+                        "phone": phone,
+                        "emergency_contact": emergency_contact,
+                        "age_group": age_group,
+                        "experience": experience,
+                        "selected_times": selected_times,
+                        "special_skills": special_skills,
+                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    }
             
-            # Save to Google Sheets
-            if SHEETS_ENABLED:
-                try:
                     # Format schedule for sheet
                     schedule_text = ""
                     for day, info in selected_times.items():
                         schedule_text += f"{day}: {info['station']} ({', '.join(info['times'])}) | "
-                    
-                    reg_sheet.append_row([
-                        registration_data["timestamp"],
-                        name, email, phone, emergency_contact,
-                        age_group, experience,
-                        schedule_text.rstrip(" | "),
-                        special_skills
-                    ])
-                    
-                    st.success(f"🎉 Thank you {name}! Your registration has been submitted successfully.")
-                    logging.info(f"New volunteer registered: {name} - {email}")
-                    
-                except Exception as e:
-                    st.error(f"❌ Registration failed to save: {str(e)}")
-                    st.info("📝 Please contact the church office to complete your registration.")
-            else:
-                st.success(f"🎉 Thank you {name}! Your registration has been received.")
-                st.info("📝 Registration data stored locally (Google Sheets not connected)")
             
-            # Show summary
-            st.balloons()
-            st.markdown("### 📋 Registration Summary")
+                    # Saved through the configured storage backend (journaled and synced for Sheets)
+                    with registration_event.phase("storage_write"):
+                        row = [
+                            registration_data["timestamp"],
+                            name, email, phone, emergency_contact,
+                            age_group, experience,
+                            schedule_text.rstrip(" | "),
+                            special_skills
+                        ]
+                        saved, replaced = save_registration(row, position)
+                    if saved and capacity_index is not None:
+                        capacity_index.note_saved(row, previous if replaced else None)
+                    if saved and replaced:
+                        st.success(f"🎉 Thanks {name}! We already had you registered, so your registration has been updated.")
+                        logging.info(f"Volunteer registration updated: {name} - {email}")
+                    elif saved:
+                        st.success(f"🎉 Thank you {name}! Your registration has been submitted successfully.")
+                        logging.info(f"New volunteer registered: {name} - {email}")
+                        if not SHEETS_ENABLED:
+                            st.info("📝 Registration data stored locally (Google Sheets not connected)")
+                    else:
+                        if capacity_index is not None:
+                            capacity_index.release_schedule(schedule, volunteer)
+                        st.error("❌ Registration failed to save.")
+                        st.info("📝 Please contact the church office to complete your registration.")
+                    registration_event.emit("updated" if replaced else "saved" if saved else "failed")
+            
+                    # Show summary
+                    st.balloons()
+                    st.markdown("### 📋 Registration Summary")
             
-            for day, info in selected_times.items():
-                st.markdown(f"**{day}:** {info['station']}")
-                for time in info['times']:
-                    st.markdown(f"  - {time}")
+                    for day, info in selected_times.items():
+                        st.markdown(f"**{day}:** {info['station']}")
+                        for time in info['times']:
+                            st.markdown(f"  - {time}")
             
-            st.info("🙏 We look forward to having you serve with us! You'll receive a confirmation email soon.")
+                    st.info("🙏 We look forward to having you serve with us! You'll receive a confirmation email soon.")
             
-            # Show random verse
-            verse = get_random_verse()
-            st.info(f"📖 Verse for you: {verse}")
+                    # Show random verse
+                    verse = get_random_verse()
+                    st.info(f"📖 Verse for you: {verse}")
+            finally:
+                if previous is not None and capacity_index is not None and not replaced:
+                    capacity_index.add_row(previous)
 
 # Footer
 st.markdown("---")
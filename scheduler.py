@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Automatic shift assignment for registered volunteers
+Fills as many station slots as possible, preferring each volunteer's chosen station and keeping
+minors out of adults-only stations. Run with: python scheduler.py [--output schedule.csv]
+
+Each day is one min-cost flow network: volunteer kinds -> (kind, conflict group) ->
+(station, slot) -> sink. A conflict group is a run of transitively overlapping slots, and
+each volunteer takes at most one slot per group, so nobody is double-booked and the flow
+maximizes coverage under that rule. Volunteers with the same preference, age and
+availability form one kind, which keeps the graph to a few hundred nodes however many
+people registered. A top-up pass then fills spots still open with volunteers who are free
+at that time (e.g. 7:00 pm for someone placed at 1:30 pm in a 1:30/4:15/7:00 run).
+"""
+
+import argparse
+import csv
+import heapq
+import logging
+
+from capacity import parse_registration, registrant_key
+from catalog import MINOR_AGE_GROUPS, get_catalog
+from shifts import normalize_name
+from slots import BookingIndex, parse_slot
+
+# Edge costs: placing a volunteer at their preferred station is free, anywhere else costs one
+PREFERRED_COST = 0
+OTHER_STATION_COST = 1
+
+
+class MinCostFlow:
+    """Min-cost max-flow by successive shortest paths with Johnson potentials (primal-dual)
+
+    Costs must be non-negative. Each augmentation pushes the path's full bottleneck, so
+    grouped supplies are routed in a handful of Dijkstra runs rather than one per unit.
+    """
+
+    def __init__(self, node_count):
+        # Edge: [to, residual capacity, cost, index of the reverse edge in graph[to]]
+        self.graph = [[] for _ in range(node_count)]
+
+    def add_edge(self, source, target, capacity, cost):
+        """Add an edge and return a handle for flow()"""
+        self.graph[source].append([target, capacity, cost, len(self.graph[target])])
+        self.graph[target].append([source, 0, -cost, len(self.graph[source]) - 1])
+        return source, len(self.graph[source]) - 1
+
+    def flow(self, handle):
+        """Flow routed through the edge returned by add_edge"""
+        source, index = handle
+        target, _, _, reverse = self.graph[source][index]
+        return self.graph[target][reverse][1]
+
+    def solve(self, source, sink):
+        """Route the maximum flow at minimum cost; returns (flow, cost)"""
+        graph = self.graph
+        node_count = len(graph)
+        infinity = float("inf")
+        potential = [0] * node_count
+        total_flow = total_cost = 0
+        while True:
+            distance = [infinity] * node_count
+            previous = [None] * node_count
+            distance[source] = 0
+            heap = [(0, source)]
+            while heap:
+                dist, node = heapq.heappop(heap)
+                if dist > distance[node]:
+                    continue
+                for index, (target, capacity, cost, _) in enumerate(graph[node]):
+                    if capacity <= 0:
+                        continue
+                    candidate = dist + cost + potential[node] - potential[target]
+                    if candidate < distance[target]:
+                        distance[target] = candidate
+                        previous[target] = (node, index)
+                        heapq.heappush(heap, (candidate, target))
+            if distance[sink] == infinity:
+                return total_flow, total_cost
+            for node in range(node_count):
+                if distance[node] < infinity:
+                    potential[node] += distance[node]
+
+            push = infinity
+            node = sink
+            while node != source:
+                parent, index = previous[node]
+                push = min(push, graph[parent][index][1])
+                node = parent
+            node = sink
+            while node != source:
+                parent, index = previous[node]
+                edge = graph[parent][index]
+                edge[1] -= push
+                graph[node][edge[3]][1] += push
+                node = parent
+            total_flow += push
+            total_cost += push * (potential[sink] - potential[source])
+
+
+class Volunteer:
+    """One registrant: age and, per day, the preferred station and available slots"""
+
+    def __init__(self, name, minor=False, key=None):
+        self.name = name
+        self.key = key or normalize_name(name)
+        self.minor = minor
+        self.preferences = {}
+        self.availability = {}
+
+    def add(self, schedule):
+        """Merge a registration's {day: {station: [slots]}}; later registrations win a day's preference"""
+        for day, stations in schedule.items():
+            for station_name, slots in stations.items():
+                self.preferences[day] = station_name
+                day_slots = self.availability.setdefault(day, [])
+                day_slots.extend(slot for slot in slots if slot not in day_slots)
+
+
+def load_volunteers(registration_rows, catalog=None):
+    """Volunteers from stored registration rows, merged by phone or email (see registrant_key), in registration order"""
+    catalog = catalog or get_catalog()
+    volunteers = {}
+    for row in registration_rows:
+        registration = parse_registration(row, catalog)
+        if registration is None or not registration["name"]:
+            continue
+        key = registrant_key(registration)
+        volunteer = volunteers.get(key)
+        if volunteer is None:
+            volunteer = volunteers[key] = Volunteer(registration["name"], key=key)
+        volunteer.minor = registration["age"] in MINOR_AGE_GROUPS
+        volunteer.add(registration["schedule"])
+    return list(volunteers.values())
+
+
+def conflict_groups(labels):
+    """Runs of transitively overlapping slots, earliest first"""
+    groups = []
+    group_end = None
+    for label in sorted(labels, key=parse_slot):
+        start, end = parse_slot(label)
+        if groups and start < group_end:
+            groups[-1].append(label)
+            group_end = max(group_end, end)
+        else:
+            groups.append([label])
+            group_end = end
+    return groups
+
+
+def _station_cost(station, preferred, minor, allow_other_stations):
+    """Edge cost for placing a volunteer at station, or None when they may not work there"""
+    if minor and station.adults_only:
+        return None
+    if station.name == preferred:
+        return PREFERRED_COST
+    return OTHER_STATION_COST if allow_other_stations else None
+
+
+def assign_day(catalog, day, volunteers, allow_other_stations=True):
+    """Assignments for one day as (volunteer, slot, station, preferred) tuples, at most one per volunteer per conflict group"""
+    # Volunteers with the same preference, age and availability are interchangeable, so route them as one supply
+    kinds = {}
+    for volunteer in volunteers:
+        available = frozenset(volunteer.availability.get(day, ()))
+        if available:
+            kinds.setdefault((volunteer.preferences.get(day), volunteer.minor, available), []).append(volunteer)
+    groups = conflict_groups(catalog.day_slots(day))
+    supplies = [(kind, group) for kind in kinds for group in groups if kind[2].intersection(group)]
+    targets = [(station, slot) for group in groups for slot in group
+               for station in catalog.stations if slot in station.day_slots(day)]
+    if not supplies or not targets:
+        return []
+
+    source = 0
+    first_target = 1 + len(supplies)
+    sink = first_target + len(targets)
+    target_nodes = {(station.name, slot): node for node, (station, slot) in enumerate(targets, start=first_target)}
+    solver = MinCostFlow(sink + 1)
+    edges = []
+    for node, (kind, group) in enumerate(supplies, start=1):
+        preferred, minor, available = kind
+        solver.add_edge(source, node, len(kinds[kind]), 0)
+        for slot in group:
+            if slot not in available:
+                continue
+            for station in catalog.stations:
+                if slot not in station.day_slots(day):
+                    continue
+                cost = _station_cost(station, preferred, minor, allow_other_stations)
+                if cost is not None:
+                    handle = solver.add_edge(node, target_nodes[(station.name, slot)], len(kinds[kind]), cost)
+                    edges.append((kind, tuple(group), slot, station, handle))
+    for station, slot in targets:
+        capacity = station.capacity if station.capacity is not None else len(volunteers)
+        solver.add_edge(target_nodes[(station.name, slot)], sink, capacity, 0)
+    solver.solve(source, sink)
+
+    # Hand out each (kind, group)'s flow to distinct members, least-loaded first, preferred station first
+    assignments = []
+    load = {}
+    taken = {}
+    for kind, group, slot, station, handle in sorted(edges, key=lambda edge: edge[3].name != edge[0][0]):
+        amount = solver.flow(handle)
+        if not amount:
+            continue
+        if (kind, group) not in taken:
+            taken[(kind, group)] = sorted(kinds[kind], key=lambda volunteer: load.get(id(volunteer), 0))
+        members = taken[(kind, group)][:amount]
+        del taken[(kind, group)][:amount]
+        for volunteer in members:
+            load[id(volunteer)] = load.get(id(volunteer), 0) + 1
+            assignments.append((volunteer, slot, station, station.name == kind[0]))
+    return assignments
+
+
+def assign_slot(catalog, day, slot, volunteers, allow_other_stations=True, open_spots=None):
+    """Assignments for one (day, slot) as (volunteer, station, preferred) tuples
+
+    open_spots maps station name to the spots still free; by default each station's full capacity.
+    """
+    stations = [station for station in catalog.stations if slot in station.day_slots(day)]
+    if not stations or not volunteers:
+        return []
+
+    # Volunteers with the same preference and age are interchangeable, so route them as one supply
+    groups = {}
+    for volunteer in volunteers:
+        groups.setdefault((volunteer.preferences.get(day), volunteer.minor), []).append(volunteer)
+
+    group_keys = list(groups)
+    source = 0
+    sink = 1 + len(group_keys) + len(stations)
+    solver = MinCostFlow(sink + 1)
+    edges = []
+    for group_index, (preferred, minor) in enumerate(group_keys, start=1):
+        solver.add_edge(source, group_index, len(groups[(preferred, minor)]), 0)
+        for station_index, station in enumerate(stations, start=1 + len(group_keys)):
+            cost = _station_cost(station, preferred, minor, allow_other_stations)
+            if cost is not None:
+                edges.append(((preferred, minor), station, solver.add_edge(group_index, station_index, len(groups[(preferred, minor)]), cost)))
+    for station_index, station in enumerate(stations, start=1 + len(group_keys)):
+        if open_spots is not None and station.name in open_spots:
+            capacity = open_spots[station.name]
+        else:
+            capacity = station.capacity if station.capacity is not None else len(volunteers)
+        solver.add_edge(station_index, sink, capacity, 0)
+    solver.solve(source, sink)
+
+    # Hand out each group's flow in registration order, preferred station first
+    assignments = []
+    taken = {key: 0 for key in groups}
+    for key, station, handle in sorted(edges, key=lambda edge: edge[1].name != edge[0][0]):
+        amount = solver.flow(handle)
+        members = groups[key][taken[key]:taken[key] + amount]
+        taken[key] += amount
+        assignments.extend((volunteer, station, station.name == key[0]) for volunteer in members)
+    return assignments
+
+
+def build_schedule(volunteers, catalog=None, allow_other_stations=True):
+    """Assign volunteers to station slots
+
+    Returns {"assignments": [{name, day, slot, station, preferred}], "open_spots": {(station, day, slot): n},
+    "unplaced": [(name, day, slot)]}.
+    """
+    catalog = catalog or get_catalog()
+    available = {}
+    for volunteer in volunteers:
+        for day, slots in volunteer.availability.items():
+            for slot in slots:
+                available.setdefault((day, slot), []).append(volunteer)
+
+    assignments = []
+    open_spots = {}
+    unplaced = []
+    for day in catalog.days:
+        placed = assign_day(catalog, day, volunteers, allow_other_stations)
+        bookings = BookingIndex()
+        filled = {}
+        slot_volunteers = {}
+        for volunteer, slot, station, preferred in placed:
+            bookings.book(id(volunteer), day, [slot])
+            filled[(station.name, slot)] = filled.get((station.name, slot), 0) + 1
+            slot_volunteers.setdefault(slot, set()).add(id(volunteer))
+
+        # Top up spots the one-per-group rule left open, earliest slot first
+        for slot in sorted(catalog.day_slots(day), key=parse_slot):
+            stations = [station for station in catalog.stations if slot in station.day_slots(day)]
+            free_spots = {station.name: station.capacity - filled.get((station.name, slot), 0)
+                          for station in stations if station.capacity is not None}
+            if len(free_spots) == len(stations) and not any(free_spots.values()):
+                continue
+            free = [volunteer for volunteer in available.get((day, slot), [])
+                    if not bookings.conflicts(id(volunteer), day, [slot])]
+            for volunteer, station, preferred in assign_slot(catalog, day, slot, free, allow_other_stations, free_spots):
+                placed.append((volunteer, slot, station, preferred))
+                bookings.book(id(volunteer), day, [slot])
+                filled[(station.name, slot)] = filled.get((station.name, slot), 0) + 1
+                slot_volunteers.setdefault(slot, set()).add(id(volunteer))
+
+        for volunteer, slot, station, preferred in sorted(placed, key=lambda item: parse_slot(item[1])):
+            assignments.append({"name": volunteer.name, "volunteer_key": volunteer.key, "day": day, "slot": slot, "station": station.name, "preferred": preferred})
+        for slot in sorted(catalog.day_slots(day), key=parse_slot):
+            placed_ids = slot_volunteers.get(slot, set())
+            unplaced.extend((volunteer.name, day, slot) for volunteer in available.get((day, slot), []) if id(volunteer) not in placed_ids)
+            for station in catalog.stations:
+                if station.capacity is not None and slot in station.day_slots(day):
+                    open_spots[(station.name, day, slot)] = station.capacity - filled.get((station.name, slot), 0)
+    return {"assignments": assignments, "open_spots": open_spots, "unplaced": unplaced}
+
+
+def validate_schedule(assignments):
+    """(name, day, slot, overlapping slot) for every assignment that double-books a volunteer"""
+    bookings = BookingIndex()
+    conflicts = []
+    for assignment in assignments:
+        volunteer = assignment.get("volunteer_key") or normalize_name(assignment["name"])
+        for slot, booked in bookings.conflicts(volunteer, assignment["day"], [assignment["slot"]]):
+            conflicts.append((assignment["name"], assignment["day"], slot, booked))
+        bookings.book(volunteer, assignment["day"], [assignment["slot"]])
+    return conflicts
+
+
+def write_schedule(schedule, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Day", "Slot", "Station", "Volunteer", "Preferred Station"])
+        for assignment in schedule["assignments"]:
+            writer.writerow([assignment["day"], assignment["slot"], assignment["station"], assignment["name"],
+                             "Yes" if assignment["preferred"] else "No"])
+
+
+def main():
+    """Build the schedule from stored registrations"""
+    from log_setup import configure_logging
+    from storage import get_storage
+
+    parser = argparse.ArgumentParser(description="Assign registered volunteers to station time slots")
+    parser.add_argument("--output", default="schedule.csv", help="CSV file for the assignments (default: schedule.csv)")
+    parser.add_argument("--preferred-only", dest="preferred_only", action="store_true", help="Never place a volunteer at a station they did not choose")
+    args = parser.parse_args()
+
+    configure_logging()
+    volunteers = load_volunteers(get_storage().list_registrations())
+    schedule = build_schedule(volunteers, allow_other_stations=not args.preferred_only)
+    write_schedule(schedule, args.output)
+    for name, day, slot, booked in validate_schedule(schedule["assignments"]):
+        logging.warning(f"Schedule double-books {name} on {day}: {slot} overlaps {booked}")
+
+    moved = sum(1 for assignment in schedule["assignments"] if not assignment["preferred"])
+    open_spots = sum(schedule["open_spots"].values())
+    logging.info(f"Schedule written to {args.output}: {len(schedule['assignments'])} shifts for {len(volunteers)} volunteers")
+    print(f"✅ {len(schedule['assignments'])} shifts assigned to {len(volunteers)} volunteers ({moved} away from their preferred station)")
+    print(f"📋 {open_spots} spots still open, {len(schedule['unplaced'])} offered shifts not needed")
+    print(f"📝 Written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Shared Google Sheets connection for St. Anthony Volunteer System
+Authorizes once per server process and caches the worksheet handles
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+import streamlit as st
+
+from ratelimit import call_sheets
+
+SHEET_NAME = "Volunteer Hours"
+PUNCH_SHEET = "Sheet1"
+REGISTRATION_SHEET = "Registration"
+SCOPE = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
+
+# After a failed attempt to open a worksheet, skip reconnecting to it for this long
+RETRY_AFTER_SECONDS = 30
+
+# Process-wide connection state, shared by every Streamlit session in this server.
+# _lock only guards _state and is never held across network calls, so health probes
+# don't wait on Google; _connect_lock serializes the connection attempts themselves.
+_lock = threading.Lock()
+_connect_lock = threading.Lock()
+_state = {
+    "client": None,
+    "spreadsheet": None,
+    "worksheets": {},
+    "connected_at": None,
+    "failed_at": {},
+    "last_error": None
+}
+
+
+def _has_secrets():
+    """True when Streamlit secrets hold the service account (no secrets file is not an error)"""
+    try:
+        return hasattr(st, 'secrets') and "gcp_service_account" in st.secrets
+    except Exception:
+        return False
+
+
+def load_credentials():
+    """Load service account credentials from Streamlit secrets or service_account.json"""
+    # Imported here so pages that never reach Sheets do not pay for oauth2client
+    from oauth2client.service_account import ServiceAccountCredentials
+
+    if _has_secrets():
+        account_info = json.loads(st.secrets["gcp_service_account"])
+        return ServiceAccountCredentials.from_json_keyfile_dict(account_info, SCOPE)
+    return ServiceAccountCredentials.from_json_keyfile_name("service_account.json", SCOPE)
+
+
+def is_configured():
+    """True when this process has Google Sheets credentials, whether or not Sheets is reachable right now"""
+    return _has_secrets() or os.path.exists("service_account.json")
+
+
+def connect():
+    """Authorize and open the spreadsheet without touching the cache"""
+    import gspread
+
+    client = gspread.authorize(load_credentials())
+    return client, call_sheets(client.open, SHEET_NAME)
+
+
+def get_worksheet(name):
+    """Return the cached worksheet handle, connecting on first use; None if it is unavailable"""
+    if not is_configured():
+        return None
+    worksheet, cooling_down = _cached_worksheet(name)
+    if worksheet is not None or cooling_down:
+        return worksheet
+
+    with _connect_lock:
+        # Another session may have connected (or failed) while this one waited
+        worksheet, cooling_down = _cached_worksheet(name)
+        if worksheet is not None or cooling_down:
+            return worksheet
+        with _lock:
+            spreadsheet = _state["spreadsheet"]
+
+        try:
+            if spreadsheet is None:
+                client, spreadsheet = connect()
+                with _lock:
+                    _state["client"], _state["spreadsheet"] = client, spreadsheet
+                    _state["connected_at"] = time.time()
+                logging.info("Google Sheets connected")
+            worksheet = call_sheets(spreadsheet.worksheet, name)
+        except Exception as e:
+            with _lock:
+                _state["failed_at"][name] = time.monotonic()
+                _state["last_error"] = str(e)
+            logging.warning(f"Google Sheets connection failed ({name}): {str(e)}")
+            return None
+
+        with _lock:
+            _state["worksheets"][name] = worksheet
+            _state["failed_at"].pop(name, None)
+            _state["last_error"] = None
+        return worksheet
+
+
+def _cached_worksheet(name):
+    """(cached handle or None, whether name is cooling down after a failed attempt)"""
+    with _lock:
+        worksheet = _state["worksheets"].get(name)
+        if worksheet is not None:
+            return worksheet, False
+        # Cool down per worksheet so a broken tab does not block the others
+        failed_at = _state["failed_at"].get(name)
+        return None, failed_at is not None and time.monotonic() - failed_at < RETRY_AFTER_SECONDS
+
+
+def get_punch_sheet():
+    """Cached handle for the punch worksheet"""
+    return get_worksheet(PUNCH_SHEET)
+
+
+def get_reg_sheet():
+    """Cached handle for the registration worksheet"""
+    return get_worksheet(REGISTRATION_SHEET)
+
+
+def invalidate(error=None):
+    """Drop the cached client so the next access reconnects"""
+    with _lock:
+        _state["client"] = None
+        _state["spreadsheet"] = None
+        _state["worksheets"] = {}
+        _state["connected_at"] = None
+        if error is not None:
+            _state["last_error"] = str(error)
+
+
+def handle_error(error):
+    """Reconnect lazily after errors that suggest a stale connection"""
+    import gspread
+
+    status = None
+    if isinstance(error, gspread.exceptions.APIError):
+        status = error.response.status_code
+    # Rate limits and server errors say nothing about our credentials
+    if status is None or status in (401, 403, 404):
+        logging.warning(f"Dropping Google Sheets connection after error: {str(error)}")
+        invalidate(error)
+
+
+def connection_state():
+    """Connection status for health reporting"""
+    with _lock:
+        return {
+            "connected": bool(_state["worksheets"]),
+            "connected_at": _state["connected_at"],
+            "age_seconds": round(time.time() - _state["connected_at"], 1) if _state["connected_at"] else None,
+            "last_error": _state["last_error"]
+        }
+
+
+def probe():
+    """Live round trip to the punch worksheet for deep health checks (one quota read)"""
+    started = time.perf_counter()
+    try:
+        worksheet = get_punch_sheet()
+        if worksheet is None:
+            raise RuntimeError(_state["last_error"] or "Google Sheets is not configured")
+        call_sheets(worksheet.get, "A1")
+    except Exception as e:
+        return {"ok": False, "error": str(e), "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
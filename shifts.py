@@ -0,0 +1,170 @@
+"""
+Open-shift index for pairing punch-ins with punch-outs
+Keyed by normalized volunteer name so lookups do not depend on sheet size
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def normalize_name(name):
+    """Case- and whitespace-insensitive key for a volunteer name"""
+    return " ".join(str(name).split()).casefold()
+
+
+def parse_timestamp(value):
+    """Parse a punch timestamp, returning None for headers or malformed cells"""
+    try:
+        return datetime.strptime(str(value).strip(), TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+def format_duration(duration):
+    """Render a timedelta as e.g. '3h 05m'"""
+    minutes = int(duration.total_seconds() // 60)
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+
+class OpenShiftIndex:
+    """Volunteers currently punched in, with their punch-in time
+
+    cursor counts the committed punch rows already replayed, so refresh() can read
+    only newer rows. Rows older than the last punch applied for a name are skipped,
+    which makes replaying this process's own punches (or pending rows seen twice) harmless.
+    """
+
+    def __init__(self):
+        self._open = {}
+        self._last = {}
+        self._lock = threading.Lock()
+        self.cursor = 0
+
+    def rebuild(self, punch_rows, pending_rows=()):
+        """Replay committed [name, action, timestamp] rows, oldest first, then rows not committed yet"""
+        with self._lock:
+            self._open = {}
+            self._last = {}
+            for row in list(punch_rows) + list(pending_rows):
+                self._apply(row)
+            self.cursor = len(punch_rows)
+
+    def refresh(self, start, new_rows, pending_rows=()):
+        """Replay committed rows read from position start, plus rows not committed yet"""
+        with self._lock:
+            for row in list(new_rows) + list(pending_rows):
+                self._apply(row)
+            self.cursor = max(self.cursor, start + len(new_rows))
+
+    def punch_in(self, name, timestamp):
+        """Open a shift; if one is already open it keeps its start, which is returned"""
+        with self._lock:
+            key = normalize_name(name)
+            previous = self._open.get(key)
+            if previous is None:
+                self._open[key] = parse_timestamp(timestamp)
+            self._last[key] = parse_timestamp(timestamp)
+            return previous
+
+    def punch_out(self, name, timestamp):
+        """Close a shift and return its duration, or None when there was no punch-in"""
+        with self._lock:
+            key = normalize_name(name)
+            started = self._open.pop(key, None)
+            self._last[key] = parse_timestamp(timestamp)
+        if started is None:
+            return None
+        return parse_timestamp(timestamp) - started
+
+    def _apply(self, row):
+        if len(row) < 3:
+            return
+        stamp = parse_timestamp(row[2])
+        if stamp is None:
+            return
+        key = normalize_name(row[0])
+        last = self._last.get(key)
+        if last is not None and stamp < last:
+            return
+        self._last[key] = stamp
+        if row[1] == "In":
+            self._open.setdefault(key, stamp)
+        elif row[1] == "Out":
+            self._open.pop(key, None)
+
+    def open_since(self, name):
+        """Punch-in time of the volunteer's open shift, or None"""
+        with self._lock:
+            return self._open.get(normalize_name(name))
+
+    def open_count(self):
+        with self._lock:
+            return len(self._open)
+
+
+# Process-wide index, rebuilt once from storage on first use
+_index = None
+_index_built_at = None
+_index_lock = threading.Lock()
+
+
+def get_shift_index():
+    """Return the process-wide open-shift index, or None while stored punches cannot be read
+
+    Call this before recording a punch so the rebuild does not already contain it.
+    """
+    global _index, _index_built_at
+    with _index_lock:
+        if _index is None:
+            from storage import get_storage
+
+            index = OpenShiftIndex()
+            storage = get_storage()
+            try:
+                index.rebuild(storage.read_punches(0), storage.pending_punches())
+            except Exception as e:
+                # Try again on the next punch rather than pairing against a partial history
+                logging.warning(f"Could not build open-shift index: {str(e)}")
+                return None
+            _index = index
+            _index_built_at = time.time()
+        return _index
+
+
+def refresh_shift_index():
+    """Replay punches other processes recorded since the index last read storage
+
+    The index only sees this process's own punches after it is built, so a separately
+    deployed punch_in.py's punch-ins are invisible to punch_out.py until this runs.
+    Call it when a punch-out finds no open shift, before deciding there was no punch-in.
+    """
+    with _index_lock:
+        index = _index
+    if index is None:
+        return None
+    from storage import get_storage
+
+    storage = get_storage()
+    start = index.cursor
+    try:
+        index.refresh(start, storage.read_punches(start), storage.pending_punches())
+    except Exception as e:
+        logging.warning(f"Could not refresh open-shift index: {str(e)}")
+    return index
+
+
+def index_state():
+    """Cached index figures for health reporting; never builds the index"""
+    with _index_lock:
+        if _index is None:
+            return {"built": False}
+        return {
+            "built": True,
+            "age_seconds": round(time.time() - _index_built_at, 1),
+            "open_shifts": _index.open_count(),
+            "cursor": _index.cursor
+        }
@@ -0,0 +1,138 @@
+"""
+Time-slot intervals and overlap checks
+Slot labels like "1:30 pm - 4:30 pm (Set up)" are parsed once into minutes after midnight;
+per-volunteer, per-day interval indexes catch double bookings with a bisection per check
+"""
+
+import bisect
+import re
+from functools import lru_cache
+
+SLOT_PATTERN = re.compile(
+    r"^\s*(\d{1,2}):(\d{2})\s*([ap]m)\s*-\s*(\d{1,2}):(\d{2})\s*([ap]m)\b", re.IGNORECASE
+)
+
+
+def _minutes(hour, minute, meridiem):
+    return (int(hour) % 12 + (12 if meridiem.lower() == "pm" else 0)) * 60 + int(minute)
+
+
+@lru_cache(maxsize=None)
+def parse_slot(label):
+    """(start, end) in minutes after midnight for a slot label; raises ValueError if it has no time range"""
+    match = SLOT_PATTERN.match(label)
+    if match is None:
+        raise ValueError(f"Unrecognized time slot: {label}")
+    start = _minutes(*match.group(1, 2, 3))
+    end = _minutes(*match.group(4, 5, 6))
+    if end <= start:
+        # Runs past midnight
+        end += 24 * 60
+    return start, end
+
+
+def find_overlaps(labels):
+    """Pairs of labels in one selection whose times overlap, e.g. picking both 1:30-4:30 and 4:15-7:15"""
+    ordered = sorted(labels, key=parse_slot)
+    overlaps = []
+    latest_label, latest_end = None, None
+    for label in ordered:
+        start, end = parse_slot(label)
+        if latest_end is not None and start < latest_end:
+            overlaps.append((latest_label, label))
+        if latest_end is None or end > latest_end:
+            latest_label, latest_end = label, end
+    return overlaps
+
+
+class IntervalIndex:
+    """Booked slots for one volunteer on one day, sorted by start
+
+    A running maximum of end times, with the label that reached it, lets conflict()
+    answer with one bisection even when stored bookings overlap each other (older
+    registrations can). add() and remove() shift the lists, so they are linear in the
+    volunteer's bookings for the day, which is a handful.
+    """
+
+    def __init__(self):
+        self._starts = []
+        self._labels = []
+        self._max_ends = []
+        self._max_labels = []
+
+    def __len__(self):
+        return len(self._labels)
+
+    def conflict(self, label):
+        """A booked label overlapping label, or None"""
+        start, end = parse_slot(label)
+        # Bookings starting before label ends are the only candidates
+        position = bisect.bisect_left(self._starts, end)
+        if position == 0 or self._max_ends[position - 1] <= start:
+            return None
+        return self._max_labels[position - 1]
+
+    def add(self, label):
+        start, _ = parse_slot(label)
+        position = bisect.bisect_right(self._starts, start)
+        self._starts.insert(position, start)
+        self._labels.insert(position, label)
+        self._update_max_ends(position)
+
+    def remove(self, label):
+        """Drop one booking of label, if present"""
+        if label in self._labels:
+            position = self._labels.index(label)
+            del self._starts[position]
+            del self._labels[position]
+            self._update_max_ends(position)
+
+    def _update_max_ends(self, position):
+        del self._max_ends[position:]
+        del self._max_labels[position:]
+        running = self._max_ends[-1] if self._max_ends else None
+        running_label = self._max_labels[-1] if self._max_labels else None
+        for label in self._labels[position:]:
+            end = parse_slot(label)[1]
+            if running is None or end > running:
+                running, running_label = end, label
+            self._max_ends.append(running)
+            self._max_labels.append(running_label)
+
+
+class BookingIndex:
+    """Interval indexes keyed by (volunteer, day); callers serialize access"""
+
+    def __init__(self):
+        self._indexes = {}
+
+    def conflicts(self, volunteer, day, labels):
+        """(label, booked label) for each requested slot overlapping an existing booking"""
+        index = self._indexes.get((volunteer, day))
+        if index is None:
+            return []
+        found = []
+        for label in labels:
+            booked = index.conflict(label)
+            if booked is not None:
+                found.append((label, booked))
+        return found
+
+    def book(self, volunteer, day, labels):
+        index = self._indexes.get((volunteer, day))
+        if index is None:
+            index = self._indexes[(volunteer, day)] = IntervalIndex()
+        for label in labels:
+            index.add(label)
+
+    def release(self, volunteer, day, labels):
+        index = self._indexes.get((volunteer, day))
+        if index is None:
+            return
+        for label in labels:
+            index.remove(label)
+        if not len(index):
+            del self._indexes[(volunteer, day)]
+
+    def volunteer_count(self):
+        return len({volunteer for volunteer, _ in self._indexes})
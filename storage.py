@@ -0,0 +1,428 @@
+"""
+Storage backends for punches and registrations
+Pick one with the VOLUNTEER_STORAGE environment variable: sheets (default), sqlite, jsonl or memory
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+from journal import PUNCH, REGISTRATION, Journal
+
+STORAGE_BACKEND = os.getenv("VOLUNTEER_STORAGE", "sheets")
+SQLITE_PATH = os.getenv("VOLUNTEER_SQLITE_PATH", "volunteer_data.db")
+JSONL_DIR = os.getenv("VOLUNTEER_JSONL_DIR", "volunteer_data")
+
+# Rows per append_rows call for bulk registration imports
+BULK_BATCH_ROWS = 500
+
+
+def same_row(stored, expected):
+    """Whether two registration rows hold the same cells, ignoring trailing blanks (Sheets drops them)"""
+    def cells(row):
+        values = ["" if value is None else str(value) for value in row]
+        while values and values[-1] == "":
+            values.pop()
+        return values
+    return cells(stored) == cells(expected)
+
+
+class StorageBackend:
+    """Common storage API; punch rows are [name, action, timestamp]"""
+
+    name = "base"
+
+    def record_punch(self, name, action, timestamp):
+        """Store a punch; False if it could not be saved"""
+        raise NotImplementedError
+
+    def record_registration(self, row):
+        """Store a registration row; False if it could not be saved"""
+        raise NotImplementedError
+
+    def record_registrations(self, rows):
+        """Store many registration rows in order; returns how many were saved before any failure"""
+        for saved, row in enumerate(rows):
+            if not self.record_registration(row):
+                return saved
+        return len(rows)
+
+    def update_registration(self, position, row, expected=None):
+        """Overwrite the registration at position (as in list_registrations)
+
+        With expected, nothing is written unless the stored row still matches it.
+        False if the row could not be saved or has changed.
+        """
+        raise NotImplementedError
+
+    def list_punches(self):
+        """Every stored punch row, oldest first"""
+        raise NotImplementedError
+
+    def list_registrations(self):
+        """Every stored registration row, oldest first"""
+        raise NotImplementedError
+
+    def read_punches(self, start=0):
+        """Committed punch rows from position start onward, for incremental readers"""
+        return self.list_punches()[start:]
+
+    def read_registrations(self, start=0):
+        """Committed registration rows from position start onward, for incremental readers"""
+        return self.list_registrations()[start:]
+
+    def pending_punches(self):
+        """Punch rows saved but not committed yet (they land after the committed rows later)"""
+        return []
+
+    def pending_registrations(self):
+        """Registration rows saved but not committed yet (they land after the committed rows later)"""
+        return []
+
+    def stats(self):
+        """Backend figures for health reporting"""
+        return {"backend": self.name}
+
+
+class SheetsBackend(StorageBackend):
+    """Google Sheets, written through the local journal and write-behind queues"""
+
+    name = "sheets"
+
+    def record_punch(self, name, action, timestamp):
+        from write_queue import get_punch_queue
+
+        punch_queue = get_punch_queue()
+        return punch_queue.enqueue([name, action, timestamp]) and punch_queue.healthy()
+
+    def record_registration(self, row):
+        from write_queue import get_registration_queue
+
+        return get_registration_queue().enqueue(row)
+
+    def record_registrations(self, rows):
+        """Bulk imports go straight to the sheet in BULK_BATCH_ROWS batches rather than row by row through the queue"""
+        import sheets
+        from ratelimit import call_sheets
+
+        worksheet = sheets.get_reg_sheet()
+        if worksheet is None:
+            return 0
+        saved = 0
+        for start in range(0, len(rows), BULK_BATCH_ROWS):
+            batch = [list(row) for row in rows[start:start + BULK_BATCH_ROWS]]
+            try:
+                call_sheets(worksheet.append_rows, batch, write=True)
+            except Exception as e:
+                logging.error(f"Bulk registration write failed after {saved} rows: {str(e)}")
+                break
+            saved += len(batch)
+        return saved
+
+    def update_registration(self, position, row, expected=None):
+        import sheets
+        from ratelimit import call_sheets
+        from write_queue import get_registration_queue
+
+        # A row still waiting in the queue has no sheet row yet, so sync first
+        queue = get_registration_queue()
+        if queue.depth():
+            queue.flush(force=True)
+            if queue.depth():
+                return False
+        worksheet = sheets.get_reg_sheet()
+        if worksheet is None:
+            return False
+        # Sheet rows are 1-based; blanks clear cells left over from a longer row
+        sheet_row = position + 1
+        values = list(row) + [""] * (len(expected or ()) - len(row))
+        try:
+            if expected is not None and not same_row(call_sheets(worksheet.row_values, sheet_row), expected):
+                logging.warning(f"Registration sheet row {sheet_row} changed since it was read, not updating")
+                return False
+            call_sheets(worksheet.update, range_name=f"A{sheet_row}", values=[values], write=True)
+        except Exception as e:
+            logging.error(f"Registration update failed for sheet row {sheet_row}: {str(e)}")
+            return False
+        return True
+
+    def list_punches(self):
+        import sheets
+
+        return self._list(sheets.get_punch_sheet(), PUNCH)
+
+    def list_registrations(self):
+        import sheets
+
+        return self._list(sheets.get_reg_sheet(), REGISTRATION)
+
+    def read_punches(self, start=0):
+        import sheets
+        from ratelimit import call_sheets
+
+        worksheet = sheets.get_punch_sheet()
+        if worksheet is None:
+            raise RuntimeError("Google Sheets is not reachable right now")
+        # Range read of only the rows past the cursor (sheet rows are 1-based)
+        return list(call_sheets(worksheet.get, f"A{start + 1}:C"))
+
+    def read_registrations(self, start=0):
+        import sheets
+        from ratelimit import call_sheets
+
+        worksheet = sheets.get_reg_sheet()
+        if worksheet is None:
+            raise RuntimeError("Google Sheets is not reachable right now")
+        # Open-ended range, since the two registration layouts differ in width
+        return list(call_sheets(worksheet.get, f"A{start + 1}:Z"))
+
+    def pending_punches(self):
+        return self._pending(PUNCH)
+
+    def pending_registrations(self):
+        return self._pending(REGISTRATION)
+
+    def stats(self):
+        import ratelimit
+
+        stats = {"backend": self.name, "sheets_calls": ratelimit.stats()}
+        # Only queues a page already created; creating one here would start a flusher
+        # (OAuth plus writes) from a health probe whenever the journal has pending rows
+        write_queue = sys.modules.get("write_queue")
+        if write_queue is not None:
+            for name, queue_stats in write_queue.queue_stats().items():
+                stats[f"{name}_queue"] = queue_stats
+        return stats
+
+    def _list(self, worksheet, kind):
+        import sheets
+        from ratelimit import call_sheets
+
+        if worksheet is None and sheets.is_configured():
+            raise RuntimeError("Google Sheets is not reachable right now")
+        # Sheet rows plus journaled rows that have not been synced yet, read from the journal
+        # directly so read-only callers (the CLIs) never start a flusher for the shared journal
+        rows = call_sheets(worksheet.get_all_values) if worksheet is not None else []
+        return rows + self._pending(kind)
+
+    def _pending(self, kind):
+        from journal import get_journal
+
+        journal = get_journal()
+        return [row for _, row in journal.unsynced(kind, journal.pending_count(kind))]
+
+
+class SQLiteBackend(StorageBackend):
+    """Local SQLite database only, never synced"""
+
+    name = "sqlite"
+
+    def __init__(self, path=SQLITE_PATH):
+        self.journal = Journal(path)
+
+    def record_punch(self, name, action, timestamp):
+        return self._append(PUNCH, [name, action, timestamp])
+
+    def record_registration(self, row):
+        return self._append(REGISTRATION, row)
+
+    def record_registrations(self, rows):
+        try:
+            self.journal.append_many(REGISTRATION, rows)
+        except Exception as e:
+            logging.error(f"SQLite bulk registration write failed: {str(e)}")
+            return 0
+        return len(rows)
+
+    def update_registration(self, position, row, expected=None):
+        try:
+            if expected is not None:
+                current = self.journal.rows(REGISTRATION, offset=position)
+                if not current or not same_row(current[0], expected):
+                    return False
+            return self.journal.replace(REGISTRATION, position, row)
+        except Exception as e:
+            logging.error(f"SQLite registration update failed: {str(e)}")
+            return False
+
+    def list_punches(self):
+        return self.journal.rows(PUNCH)
+
+    def list_registrations(self):
+        return self.journal.rows(REGISTRATION)
+
+    def read_punches(self, start=0):
+        return self.journal.rows(PUNCH, offset=start)
+
+    def read_registrations(self, start=0):
+        return self.journal.rows(REGISTRATION, offset=start)
+
+    def _append(self, kind, row):
+        try:
+            self.journal.append(kind, row)
+        except Exception as e:
+            logging.error(f"SQLite storage write failed ({kind}): {str(e)}")
+            return False
+        return True
+
+
+class JsonlBackend(StorageBackend):
+    """Append-only JSON Lines files, one per record kind"""
+
+    name = "jsonl"
+
+    def __init__(self, directory=JSONL_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def record_punch(self, name, action, timestamp):
+        return self._append(PUNCH, [name, action, timestamp])
+
+    def record_registration(self, row):
+        return self._append(REGISTRATION, row)
+
+    def record_registrations(self, rows):
+        lines = "".join(json.dumps(list(row)) + "\n" for row in rows)
+        try:
+            with self._lock:
+                with open(self._path(REGISTRATION), "a", encoding="utf-8") as f:
+                    f.write(lines)
+        except OSError as e:
+            logging.error(f"JSONL bulk registration write failed: {str(e)}")
+            return 0
+        return len(rows)
+
+    def update_registration(self, position, row, expected=None):
+        """Rewrites the whole file; updates are rare next to appends"""
+        path = self._path(REGISTRATION)
+        try:
+            with self._lock:
+                if not os.path.exists(path):
+                    return False
+                with open(path, encoding="utf-8") as f:
+                    lines = [line for line in f if line.strip()]
+                if position >= len(lines) or (expected is not None and not same_row(json.loads(lines[position]), expected)):
+                    return False
+                lines[position] = json.dumps(list(row)) + "\n"
+                temp_path = path + ".tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    f.writelines(lines)
+                os.replace(temp_path, path)
+        except (OSError, ValueError) as e:
+            logging.error(f"JSONL registration update failed: {str(e)}")
+            return False
+        return True
+
+    def list_punches(self):
+        return self._read(PUNCH)
+
+    def list_registrations(self):
+        return self._read(REGISTRATION)
+
+    def _path(self, kind):
+        return os.path.join(self.directory, f"{kind}s.jsonl")
+
+    def _append(self, kind, row):
+        line = json.dumps(list(row)) + "\n"
+        try:
+            with self._lock:
+                with open(self._path(kind), "a", encoding="utf-8") as f:
+                    f.write(line)
+        except OSError as e:
+            logging.error(f"JSONL storage write failed ({kind}): {str(e)}")
+            return False
+        return True
+
+    def _read(self, kind):
+        with self._lock:
+            if not os.path.exists(self._path(kind)):
+                return []
+            with open(self._path(kind), encoding="utf-8") as f:
+                return [json.loads(line) for line in f if line.strip()]
+
+
+class MemoryBackend(StorageBackend):
+    """In-memory fake for tests and benchmarks, with optional per-call latency"""
+
+    name = "memory"
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self._punches = []
+        self._registrations = []
+        self._lock = threading.Lock()
+
+    def record_punch(self, name, action, timestamp):
+        self._delay()
+        with self._lock:
+            self._punches.append([name, action, timestamp])
+        return True
+
+    def record_registration(self, row):
+        self._delay()
+        with self._lock:
+            self._registrations.append(list(row))
+        return True
+
+    def record_registrations(self, rows):
+        self._delay()
+        with self._lock:
+            self._registrations.extend(list(row) for row in rows)
+        return len(rows)
+
+    def update_registration(self, position, row, expected=None):
+        self._delay()
+        with self._lock:
+            if position >= len(self._registrations):
+                return False
+            if expected is not None and not same_row(self._registrations[position], expected):
+                return False
+            self._registrations[position] = list(row)
+        return True
+
+    def list_punches(self):
+        self._delay()
+        with self._lock:
+            return [list(row) for row in self._punches]
+
+    def list_registrations(self):
+        self._delay()
+        with self._lock:
+            return [list(row) for row in self._registrations]
+
+    def _delay(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+
+BACKENDS = {
+    "sheets": SheetsBackend,
+    "sqlite": SQLiteBackend,
+    "jsonl": JsonlBackend,
+    "memory": MemoryBackend,
+}
+
+
+def create_storage(name):
+    """Build a fresh backend by name"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown storage backend '{name}' (choose from {', '.join(sorted(BACKENDS))})")
+    return BACKENDS[name]()
+
+
+# Process-wide backend chosen by VOLUNTEER_STORAGE
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage():
+    """Return the process-wide storage backend"""
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            _storage = create_storage(STORAGE_BACKEND)
+        return _storage
@@ -0,0 +1,104 @@
+"""
+Tests for the per-slot capacity index
+"""
+
+from capacity import CapacityIndex, parse_registration, volunteer_key
+from catalog import Catalog
+
+CATALOG = Catalog.from_dict({"days": ["Friday", "Saturday"], "stations": [
+    {"id": "a", "name": "Station A", "capacity": 2, "slots": {"Friday": ["9:00 am - 12:00 pm", "12:00 pm - 3:00 pm"], "Saturday": ["9:00 am - 12:00 pm"]}},
+    {"id": "b", "name": "Station B", "slots": {"Friday": ["9:00 am - 12:00 pm"]}}
+]})
+
+
+def test_rebuild_reads_both_registration_layouts():
+    index = CapacityIndex(CATALOG)
+    index.rebuild([
+        ["First", "Last", "Phone", "Email", "Age", "Station", "Friday", "Saturday", "Timestamp"],
+        ["Jane", "Doe", "555", "", "18+", "Station A", "9:00 am - 12:00 pm, 12:00 pm - 3:00 pm", "None", "2025-01-01 10:00:00"],
+        ["2025-01-01 11:00:00", "John Roe", "j@x.org", "556", "Mom", "18-25", "First time",
+         "Friday: Station A (9:00 am - 12:00 pm) | Saturday: Station A (9:00 am - 12:00 pm)", ""],
+        ["too", "short"]
+    ])
+    assert index.count("Station A", "Friday", "9:00 am - 12:00 pm") == 2
+    assert index.count("Station A", "Friday", "12:00 pm - 3:00 pm") == 1
+    assert index.count("Station A", "Saturday", "9:00 am - 12:00 pm") == 1
+    assert index.remaining("Station A", "Friday", "9:00 am - 12:00 pm") == 0
+    assert index.remaining("Station B", "Friday", "9:00 am - 12:00 pm") is None
+
+
+def test_reserve_refuses_full_slots_without_counting():
+    index = CapacityIndex(CATALOG)
+    assert index.reserve("Station A", {"Friday": ["9:00 am - 12:00 pm"]}) == []
+    assert index.reserve("Station A", {"Friday": ["9:00 am - 12:00 pm"]}) == []
+    assert index.reserve("Station A", {"Friday": ["9:00 am - 12:00 pm", "12:00 pm - 3:00 pm"]}) == [("Friday", "9:00 am - 12:00 pm")]
+    assert index.count("Station A", "Friday", "12:00 pm - 3:00 pm") == 0
+    index.release("Station A", {"Friday": ["9:00 am - 12:00 pm"]})
+    assert index.remaining("Station A", "Friday", "9:00 am - 12:00 pm") == 1
+    # Unlimited stations always accept
+    for _ in range(5):
+        assert index.reserve("Station B", {"Friday": ["9:00 am - 12:00 pm"]}) == []
+
+
+def test_reserve_schedule_is_all_or_nothing():
+    index = CapacityIndex(CATALOG)
+    index.rebuild([["", "", "", "", "", "Station A", "None", "9:00 am - 12:00 pm", ""]] * 2)
+    full = index.reserve_schedule({"Friday": ("Station A", ["9:00 am - 12:00 pm"]), "Saturday": ("Station A", ["9:00 am - 12:00 pm"])})
+    assert full == [("Station A", "Saturday", "9:00 am - 12:00 pm")]
+    assert index.count("Station A", "Friday", "9:00 am - 12:00 pm") == 0
+    assert parse_registration(["x"], CATALOG) is None
+
+
+def test_conflicts_span_stations_and_registrations():
+    catalog = Catalog.from_dict({"days": ["Saturday"], "stations": [
+        {"id": "a", "name": "Station A", "slots": {"Saturday": ["1:30 pm - 4:30 pm"]}},
+        {"id": "b", "name": "Station B", "slots": {"Saturday": ["4:15 pm - 7:15 pm"]}}
+    ]})
+    index = CapacityIndex(catalog)
+    index.rebuild([["Jane", "Doe", "(555) 555-0100", "", "18+", "Station A", "1:30 pm - 4:30 pm", ""]])
+    assert index.conflicts(volunteer_key("555.555.0100", "", "jane  doe"), {"Saturday": ["4:15 pm - 7:15 pm"]}) == [
+        ("Saturday", "4:15 pm - 7:15 pm", "1:30 pm - 4:30 pm")
+    ]
+    john = volunteer_key("", "John@Example.com", "John Roe")
+    assert index.reserve("Station B", {"Saturday": ["4:15 pm - 7:15 pm"]}, john) == []
+    assert index.conflicts(volunteer_key("", "john@example.com", "John Roe"), {"Saturday": ["1:30 pm - 4:30 pm"]}) != []
+    index.release("Station B", {"Saturday": ["4:15 pm - 7:15 pm"]}, john)
+    assert index.conflicts(john, {"Saturday": ["1:30 pm - 4:30 pm"]}) == []
+
+
+def test_namesakes_and_siblings_do_not_block_each_other():
+    index = CapacityIndex(CATALOG)
+    index.rebuild([["Jane", "Doe", "555-555-0100", "", "18+", "Station A", "9:00 am - 12:00 pm", "None", ""]])
+    assert index.conflicts(volunteer_key("555-555-0100", "", "Jane Doe"), {"Friday": ["9:00 am - 12:00 pm"]}) != []
+    assert index.conflicts(volunteer_key("555-555-0199", "", "Jane Doe"), {"Friday": ["9:00 am - 12:00 pm"]}) == []
+    assert index.conflicts(volunteer_key("555-555-0100", "", "Jim Doe"), {"Friday": ["9:00 am - 12:00 pm"]}) == []
+
+
+def test_remove_row_sets_a_registration_aside():
+    index = CapacityIndex(CATALOG)
+    row = ["Jane", "Doe", "555", "", "18+", "Station A", "9:00 am - 12:00 pm", "None", ""]
+    index.rebuild([row, row])
+    index.remove_row(row)
+    assert index.remaining("Station A", "Friday", "9:00 am - 12:00 pm") == 1
+    index.remove_row(row)
+    assert index.conflicts(volunteer_key("555", "", "Jane Doe"), {"Friday": ["9:00 am - 12:00 pm"]}) == []
+    index.add_row(row)
+    assert index.count("Station A", "Friday", "9:00 am - 12:00 pm") == 1
+    assert index.conflicts(volunteer_key("555", "", "Jane Doe"), {"Friday": ["9:00 am - 12:00 pm"]}) != []
+
+
+def test_refresh_counts_other_apps_rows_but_not_our_own():
+    index = CapacityIndex(CATALOG)
+    header = ["First", "Last", "Phone", "Email", "Age", "Station", "Friday", "Saturday", "Timestamp"]
+    ours = ["Jane", "Doe", "555", "", "18+", "Station A", "9:00 am - 12:00 pm", "None", "2025-01-01 10:00:00"]
+    theirs = ["John", "Roe", "556", "", "18+", "Station A", "9:00 am - 12:00 pm", "None", "2025-01-01 10:00:01"]
+    index.rebuild([header])
+    assert index.reserve("Station A", {"Friday": ["9:00 am - 12:00 pm"]}, volunteer_key("555", "", "Jane Doe")) == []
+    index.note_saved(ours)
+
+    index.refresh(1, [ours, theirs])
+    assert index.count("Station A", "Friday", "9:00 am - 12:00 pm") == 2
+    assert index.cursor == 3
+    # Rows already covered by an earlier refresh aren't counted again
+    index.refresh(1, [ours, theirs])
+    assert index.remaining("Station A", "Friday", "9:00 am - 12:00 pm") == 0
@@ -0,0 +1,40 @@
+"""
+Tests for the station and slot catalog
+"""
+
+import json
+
+import pytest
+
+from catalog import Catalog
+
+
+def test_bundled_catalog_lists_every_station():
+    catalog = Catalog.load()
+    assert catalog.days == ("Friday", "Saturday", "Sunday")
+    assert len(catalog) == 5
+    station = catalog.station("Station 5 - Snacking")
+    assert station is catalog.station("station5")
+    assert station.title == "🍿 Snacking"
+    assert len(station.day_slots("Saturday")) == 4
+    assert catalog.day_slots("Friday") == station.day_slots("Friday")
+
+
+def test_invalid_slots_are_reported_per_station(tmp_path):
+    path = tmp_path / "stations.json"
+    path.write_text(json.dumps({"days": ["Friday"], "stations": [
+        {"id": "a", "name": "A", "slots": {"Friday": ["9:00 am - 12:00 pm"]}},
+        {"id": "b", "name": "B", "slots": {"Friday": ["12:00 pm - 3:00 pm"]}}
+    ]}))
+    catalog = Catalog.load(str(path))
+    assert catalog.day_slots("Friday") == ("9:00 am - 12:00 pm", "12:00 pm - 3:00 pm")
+    assert catalog.invalid_slots("A", "Friday", ["9:00 am - 12:00 pm"]) == []
+    assert catalog.invalid_slots("A", "Friday", ["9:00 am - 12:00 pm", "12:00 pm - 3:00 pm"]) == ["12:00 pm - 3:00 pm"]
+    assert catalog.invalid_slots("Select a station", "Friday", ["9:00 am - 12:00 pm"]) == ["9:00 am - 12:00 pm"]
+
+
+def test_malformed_catalog_raises():
+    with pytest.raises(ValueError):
+        Catalog.from_dict({"days": ["Friday"], "stations": [{"name": "No id"}]})
+    with pytest.raises(ValueError):
+        Catalog.from_dict({"days": ["Friday"], "stations": [{"id": "a", "name": "A", "slots": {"Monday": []}}]})
@@ -0,0 +1,81 @@
+"""
+Tests for the duplicate registration index
+"""
+
+import dedupe
+import storage
+from catalog import Catalog
+from dedupe import RegistrationIndex, phone_key, save_registration
+from storage import MemoryBackend
+
+CATALOG = Catalog.from_dict({"days": ["Friday", "Saturday"], "stations": [
+    {"id": "a", "name": "Station A", "slots": {"Friday": ["9:00 am - 12:00 pm"], "Saturday": ["9:00 am - 12:00 pm"]}}
+]})
+
+HEADER = ["First", "Last", "Phone", "Email", "Age", "Station", "Friday", "Saturday", "Timestamp"]
+JANE = ["Jane", "Doe", "(555) 555-0100", "Jane@Example.com", "18+", "Station A", "9:00 am - 12:00 pm", "None", "2025-01-01 10:00:00"]
+JOHN = ["2025-01-01 11:00:00", "John Roe", "john@example.com", "1-555-555-0199", "Mom", "18+", "First time",
+        "Saturday: Station A (9:00 am - 12:00 pm)", ""]
+
+
+def test_find_matches_normalized_phone_or_email():
+    index = RegistrationIndex(CATALOG)
+    index.rebuild([HEADER, JANE, JOHN])
+    assert phone_key("+1 (555) 555-0199") == "5555550199"
+    assert index.find("555.555.0100", "", "jane  doe") == (1, JANE)
+    assert index.find("", " jane@example.COM ", "Jane Doe") == (1, JANE)
+    assert index.find("555-555-0199", "someone@else.org", "John Roe") == (2, JOHN)
+    assert index.find("555-555-0123", "new@example.com", "Jane Doe") == (None, None)
+    assert len(index) == 3
+
+
+def test_find_needs_the_name_too():
+    sibling = ["Jim", "Doe"] + JANE[2:]
+    index = RegistrationIndex(CATALOG)
+    index.rebuild([HEADER, JANE])
+    # A child signing up with a parent's phone and email is someone else
+    assert index.find("555-555-0100", "jane@example.com", "Jim Doe") == (None, None)
+    index.append(sibling, lambda row: True)
+    assert index.find("555-555-0100", "", "Jim Doe") == (2, sibling)
+    assert index.find("555-555-0100", "", "Jane Doe") == (1, JANE)
+
+
+def test_replace_moves_keys_to_the_new_row():
+    index = RegistrationIndex(CATALOG)
+    index.rebuild([HEADER, JANE])
+    changed = JANE[:3] + ["jane.doe@example.com"] + JANE[4:]
+    index.replace(1, changed)
+    assert index.find("", "jane@example.com", "Jane Doe") == (None, None)
+    assert index.find("", "jane.doe@example.com", "Jane Doe") == (1, changed)
+    assert index.find("5555550100", "", "Jane Doe") == (1, changed)
+
+
+def test_resubmission_updates_the_existing_row(monkeypatch):
+    backend = MemoryBackend()
+    backend.record_registrations([HEADER, JANE])
+    index = RegistrationIndex(CATALOG)
+    index.rebuild(backend.list_registrations())
+    monkeypatch.setattr(storage, "_storage", backend)
+    monkeypatch.setattr(dedupe, "_index", index)
+
+    assert save_registration(JOHN) == (True, False)
+    position, previous = index.find("555-555-0100", "jane@example.com", "Jane Doe")
+    resubmitted = JANE[:7] + ["9:00 am - 12:00 pm", "2025-01-01 10:00:05"]
+    assert save_registration(resubmitted, position) == (True, True)
+    assert backend.list_registrations() == [HEADER, resubmitted, JOHN]
+    assert index.find("", "john@example.com", "John Roe") == (2, JOHN)
+
+
+def test_failed_update_appends_and_drops_the_index(monkeypatch):
+    backend = MemoryBackend()
+    backend.record_registrations([HEADER, JANE])
+    index = RegistrationIndex(CATALOG)
+    index.rebuild(backend.list_registrations())
+    monkeypatch.setattr(storage, "_storage", backend)
+    monkeypatch.setattr(dedupe, "_index", index)
+
+    # Another process changed the row since the index was built
+    backend.update_registration(1, JOHN)
+    assert save_registration(JANE, 1) == (True, False)
+    assert backend.list_registrations() == [HEADER, JOHN, JANE]
+    assert dedupe._index is None
@@ -0,0 +1,57 @@
+"""
+Tests for structured JSON events
+"""
+
+import json
+import logging
+import time
+
+import log_setup
+from events import Event, emit
+from log_setup import configure_logging, shutdown_logging
+
+
+def test_sequence_is_monotonic():
+    first = emit("health", "ok")
+    second = emit("health", "ok")
+    assert second["seq"] == first["seq"] + 1
+
+
+def test_event_phases_and_single_emit():
+    event = Event("punch", action="In")
+    time.sleep(0.01)
+    event.mark("render")
+    with event.phase("storage_write"):
+        time.sleep(0.01)
+    emitted = event.emit("saved")
+    assert emitted["event"] == "punch"
+    assert emitted["action"] == "In"
+    assert emitted["outcome"] == "saved"
+    assert emitted["phases"]["render"] >= 10
+    assert emitted["phases"]["storage_write"] >= 10
+    assert emitted["duration_ms"] >= emitted["phases"]["render"] + emitted["phases"]["storage_write"]
+    assert event.emit("saved") is None
+
+
+def test_events_are_written_as_json_lines(monkeypatch, tmp_path):
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    monkeypatch.setattr(log_setup, "_listener", None)
+    monkeypatch.setattr(log_setup, "LOG_FILE", str(tmp_path / "volunteer_system.log"))
+    monkeypatch.setattr(log_setup, "EVENTS_FILE", str(tmp_path / "volunteer_events.jsonl"))
+    monkeypatch.delenv("STREAMLIT_SHARING", raising=False)
+    try:
+        configure_logging()
+        logging.info("Punch IN: Jane - 2025-01-01 10:00:00")
+        emit("punch", "saved", duration_ms=1.5, action="In")
+        shutdown_logging()
+    finally:
+        shutdown_logging()
+        root.handlers = saved_handlers
+        root.setLevel(saved_level)
+
+    events = [json.loads(line) for line in (tmp_path / "volunteer_events.jsonl").read_text().splitlines()]
+    assert [(event["event"], event["outcome"], event["action"]) for event in events] == [("punch", "saved", "In")]
+    text_log = (tmp_path / "volunteer_system.log").read_text()
+    assert "Punch IN: Jane" in text_log
+    assert "saved" not in text_log
@@ -0,0 +1,35 @@
+"""
+Tests for the church geofence
+"""
+
+import random
+
+from geofence import CHURCH_GEOFENCE, CHURCH_LOCATION, Geofence, haversine_meters
+
+
+def test_haversine_known_distance():
+    # Philadelphia City Hall to the Empire State Building is about 133.5 km
+    distance = haversine_meters(39.9526, -75.1652, 40.7484, -73.9857)
+    assert 133000 < distance < 134000
+
+
+def test_contains_center_and_rejects_far_points():
+    assert CHURCH_GEOFENCE.contains(*CHURCH_LOCATION)
+    assert not CHURCH_GEOFENCE.contains(34.0522, -118.2437)
+    assert CHURCH_GEOFENCE.contains_location({'latitude': '39.9', 'longitude': '-74.9'})
+    assert CHURCH_GEOFENCE.contains_location({'error': 'no location'}) is None
+
+
+def test_batch_mode_matches_single_checks():
+    fence = Geofence(CHURCH_LOCATION, 20000)
+    rng = random.Random(7)
+    points = [(CHURCH_LOCATION[0] + rng.uniform(-0.5, 0.5), CHURCH_LOCATION[1] + rng.uniform(-0.5, 0.5))
+              for _ in range(2000)]
+    batch = fence.contains_many([lat for lat, _ in points], [lon for _, lon in points])
+    assert list(batch) == [fence.contains(lat, lon) for lat, lon in points]
+    assert 0 < batch.sum() < len(points)
+
+
+def test_bounding_box_never_rejects_points_inside():
+    fence = Geofence((89.9, 0.0), 50000)
+    assert fence.contains(89.95, 179.0)
@@ -0,0 +1,96 @@
+"""
+Tests for the parallel IP geolocation lookup, using fake providers
+"""
+
+import time
+
+import geolocation
+from geolocation import LocationCache, get_client_location, lookup_ip_location, parse_location
+
+FAST = {"lat": 40.0, "lon": -75.0, "city": "Fast"}
+SLOW = {"latitude": 41.0, "longitude": -74.0, "city": "Slow"}
+
+
+def fake_query(delays):
+    def query(url, timeout):
+        delay, data = delays[url]
+        time.sleep(delay)
+        if isinstance(data, Exception):
+            raise data
+        return parse_location(data)
+    return query
+
+
+def test_first_valid_answer_wins(monkeypatch):
+    monkeypatch.setattr(geolocation, "_query", fake_query({
+        "slow": (1.0, SLOW),
+        "fast": (0.05, FAST),
+        "broken": (0.0, RuntimeError("connection refused"))
+    }))
+    started = time.monotonic()
+    location = lookup_ip_location(["slow", "fast", "broken"], deadline=2.0)
+    assert location["city"] == "Fast"
+    assert time.monotonic() - started < 0.5
+
+
+def test_shared_deadline_bounds_the_lookup(monkeypatch):
+    monkeypatch.setattr(geolocation, "_query", fake_query({
+        "a": (0.5, SLOW),
+        "b": (0.5, FAST)
+    }))
+    started = time.monotonic()
+    location = lookup_ip_location(["a", "b"], deadline=0.1)
+    assert "error" in location
+    assert time.monotonic() - started < 0.3
+
+
+def test_parse_location_formats():
+    assert parse_location({"loc": "40.5,-75.5"})["latitude"] == 40.5
+    assert parse_location({"ip": "1.2.3.4"}) is None
+
+
+def test_location_cache_is_keyed_bounded_and_expires(monkeypatch):
+    cache = LocationCache(max_entries=2, ttl=60)
+    cache.put("1.1.1.1", FAST)
+    cache.put("8.8.8.8", SLOW)
+    assert cache.get("1.1.1.1") == FAST
+    cache.put("9.9.9.9", SLOW)
+    # 8.8.8.8 was least recently used
+    assert cache.get("8.8.8.8") is None
+    assert cache.stats()["hits"] == 1
+
+    expired = LocationCache(ttl=0)
+    expired.put("1.1.1.1", FAST)
+    time.sleep(0.01)
+    assert expired.get("1.1.1.1") is None
+
+
+def test_client_lookups_use_the_client_ip(monkeypatch):
+    urls = []
+
+    def lookup(providers=geolocation.PROVIDERS, deadline=1.0):
+        urls.extend(providers)
+        return parse_location(FAST)
+
+    monkeypatch.setattr(geolocation, "lookup_ip_location", lookup)
+    monkeypatch.setattr(geolocation, "_cache", LocationCache())
+    assert get_client_location("203.0.113.7")["city"] == "Fast"
+    assert get_client_location("203.0.113.7")["city"] == "Fast"
+    assert all("203.0.113.7" in url for url in urls)
+    assert len(urls) == len(geolocation.CLIENT_PROVIDERS)
+
+
+def test_browser_coordinates_are_preferred(monkeypatch):
+    monkeypatch.setattr(geolocation, "_browser_location", lambda **kwargs: {"latitude": 39.86, "longitude": -74.83, "accuracy": 12})
+    coords = geolocation.browser_location(key="test")
+    assert coords["source"] == "browser"
+    assert geolocation.resolve_location(coords) is coords
+
+
+def test_refused_browser_location_falls_back_to_ip(monkeypatch):
+    monkeypatch.setattr(geolocation, "_browser_location", lambda **kwargs: {"error": "User denied Geolocation", "code": 1})
+    monkeypatch.setattr(geolocation, "get_client_location", lambda ip=None: parse_location(FAST))
+    coords = geolocation.browser_location(key="test")
+    assert coords == {"error": "User denied Geolocation"}
+    assert geolocation.resolve_location(coords)["city"] == "Fast"
+    assert geolocation.resolve_location(None)["city"] == "Fast"
@@ -0,0 +1,70 @@
+"""
+Tests for the health report's cached state and rate-limited deep check
+"""
+
+import threading
+import time
+
+import sheets
+import shifts
+from views import health
+
+
+def test_deep_check_is_rate_limited(monkeypatch):
+    calls = []
+
+    def probe():
+        calls.append(1)
+        return {"ok": True, "latency_ms": 1.0}
+
+    monkeypatch.setattr(sheets, "probe", probe)
+    monkeypatch.setattr(health, "_deep_result", None)
+    first = health.deep_check()
+    second = health.deep_check()
+    assert len(calls) == 1
+    assert first["cached"] is False
+    assert second["cached"] is True
+
+    monkeypatch.setattr(health, "DEEP_CHECK_INTERVAL_SECONDS", 0)
+    health.deep_check()
+    assert len(calls) == 2
+
+
+def test_index_state_never_builds_the_index(monkeypatch):
+    monkeypatch.setattr(shifts, "_index", None)
+    assert shifts.index_state() == {"built": False}
+    assert shifts._index is None
+
+
+def test_connection_state_does_not_wait_on_a_slow_connect(monkeypatch):
+    release = threading.Event()
+
+    def slow_connect():
+        release.wait(5)
+        raise RuntimeError("timed out")
+
+    monkeypatch.setattr(sheets, "is_configured", lambda: True)
+    monkeypatch.setattr(sheets, "connect", slow_connect)
+    monkeypatch.setattr(sheets, "_state", {"client": None, "spreadsheet": None, "worksheets": {},
+                                           "connected_at": None, "failed_at": {}, "last_error": None})
+    connecting = threading.Thread(target=sheets.get_worksheet, args=("Sheet1",))
+    connecting.start()
+    try:
+        time.sleep(0.05)
+        started = time.perf_counter()
+        assert sheets.connection_state()["connected"] is False
+        assert time.perf_counter() - started < 0.5
+    finally:
+        release.set()
+        connecting.join()
+    assert sheets.connection_state()["last_error"] == "timed out"
+
+
+def test_storage_stats_never_create_queues(monkeypatch):
+    import write_queue
+    from storage import SheetsBackend
+
+    monkeypatch.setattr(write_queue, "_queues", {})
+    stats = SheetsBackend().stats()
+    assert "punch_queue" not in stats and "registration_queue" not in stats
+    assert write_queue._queues == {}
@@ -0,0 +1,52 @@
+"""
+Tests for incremental hours aggregation
+"""
+
+from hours import HoursAggregator
+from storage import MemoryBackend
+
+
+class CountingBackend(MemoryBackend):
+    """Memory backend that records which rows each refresh asked for"""
+
+    def __init__(self):
+        super().__init__()
+        self.reads = []
+
+    def read_punches(self, start=0):
+        self.reads.append(start)
+        return super().read_punches(start)
+
+
+def test_refresh_reads_only_new_rows(tmp_path):
+    backend = CountingBackend()
+    cache = str(tmp_path / "hours.json")
+    backend.record_punch("Jane Doe", "In", "2025-01-03 10:00:00")
+    backend.record_punch("John Roe", "In", "2025-01-03 11:00:00")
+    backend.record_punch("jane doe", "Out", "2025-01-03 13:30:00")
+
+    aggregator = HoursAggregator(backend, cache)
+    assert aggregator.refresh() == 3
+    assert aggregator.volunteer_totals() == [("Jane Doe", 3.5, 1)]
+
+    backend.record_punch("John Roe", "Out", "2025-01-03 12:00:00")
+    backend.record_punch("Jane Doe", "In", "2025-01-04 09:00:00")
+    backend.record_punch("Jane Doe", "Out", "2025-01-04 10:00:00")
+    assert aggregator.refresh() == 3
+    assert backend.reads == [0, 3]
+
+    assert dict((name, hours) for name, hours, _ in aggregator.volunteer_totals()) == {"Jane Doe": 4.5, "John Roe": 1.0}
+    assert aggregator.day_totals() == [("2025-01-03", 4.5), ("2025-01-04", 1.0)]
+
+
+def test_cursor_and_totals_persist_in_cache(tmp_path):
+    backend = CountingBackend()
+    cache = str(tmp_path / "hours.json")
+    backend.record_punch("Jane Doe", "In", "2025-01-03 10:00:00")
+    HoursAggregator(backend, cache).refresh()
+
+    backend.record_punch("Jane Doe", "Out", "2025-01-03 12:00:00")
+    reloaded = HoursAggregator(backend, cache)
+    assert reloaded.refresh() == 1
+    assert backend.reads == [0, 1]
+    assert reloaded.volunteer_totals() == [("Jane Doe", 2.0, 1)]
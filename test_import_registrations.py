@@ -0,0 +1,61 @@
+"""
+Tests for the bulk registration import
+"""
+
+import csv
+
+import pandas as pd
+
+from import_registrations import import_registrations, normalize_ages, normalize_phones
+from storage import MemoryBackend
+
+HEADER = ["First Name", "Last Name", "Cell Phone", "Email", "Age Group", "Station", "Friday", "Saturday", "Sunday"]
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+    return str(path)
+
+
+def test_vectorized_normalizers():
+    assert list(normalize_phones(pd.Series(["(555) 123-4567", "1 555 123 4567", "12"]))) == ["555-123-4567", "555-123-4567", ""]
+    assert list(normalize_ages(pd.Series(["18+", "Adult", "16", "Under 18", "9", "?"]))) == ["18+", "18+", "14-18", "14-18", "", ""]
+
+
+def test_import_accepts_normalizes_and_rejects(tmp_path):
+    storage = MemoryBackend()
+    storage.record_registration(["Old", "Timer", "555-999-0000", "old@example.org", "18+", "Station 1 - Prizes/Kids Games",
+                                 "None", "1:30 pm - 4:30 pm", "None", "2025-01-01 09:00:00"])
+    path = write_csv(tmp_path / "signups.csv", [
+        ["Jane", "Doe", "(555) 123-4567", "Jane@Example.org", "adult", "cosmetology", "", "1:30 PM - 4:30 PM; 7:00 pm - 10:00 pm", ""],
+        ["Jane", "Again", "555.123.4567", "", "18+", "station2", "", "1:30 pm - 4:30 pm", ""],
+        ["Old", "Timer", "555 999 0000", "", "18+", "station1", "", "1:30 pm - 4:30 pm", ""],
+        ["Kid", "Roe", "555-222-3333", "", "15", "Inflatables", "", "1:30 pm - 4:30 pm", ""],
+        ["Bob", "Roe", "555-444-5555", "", "18+", "Basketball", "", "1:30 pm - 4:30 pm, 4:15 pm - 7:15 pm", ""],
+        ["Amy", "Roe", "555-666-7777", "", "18+", "Snacking", "9:00 am - 10:00 am", "", ""],
+        ["Tom", "Roe", "555-888-9999", "not-an-email", "18+", "Snacking", "", "1:30 pm - 4:30 pm", ""],
+    ])
+    rejects = tmp_path / "rejects.csv"
+    counts = import_registrations(path, storage, str(rejects), chunk_rows=3)
+    assert counts == {"read": 7, "accepted": 1, "written": 1, "rejected": 6}
+
+    imported = storage.list_registrations()[-1]
+    assert imported[:9] == ["Jane", "Doe", "555-123-4567", "jane@example.org", "18+", "Station 2 - Cosmetology",
+                            "None", "1:30 pm - 4:30 pm, 7:00 pm - 10:00 pm", "None"]
+    with open(rejects, newline="", encoding="utf-8") as f:
+        reasons = {row["line"]: row["reason"] for row in csv.DictReader(f)}
+    assert reasons == {
+        "3": "already registered", "4": "already registered", "5": "station is 18+ only",
+        "6": "overlapping Saturday slots", "7": "unknown Friday slot", "8": "invalid email"
+    }
+
+
+def test_dry_run_writes_nothing(tmp_path):
+    storage = MemoryBackend()
+    path = write_csv(tmp_path / "signups.csv", [["Jane", "Doe", "5551234567", "", "18+", "Snacking", "", "1:30 pm - 4:30 pm", ""]])
+    counts = import_registrations(path, storage, dry_run=True)
+    assert counts["accepted"] == 1 and counts["written"] == 0
+    assert storage.list_registrations() == []
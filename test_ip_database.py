@@ -0,0 +1,43 @@
+"""
+Tests for the offline CIDR-trie IP database
+"""
+
+import geolocation
+from geolocation import LocationCache
+from ip_database import IPDatabase, parse_cidr
+
+
+def write_csv(path, rows):
+    path.write_text("network,latitude,longitude,city,region,country\n" + "".join(f"{row}\n" for row in rows))
+    return str(path)
+
+
+def test_longest_prefix_wins(tmp_path):
+    database = IPDatabase.load(write_csv(tmp_path / "ranges.csv", [
+        "203.0.0.0/8,1.0,1.0,Wide,,",
+        "203.0.113.0/24,39.86,-74.83,Berlin,NJ,US",
+        "2001:db8::/32,10.0,20.0,Six,,",
+        "not-a-network,0,0,Bad,,"
+    ]))
+    assert len(database) == 3
+    assert database.lookup("203.0.113.7")["city"] == "Berlin"
+    assert database.lookup("203.9.9.9")["city"] == "Wide"
+    assert database.lookup("203.9.9.9")["region"] == "Unknown"
+    assert database.lookup("2001:db8::1")["city"] == "Six"
+    assert database.lookup("198.51.100.1") is None
+    assert database.lookup("garbage") is None
+
+
+def test_parse_cidr_masks_host_bits():
+    assert parse_cidr("10.1.2.3/8") == (4, 10 << 24, 8)
+    assert parse_cidr("10.1.2.3") == (4, (10 << 24) + (1 << 16) + (2 << 8) + 3, 32)
+
+
+def test_database_answers_before_http(monkeypatch):
+    database = IPDatabase()
+    database.add("203.0.113.0/24", 39.86, -74.83, "Berlin")
+    monkeypatch.setattr(geolocation, "get_ip_database", lambda: database)
+    monkeypatch.setattr(geolocation, "_cache", LocationCache())
+    monkeypatch.setattr(geolocation, "lookup_ip_location", lambda *args, **kwargs: {'error': 'offline'})
+    assert geolocation.get_client_location("203.0.113.7")["source"] == "database"
+    assert "error" in geolocation.get_client_location("198.51.100.1")
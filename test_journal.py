@@ -0,0 +1,70 @@
+"""
+Tests for the SQLite journal and journal-backed syncing
+"""
+
+import threading
+
+from journal import PUNCH, REGISTRATION, Journal
+from write_queue import WriteBehindQueue
+from test_write_queue import FakeWorksheet
+
+
+def test_journal_uses_wal_mode(tmp_path):
+    journal = Journal(str(tmp_path / "journal.db"))
+    mode = journal._conn.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+
+def test_watermark_tracks_synced_rows_per_kind(tmp_path):
+    journal = Journal(str(tmp_path / "journal.db"))
+    first = journal.append(PUNCH, ["Jane Doe", "In", "2025-01-01 10:00:00"])
+    journal.append(PUNCH, ["Jane Doe", "Out", "2025-01-01 14:00:00"])
+    journal.append(REGISTRATION, ["Jane", "Doe", "555-0100"])
+
+    assert journal.pending_count(PUNCH) == 2
+    journal.mark_synced(PUNCH, first)
+    assert journal.pending_count(PUNCH) == 1
+    assert journal.unsynced(PUNCH, 10)[0][1] == ["Jane Doe", "Out", "2025-01-01 14:00:00"]
+    assert journal.pending_count(REGISTRATION) == 1
+
+    # The watermark never moves backwards
+    journal.mark_synced(PUNCH, 0)
+    assert journal.pending_count(PUNCH) == 1
+
+
+def test_unsynced_rows_survive_a_restart(tmp_path):
+    path = str(tmp_path / "journal.db")
+    down = WriteBehindQueue(lambda: None, name=PUNCH, journal=Journal(path), flush_interval=60)
+    down.enqueue(["Jane Doe", "In", "2025-01-01 10:00:00"])
+    down.enqueue(["John Roe", "In", "2025-01-01 10:05:00"])
+    assert down.healthy()
+    down.journal.close()
+
+    sheet = FakeWorksheet()
+    restarted = WriteBehindQueue(lambda: sheet, name=PUNCH, journal=Journal(path), flush_interval=60)
+    assert restarted.depth() == 2
+    assert restarted.flush() == 2
+    assert [row[0] for row in sheet.rows()] == ["Jane Doe", "John Roe"]
+    assert restarted.depth() == 0
+
+
+def test_two_processes_sharing_a_journal_sync_each_row_once(tmp_path):
+    path = str(tmp_path / "shared.db")
+    sheet = FakeWorksheet()
+    first = WriteBehindQueue(lambda: sheet, name=PUNCH, journal=Journal(path), flush_interval=60)
+    second = WriteBehindQueue(lambda: sheet, name=PUNCH, journal=Journal(path), flush_interval=60)
+    for number in range(3):
+        first.journal.append(PUNCH, [f"Volunteer {number}", "In", "2025-01-01 10:00:00"])
+
+    # While one handle holds the sync claim the other stands back
+    with first.journal.sync_lock(PUNCH) as claimed:
+        assert claimed
+        assert second.flush(force=True) == 0
+
+    flushers = [threading.Thread(target=queue.flush, kwargs={"force": True}) for queue in (first, second) * 4]
+    for thread in flushers:
+        thread.start()
+    for thread in flushers:
+        thread.join()
+    assert [row[0] for row in sheet.rows()] == ["Volunteer 0", "Volunteer 1", "Volunteer 2"]
+    assert second.depth() == 0
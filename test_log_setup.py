@@ -0,0 +1,52 @@
+"""
+Tests for queue-based logging setup
+"""
+
+import logging
+import logging.handlers
+
+import pytest
+
+import log_setup
+from log_setup import DeferredQueueHandler, configure_logging, shutdown_logging
+
+
+@pytest.fixture
+def fresh_logging(monkeypatch, tmp_path):
+    """Configure logging into tmp_path and restore the root logger afterwards"""
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    monkeypatch.setattr(log_setup, "_listener", None)
+    monkeypatch.setattr(log_setup, "LOG_FILE", str(tmp_path / "volunteer_system.log"))
+    monkeypatch.setattr(log_setup, "LOG_MAX_BYTES", 2000)
+    monkeypatch.delenv("STREAMLIT_SHARING", raising=False)
+    yield tmp_path
+    shutdown_logging()
+    root.handlers = saved_handlers
+    root.setLevel(saved_level)
+
+
+def test_prepare_defers_formatting():
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "Punch IN: %s", ("Jane",), None)
+    prepared = DeferredQueueHandler(None).prepare(record)
+    assert prepared.msg == "Punch IN: Jane"
+    assert prepared.args is None
+    # The formatted line is built by the listener, not here
+    assert not hasattr(prepared, "message")
+
+
+def test_configure_once_and_rotate(fresh_logging):
+    configure_logging()
+    listener = log_setup._listener
+    configure_logging()
+    assert log_setup._listener is listener
+    assert [type(handler) for handler in logging.getLogger().handlers] == [DeferredQueueHandler]
+
+    for i in range(100):
+        logging.info(f"Punch IN: Volunteer {i} - 2025-01-01 10:00:00")
+    shutdown_logging()
+
+    log_file = fresh_logging / "volunteer_system.log"
+    assert log_file.exists()
+    assert (fresh_logging / "volunteer_system.log.1").exists()
+    assert " - INFO - Punch IN: Volunteer 99" in log_file.read_text()
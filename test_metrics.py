@@ -0,0 +1,45 @@
+"""
+Tests for the metrics registry and Prometheus text export
+"""
+
+from events import emit
+from metrics import Counter, Gauge, Histogram, Registry, EVENT_SECONDS, EVENTS_TOTAL, write_metrics
+
+
+def test_prometheus_text_format():
+    registry = Registry()
+    punches = registry.register(Counter("punches_total", "Punches", ("action",)))
+    latency = registry.register(Histogram("punch_seconds", "Punch latency", buckets=(0.1, 1.0)))
+    registry.register(Gauge("queue_depth", "Queue depth", lambda: 3))
+    punches.inc(action="In")
+    punches.inc(action="In")
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5.0)
+
+    text = registry.render()
+    assert "# TYPE punches_total counter" in text
+    assert 'punches_total{action="In"} 2' in text
+    assert 'punch_seconds_bucket{le="0.1"} 1' in text
+    assert 'punch_seconds_bucket{le="1.0"} 2' in text
+    assert 'punch_seconds_bucket{le="+Inf"} 3' in text
+    assert "punch_seconds_count 3" in text
+    assert "queue_depth 3" in text
+
+
+def test_register_returns_existing_metric():
+    registry = Registry()
+    first = registry.register(Counter("x_total", "X"))
+    assert registry.register(Counter("x_total", "X")) is first
+
+
+def test_events_feed_metrics(tmp_path):
+    before = EVENTS_TOTAL.value(event="punch", action="In", outcome="saved")
+    observed = EVENT_SECONDS.count(event="punch", action="In")
+    emit("punch", "saved", duration_ms=12.0, phases={"storage_write": 1.0}, action="In")
+    assert EVENTS_TOTAL.value(event="punch", action="In", outcome="saved") == before + 1
+    assert EVENT_SECONDS.count(event="punch", action="In") == observed + 1
+
+    path = tmp_path / "metrics.prom"
+    write_metrics(str(path))
+    assert 'volunteer_phase_duration_seconds_count{event="punch",phase="storage_write"}' in path.read_text()
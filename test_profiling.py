@@ -0,0 +1,42 @@
+"""
+Tests for the per-rerun section profiler
+"""
+
+import profiling
+from profiling import PageProfile, Profiler
+
+
+def test_nested_sections_fold_into_page_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "_profiles", {})
+    for _ in range(2):
+        profiler = Profiler("app_registration")
+        with profiler.section("view"):
+            with profiler.section("station_widgets"):
+                pass
+        profiler.finish()
+
+    profile = profiling._profiles["app_registration"]
+    assert profile.reruns == 2
+    assert profile.stacks["rerun;view;station_widgets"][0] == 2
+    folded = (tmp_path / "app_registration.folded").read_text().splitlines()
+    assert [line.rsplit(" ", 1)[0] for line in folded] == ["rerun", "rerun;view", "rerun;view;station_widgets"]
+    assert all(int(line.rsplit(" ", 1)[1]) >= 0 for line in folded)
+    summary = (tmp_path / "app_registration.txt").read_text()
+    assert summary.startswith("Page app_registration: 2 profiled reruns")
+
+
+def test_folded_reports_self_time():
+    profile = PageProfile("page")
+    profile.add([("rerun;a", 0.003), ("rerun;a;b", 0.002), ("rerun", 0.010)])
+    assert profile.folded().splitlines() == ["rerun 7000", "rerun;a 1000", "rerun;a;b 2000"]
+
+
+def test_disabled_profiler_is_a_no_op(monkeypatch):
+    monkeypatch.setattr(profiling, "profiling_enabled", lambda: False)
+    monkeypatch.setattr(profiling, "_profiles", {})
+    profiler = profiling.start_profile("app_punch_in")
+    with profiling.section("header"):
+        pass
+    profiler.finish()
+    assert profiling._profiles == {}
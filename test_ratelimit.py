@@ -0,0 +1,65 @@
+"""
+Tests for the Sheets rate limiter and retry scheduler
+"""
+
+import pytest
+import requests
+
+import ratelimit
+from ratelimit import RetryBudget, TokenBucket, call_sheets
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    """Retries back off without actually sleeping"""
+    monkeypatch.setattr(ratelimit, "BASE_RETRY_DELAY_SECONDS", 0.0)
+    monkeypatch.setattr(ratelimit, "_budget", RetryBudget())
+
+
+def test_token_bucket_throttles_past_capacity():
+    bucket = TokenBucket(rate=100, capacity=2)
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() > 0
+
+
+def test_retries_transient_errors():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise requests.exceptions.ConnectionError("connection reset")
+        return "ok"
+
+    before = ratelimit.stats()
+    assert call_sheets(flaky) == "ok"
+    after = ratelimit.stats()
+    assert len(attempts) == 3
+    assert after["calls"] - before["calls"] == 1
+    assert after["retried"] - before["retried"] == 2
+
+
+def test_other_errors_are_not_retried():
+    attempts = []
+
+    def broken():
+        attempts.append(1)
+        raise ValueError("bad range")
+
+    with pytest.raises(ValueError):
+        call_sheets(broken)
+    assert len(attempts) == 1
+
+
+def test_exhausted_budget_stops_retries(monkeypatch):
+    monkeypatch.setattr(ratelimit, "_budget", RetryBudget(maximum=1))
+    attempts = []
+
+    def down():
+        attempts.append(1)
+        raise requests.exceptions.Timeout("timed out")
+
+    with pytest.raises(requests.exceptions.Timeout):
+        call_sheets(down)
+    assert len(attempts) == 2
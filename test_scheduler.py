@@ -0,0 +1,108 @@
+"""
+Tests for the shift assignment solver
+"""
+
+from catalog import Catalog
+from scheduler import MinCostFlow, build_schedule, conflict_groups, load_volunteers, validate_schedule
+
+CATALOG = Catalog.from_dict({"days": ["Friday"], "stations": [
+    {"id": "a", "name": "Games", "capacity": 2, "slots": {"Friday": ["9:00 am - 12:00 pm", "12:00 pm - 3:00 pm"]}},
+    {"id": "b", "name": "Bounce", "capacity": 1, "adults_only": True, "slots": {"Friday": ["9:00 am - 12:00 pm"]}}
+]})
+
+
+def app_row(first, age, station, friday):
+    return [first, "Doe", "", f"{first.lower()}@example.com", age, station, friday, "None", "None", "2025-01-01 10:00:00"]
+
+
+def test_min_cost_flow_prefers_cheap_paths():
+    solver = MinCostFlow(4)
+    solver.add_edge(0, 1, 3, 0)
+    cheap = solver.add_edge(1, 2, 2, 1)
+    dear = solver.add_edge(1, 3, 5, 4)
+    solver.add_edge(2, 3, 2, 0)
+    assert solver.solve(0, 3) == (3, 2 * 1 + 1 * 4)
+    assert solver.flow(cheap) == 2
+    assert solver.flow(dear) == 1
+
+
+def test_schedule_fills_slots_with_preferences_and_age_rules():
+    volunteers = load_volunteers([
+        app_row("Ann", "18+", "Bounce", "9:00 am - 12:00 pm"),
+        app_row("Ben", "14-18", "Bounce", "9:00 am - 12:00 pm"),
+        app_row("Cat", "18+", "Bounce", "9:00 am - 12:00 pm, 12:00 pm - 3:00 pm"),
+        app_row("Dan", "18+", "Games", "9:00 am - 12:00 pm"),
+        app_row("Eve", "18+", "Games", "9:00 am - 12:00 pm")
+    ], CATALOG)
+    schedule = build_schedule(volunteers, CATALOG)
+    placed = {(item["name"], item["slot"]): (item["station"], item["preferred"]) for item in schedule["assignments"]}
+    # Three 9:00 am - 12:00 pm spots, all filled; the minor never lands on the adults-only station
+    assert sum(1 for name, slot in placed if slot == "9:00 am - 12:00 pm") == 3
+    assert placed.get(("Ben Doe", "9:00 am - 12:00 pm"), ("Games",))[0] == "Games"
+    assert placed[("Ann Doe", "9:00 am - 12:00 pm")] == ("Bounce", True)
+    assert placed[("Cat Doe", "12:00 pm - 3:00 pm")] == ("Games", False)
+    assert schedule["open_spots"][("Games", "Friday", "9:00 am - 12:00 pm")] == 0
+    assert schedule["open_spots"][("Games", "Friday", "12:00 pm - 3:00 pm")] == 1
+    assert len(schedule["unplaced"]) == 2
+
+
+def test_preferred_only_leaves_other_stations_alone():
+    volunteers = load_volunteers([app_row("Ann", "18+", "Bounce", "9:00 am - 12:00 pm"), app_row("Ann", "18+", "Bounce", "9:00 am - 12:00 pm")], CATALOG)
+    assert len(volunteers) == 1
+    schedule = build_schedule(volunteers, CATALOG, allow_other_stations=False)
+    assert [(item["station"], item["slot"]) for item in schedule["assignments"]] == [("Bounce", "9:00 am - 12:00 pm")]
+
+
+def test_schedule_never_double_books_overlapping_slots():
+    catalog = Catalog.from_dict({"days": ["Saturday"], "stations": [
+        {"id": "a", "name": "Games", "capacity": 1, "slots": {"Saturday": ["4:15 pm - 7:15 pm", "1:30 pm - 4:30 pm"]}}
+    ]})
+    rows = [["Ann", "Doe", "555-555-0101", "", "18+", "Games", "1:30 pm - 4:30 pm, 4:15 pm - 7:15 pm", ""],
+            ["Ben", "Doe", "555-555-0102", "", "18+", "Games", "4:15 pm - 7:15 pm", ""]]
+    schedule = build_schedule(load_volunteers(rows, catalog), catalog)
+    assert sorted((item["name"], item["slot"]) for item in schedule["assignments"]) == [
+        ("Ann Doe", "1:30 pm - 4:30 pm"), ("Ben Doe", "4:15 pm - 7:15 pm")
+    ]
+    assert validate_schedule(schedule["assignments"]) == []
+    assert validate_schedule([{"name": "Ann", "day": "Saturday", "slot": "1:30 pm - 4:30 pm"},
+                              {"name": "ann", "day": "Saturday", "slot": "4:15 pm - 7:15 pm"}]) != []
+
+
+def test_schedule_covers_overlapping_slots_across_volunteers():
+    catalog = Catalog.from_dict({"days": ["Saturday"], "stations": [
+        {"id": "a", "name": "Games", "capacity": 1, "slots": {"Saturday": ["1:30 pm - 4:30 pm", "4:15 pm - 7:15 pm"]}}
+    ]})
+    # Placing Ann at 1:30 first would leave 4:15 open; Ben can only do 1:30
+    rows = [["Ann", "Doe", "555-555-0101", "", "18+", "Games", "1:30 pm - 4:30 pm, 4:15 pm - 7:15 pm", ""],
+            ["Ben", "Doe", "555-555-0102", "", "18+", "Games", "1:30 pm - 4:30 pm", ""]]
+    schedule = build_schedule(load_volunteers(rows, catalog), catalog)
+    assert sorted((item["name"], item["slot"]) for item in schedule["assignments"]) == [
+        ("Ann Doe", "4:15 pm - 7:15 pm"), ("Ben Doe", "1:30 pm - 4:30 pm")
+    ]
+    assert sum(schedule["open_spots"].values()) == 0
+
+
+def test_top_up_uses_free_slots_in_a_run_of_overlaps():
+    catalog = Catalog.from_dict({"days": ["Saturday"], "stations": [
+        {"id": "a", "name": "Games", "capacity": 1,
+         "slots": {"Saturday": ["1:30 pm - 4:30 pm", "4:15 pm - 7:15 pm", "7:00 pm - 10:00 pm"]}}
+    ]})
+    rows = [["Ann", "Doe", "555-555-0101", "", "18+", "Games", "1:30 pm - 4:30 pm, 7:00 pm - 10:00 pm", ""]]
+    schedule = build_schedule(load_volunteers(rows, catalog), catalog)
+    assert [item["slot"] for item in schedule["assignments"]] == ["1:30 pm - 4:30 pm", "7:00 pm - 10:00 pm"]
+    assert conflict_groups(["7:00 pm - 10:00 pm", "1:30 pm - 4:30 pm", "4:15 pm - 7:15 pm", "9:00 am - 12:00 pm"]) == [
+        ["9:00 am - 12:00 pm"], ["1:30 pm - 4:30 pm", "4:15 pm - 7:15 pm", "7:00 pm - 10:00 pm"]
+    ]
+
+
+def test_namesakes_are_scheduled_separately():
+    rows = [["Ann", "Doe", "555-555-0101", "", "18+", "Games", "9:00 am - 12:00 pm", "None", "None", ""],
+            ["Ann", "Doe", "555-555-0102", "", "18+", "Games", "9:00 am - 12:00 pm", "None", "None", ""],
+            ["Ann", "Doe", "1 (555) 555-0101", "", "18+", "Games", "12:00 pm - 3:00 pm", "None", "None", ""]]
+    volunteers = load_volunteers(rows, CATALOG)
+    assert len(volunteers) == 2
+    schedule = build_schedule(volunteers, CATALOG, allow_other_stations=False)
+    assert sorted(item["slot"] for item in schedule["assignments"]) == [
+        "12:00 pm - 3:00 pm", "9:00 am - 12:00 pm", "9:00 am - 12:00 pm"
+    ]
+    assert validate_schedule(schedule["assignments"]) == []
@@ -0,0 +1,63 @@
+"""
+Tests for the open-shift index
+"""
+
+from datetime import timedelta
+
+from shifts import OpenShiftIndex, format_duration, normalize_name
+
+
+def test_names_are_normalized():
+    assert normalize_name("  Jane   DOE ") == normalize_name("jane doe")
+
+
+def test_rebuild_pairs_punches_and_skips_headers():
+    index = OpenShiftIndex()
+    index.rebuild([
+        ["Name", "Action", "Timestamp"],
+        ["Jane Doe", "In", "2025-01-01 10:00:00"],
+        ["John Roe", "In", "2025-01-01 10:05:00"],
+        ["jane doe", "Out", "2025-01-01 13:00:00"],
+        ["Mary Major", "In", "2025-01-01 11:00:00"],
+    ])
+    assert index.open_count() == 2
+    assert index.open_since("Jane Doe") is None
+    assert index.open_since("JOHN ROE") is not None
+
+
+def test_punch_out_reports_duration():
+    index = OpenShiftIndex()
+    assert index.punch_in("Jane Doe", "2025-01-01 10:00:00") is None
+    duration = index.punch_out(" jane  doe", "2025-01-01 13:25:00")
+    assert duration == timedelta(hours=3, minutes=25)
+    assert format_duration(duration) == "3h 25m"
+
+
+def test_punch_out_without_punch_in_is_flagged():
+    index = OpenShiftIndex()
+    assert index.punch_out("Jane Doe", "2025-01-01 13:00:00") is None
+
+
+def test_second_punch_in_keeps_original_start():
+    index = OpenShiftIndex()
+    index.punch_in("Jane Doe", "2025-01-01 10:00:00")
+    assert index.punch_in("Jane Doe", "2025-01-01 10:02:00") is not None
+    assert index.punch_out("Jane Doe", "2025-01-01 11:00:00") == timedelta(hours=1)
+
+
+def test_refresh_picks_up_punches_from_another_app():
+    header = ["Name", "Action", "Timestamp"]
+    index = OpenShiftIndex()
+    index.rebuild([header])
+    # This process punched John in and out; another app punched Jane in
+    index.punch_in("John Roe", "2025-01-01 09:00:00")
+    index.punch_out("John Roe", "2025-01-01 12:00:00")
+    assert index.open_since("Jane Doe") is None
+
+    stored = [header, ["John Roe", "In", "2025-01-01 09:00:00"], ["Jane Doe", "In", "2025-01-01 10:00:00"],
+              ["John Roe", "Out", "2025-01-01 12:00:00"]]
+    index.refresh(index.cursor, stored[index.cursor:])
+    assert index.cursor == 4
+    assert index.punch_out("Jane Doe", "2025-01-01 13:00:00") == timedelta(hours=3)
+    # Replaying this process's own punches doesn't reopen John's shift
+    assert index.open_since("John Roe") is None
@@ -0,0 +1,59 @@
+"""
+Tests for slot parsing and the per-volunteer interval index
+"""
+
+import pytest
+
+from slots import BookingIndex, IntervalIndex, find_overlaps, parse_slot
+
+
+def test_parse_slot_handles_notes_noon_and_midnight():
+    assert parse_slot("1:30 pm - 4:30 pm") == (13 * 60 + 30, 16 * 60 + 30)
+    assert parse_slot("10:45 am - 1:45 pm (Set up)") == (10 * 60 + 45, 13 * 60 + 45)
+    assert parse_slot("12:00 pm - 12:30 pm") == (12 * 60, 12 * 60 + 30)
+    assert parse_slot("11:00 pm - 1:00 am") == (23 * 60, 25 * 60)
+    with pytest.raises(ValueError):
+        parse_slot("Morning")
+
+
+def test_find_overlaps_within_one_selection():
+    assert find_overlaps(["4:15 pm - 7:15 pm", "1:30 pm - 4:30 pm", "7:15 pm - 8:00 pm"]) == [
+        ("1:30 pm - 4:30 pm", "4:15 pm - 7:15 pm")
+    ]
+    assert find_overlaps(["10:00 am - 1:00 pm", "1:00 pm - 4:00 pm"]) == []
+
+
+def test_interval_index_finds_conflicts_even_among_overlapping_bookings():
+    index = IntervalIndex()
+    index.add("10:00 am - 6:00 pm")
+    index.add("1:00 pm - 2:00 pm")
+    # A short booking after a long one must not hide the long one
+    assert index.conflict("3:00 pm - 4:00 pm") == "10:00 am - 6:00 pm"
+    assert index.conflict("6:00 pm - 7:00 pm") is None
+    assert index.conflict("9:00 am - 10:00 am") is None
+    index.remove("10:00 am - 6:00 pm")
+    assert index.conflict("3:00 pm - 4:00 pm") is None
+    assert index.conflict("1:30 pm - 1:45 pm") == "1:00 pm - 2:00 pm"
+
+
+def test_interval_index_keeps_the_latest_ending_label_through_inserts():
+    index = IntervalIndex()
+    index.add("1:00 pm - 2:00 pm")
+    index.add("4:00 pm - 5:00 pm")
+    # Inserted at the front, so every running maximum after it changes
+    index.add("9:00 am - 6:00 pm")
+    assert index.conflict("5:30 pm - 7:00 pm") == "9:00 am - 6:00 pm"
+    assert index.conflict("2:30 pm - 3:00 pm") == "9:00 am - 6:00 pm"
+    index.remove("9:00 am - 6:00 pm")
+    assert index.conflict("2:30 pm - 3:00 pm") is None
+    assert index.conflict("4:30 pm - 7:00 pm") == "4:00 pm - 5:00 pm"
+
+
+def test_booking_index_is_per_volunteer_and_day():
+    bookings = BookingIndex()
+    bookings.book("jane", "Saturday", ["1:30 pm - 4:30 pm"])
+    assert bookings.conflicts("jane", "Saturday", ["4:15 pm - 7:15 pm"]) == [("4:15 pm - 7:15 pm", "1:30 pm - 4:30 pm")]
+    assert bookings.conflicts("jane", "Sunday", ["4:15 pm - 7:15 pm"]) == []
+    assert bookings.conflicts("john", "Saturday", ["4:15 pm - 7:15 pm"]) == []
+    bookings.release("jane", "Saturday", ["1:30 pm - 4:30 pm"])
+    assert bookings.volunteer_count() == 0
@@ -0,0 +1,63 @@
+"""
+Tests for the storage backends
+"""
+
+import time
+
+import pytest
+
+import storage
+from storage import JsonlBackend, MemoryBackend, SQLiteBackend
+
+REGISTRATION = ["Jane", "Doe", "555-0100", "jane@example.com", "18+", "Station 2 - Cosmetology",
+                "None", "1:30 pm - 4:30 pm", "None", "2025-01-01 09:00:00"]
+
+
+@pytest.fixture(params=["memory", "sqlite", "jsonl"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteBackend(str(tmp_path / "data.db"))
+    if request.param == "jsonl":
+        return JsonlBackend(str(tmp_path / "jsonl"))
+    return MemoryBackend()
+
+
+def test_round_trip(backend):
+    assert backend.record_punch("Jane Doe", "In", "2025-01-01 10:00:00")
+    assert backend.record_punch("Jane Doe", "Out", "2025-01-01 14:00:00")
+    assert backend.record_registration(REGISTRATION)
+
+    assert backend.list_punches() == [
+        ["Jane Doe", "In", "2025-01-01 10:00:00"],
+        ["Jane Doe", "Out", "2025-01-01 14:00:00"],
+    ]
+    assert backend.list_registrations() == [REGISTRATION]
+
+
+def test_memory_backend_injects_latency():
+    backend = MemoryBackend(latency=0.02)
+    started = time.perf_counter()
+    backend.record_punch("Jane Doe", "In", "2025-01-01 10:00:00")
+    assert time.perf_counter() - started >= 0.02
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        storage.create_storage("postgres")
+
+
+def test_bulk_registrations_keep_order(backend):
+    rows = [REGISTRATION[:1] + [f"Doe{number}"] + REGISTRATION[2:] for number in range(3)]
+    assert backend.record_registration(REGISTRATION)
+    assert backend.record_registrations(rows) == 3
+    assert backend.list_registrations() == [REGISTRATION] + rows
+
+
+def test_update_registration_checks_the_stored_row(backend):
+    other = REGISTRATION[:1] + ["Roe"] + REGISTRATION[2:]
+    updated = REGISTRATION[:6] + ["None", "None", "9:00 am - 12:00 pm", "2025-01-02 09:00:00"]
+    backend.record_registrations([other, REGISTRATION])
+    assert not backend.update_registration(1, updated, expected=other)
+    assert not backend.update_registration(5, updated)
+    assert backend.update_registration(1, updated, expected=REGISTRATION)
+    assert backend.list_registrations() == [other, updated]
@@ -0,0 +1,106 @@
+"""
+Tests for the write-behind punch queue, using a fake worksheet
+"""
+
+import threading
+import time
+
+import write_queue
+from write_queue import WriteBehindQueue
+
+
+class FakeWorksheet:
+    """Records append_rows batches and can be told to fail"""
+
+    def __init__(self, failures=0):
+        self.batches = []
+        self.failures = failures
+        self.lock = threading.Lock()
+
+    def append_rows(self, rows):
+        with self.lock:
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("429 quota exceeded")
+            self.batches.append([list(row) for row in rows])
+
+    def rows(self):
+        with self.lock:
+            return [row for batch in self.batches for row in batch]
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_rows_are_coalesced_into_batches():
+    sheet = FakeWorksheet()
+    queue = WriteBehindQueue(lambda: sheet, flush_interval=0.05, max_batch=10)
+    for i in range(25):
+        assert queue.enqueue([f"Volunteer {i}", "In", "2025-01-01 10:00:00"])
+
+    assert wait_for(lambda: len(sheet.rows()) == 25)
+    # The flusher may wake mid-burst, so only the batch bound is fixed
+    assert all(len(batch) <= 10 for batch in sheet.batches)
+    assert len(sheet.batches) < 25
+    assert [row[0] for row in sheet.rows()] == [f"Volunteer {i}" for i in range(25)]
+    queue.close()
+
+    stats = queue.stats()
+    assert stats["queue_depth"] == 0
+    assert stats["flush_count"] == len(sheet.batches)
+    assert stats["flushed_rows"] == 25
+
+
+def test_failed_flush_backs_off_and_keeps_rows():
+    sheet = FakeWorksheet(failures=1)
+    errors = []
+    queue = WriteBehindQueue(lambda: sheet, on_error=errors.append, flush_interval=60)
+    queue.enqueue(["Jane Doe", "In", "2025-01-01 10:00:00"])
+
+    assert queue.flush() == 0
+    assert len(errors) == 1
+    assert queue.stats()["failed_flushes"] == 1
+    assert queue.stats()["backoff_seconds"] >= write_queue.INITIAL_BACKOFF_SECONDS
+
+    # Still backing off, so a regular flush does not call the API again
+    assert queue.flush() == 0
+    assert sheet.batches == []
+
+    assert queue.flush(force=True) == 1
+    assert sheet.rows() == [["Jane Doe", "In", "2025-01-01 10:00:00"]]
+    assert queue.stats()["backoff_seconds"] == 0.0
+    assert queue.stats()["last_error"] is None
+
+
+def test_close_flushes_pending_rows():
+    sheet = FakeWorksheet()
+    queue = WriteBehindQueue(lambda: sheet, flush_interval=60)
+    queue.enqueue(["Jane Doe", "Out", "2025-01-01 14:00:00"])
+    queue.close()
+    assert sheet.rows() == [["Jane Doe", "Out", "2025-01-01 14:00:00"]]
+
+
+def test_full_queue_refuses_rows():
+    queue = WriteBehindQueue(lambda: None, flush_interval=60, max_pending=2)
+    assert queue.enqueue(["A", "In", "t"])
+    assert queue.enqueue(["B", "In", "t"])
+    assert not queue.enqueue(["C", "In", "t"])
+    assert queue.stats()["rejected_rows"] == 1
+    assert queue.depth() == 2
+
+
+def test_queue_is_unhealthy_after_persistent_failures(monkeypatch):
+    sheet = FakeWorksheet(failures=1)
+    queue = WriteBehindQueue(lambda: sheet, flush_interval=60)
+    queue.enqueue(["Jane Doe", "In", "t"])
+    queue.flush()
+    assert queue.healthy()
+
+    monkeypatch.setattr(write_queue, "STALE_ERROR_SECONDS", 0.0)
+    assert not queue.healthy()
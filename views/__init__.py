@@ -0,0 +1,3 @@
+"""
+Page views for app.py, imported lazily so each request only loads what its page needs
+"""
@@ -0,0 +1,83 @@
+"""
+Health check view for ?health=check (cached state only) and ?health=deep (rate-limited live Sheets test)
+"""
+
+import sys
+import threading
+import time
+from datetime import datetime
+
+import streamlit as st
+
+from events import Event
+from log_setup import PROCESS_STARTED_AT
+from sheets import connection_state, is_configured as sheets_configured
+from shifts import index_state
+from storage import get_storage
+
+# Live Sheets round trips are shared by every prober and run at most this often
+DEEP_CHECK_INTERVAL_SECONDS = 60
+
+_deep_lock = threading.Lock()
+_deep_result = None
+_deep_checked_at = 0.0
+
+
+def deep_check():
+    """Most recent live Sheets probe, refreshed when older than DEEP_CHECK_INTERVAL_SECONDS"""
+    global _deep_result, _deep_checked_at
+    with _deep_lock:
+        now = time.monotonic()
+        if _deep_result is None or now - _deep_checked_at >= DEEP_CHECK_INTERVAL_SECONDS:
+            import sheets
+
+            _deep_result = {**sheets.probe(), "checked_at": datetime.now().isoformat()}
+            _deep_checked_at = now
+            cached = False
+        else:
+            cached = True
+        return {**_deep_result, "cached": cached}
+
+
+def render(deep=False):
+    """JSON health report built from in-process state; no network I/O unless deep"""
+    health_event = Event("health", deep=deep)
+    connection = connection_state()
+    report = {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "version": "1.0.0",
+        "uptime_seconds": round(time.time() - PROCESS_STARTED_AT, 1),
+        "sheets_enabled": sheets_configured(),
+        "storage": get_storage().stats(),
+        "caches": {
+            "sheets_connection": connection,
+            "shift_index": index_state()
+        },
+        "services": {
+            "google_sheets": "connected" if connection["connected"] else "disconnected",
+            "location_services": "available"
+        }
+    }
+    # Only report the location cache and registration indexes if a page has already loaded them
+    geolocation = sys.modules.get("geolocation")
+    if geolocation is not None:
+        report["caches"]["location"] = geolocation.cache_stats()
+    capacity = sys.modules.get("capacity")
+    if capacity is not None:
+        report["caches"]["capacity_index"] = capacity.index_state()
+    dedupe = sys.modules.get("dedupe")
+    if dedupe is not None:
+        report["caches"]["registration_index"] = dedupe.index_state()
+    if deep:
+        with health_event.phase("deep_check"):
+            report["deep_check"] = deep_check()
+        if not report["deep_check"]["ok"]:
+            report["status"] = "degraded"
+    st.json(report)
+    health_event.emit(report["status"])
+
+
+def render_deep():
+    """Health report plus the rate-limited live Sheets test"""
+    render(deep=True)
@@ -0,0 +1,136 @@
+"""
+QR punch in / punch out views
+"""
+
+import logging
+import random
+from datetime import datetime
+
+import streamlit as st
+
+from events import Event
+from sheets import is_configured as sheets_configured
+from shifts import format_duration, get_shift_index, refresh_shift_index
+from storage import get_storage
+
+volunteer_verses = [
+    "Each of you should use whatever gift you have received to serve others, as faithful stewards of God's grace. — 1 Peter 4:10",
+    "Whatever you do, work at it with all your heart, as working for the Lord, not for human masters. — Colossians 3:23",
+    "Serve wholeheartedly, as if you were serving the Lord, not people. — Ephesians 6:7",
+    "The greatest among you will be your servant. — Matthew 23:11",
+    "Carry each other's burdens, and in this way you will fulfill the law of Christ. — Galatians 6:2"
+]
+
+
+def punch_in():
+    """Punch in view for ?action=punch_in"""
+    # Show only Punch In interface
+    st.success("🎯 QR Code Scanned: PUNCH IN")
+    st.markdown("<h1>🟢 Volunteer Punch In</h1>", unsafe_allow_html=True)
+
+    _punch_in_form()
+
+
+@st.fragment
+def _punch_in_form():
+    """Name input and punch button, rerun on their own so typing doesn't redraw the page"""
+    punch_event = Event("punch", action="In", page="app")
+    sheets_enabled = sheets_configured()
+
+    # Name input
+    name = st.text_input("Full Name*", key="punch_in_name", placeholder="Enter your full name")
+    
+    if name:
+        # Punch In Section
+        st.markdown('<p style="text-align: center; color: #155724; margin-bottom: 20px;">Start your volunteer service</p>', unsafe_allow_html=True)
+        
+        if st.button("🟢 Punch In Now", key="qr_punch_in", use_container_width=True):
+            punch_event.mark("render")
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            with punch_event.phase("shift_index"):
+                shift_index = get_shift_index()
+            # Saved through the configured storage backend (journaled and synced for Sheets)
+            with punch_event.phase("storage_write"):
+                saved = get_storage().record_punch(name, "In", timestamp)
+            if saved:
+                st.success(f"👋 Welcome {name}! You've successfully punched in. 🌟")
+                logging.info(f"Punch IN: {name} - {timestamp}")
+                previous_start = shift_index.punch_in(name, timestamp) if shift_index is not None else None
+                if previous_start is not None:
+                    st.info(f"ℹ️ You were already punched in since {previous_start.strftime('%I:%M %p')}.")
+                if not sheets_enabled:
+                    st.info(f"📝 Punch data: {name} - In - {timestamp}")
+            else:
+                st.error("❌ Your punch in could not be saved.")
+                st.info(f"📝 Manual record: {name} - In - {timestamp}")
+                st.info("💡 Please inform the volunteer coordinator of this punch in.")
+                logging.error(f"Punch IN not saved: {name} - {timestamp}")
+            
+            verse = random.choice(volunteer_verses)
+            st.info(f"📖 Verse for you: {verse}")
+            punch_event.emit("saved" if saved else "failed")
+        
+        st.markdown('</div>', unsafe_allow_html=True)
+    else:
+        st.info("📝 Please enter your name to punch in.")
+
+
+def punch_out():
+    """Punch out view for ?action=punch_out"""
+    # Show only Punch Out interface
+    st.success("🎯 QR Code Scanned: PUNCH OUT")
+    st.markdown("<h1>🔴 Volunteer Punch Out</h1>", unsafe_allow_html=True)
+
+    _punch_out_form()
+
+
+@st.fragment
+def _punch_out_form():
+    """Name input and punch button, rerun on their own so typing doesn't redraw the page"""
+    punch_event = Event("punch", action="Out", page="app")
+    sheets_enabled = sheets_configured()
+
+    # Name input
+    name = st.text_input("Full Name*", key="punch_out_name", placeholder="Enter your full name")
+    
+    if name:
+        # Punch Out Section
+        st.markdown('<div class="punch-out-panel">', unsafe_allow_html=True)
+        st.markdown('<div class="panel-header punch-out-header">🔴 PUNCH OUT</div>', unsafe_allow_html=True)
+        st.markdown('<p style="text-align: center; color: #721C24; margin-bottom: 20px;">Complete your volunteer service</p>', unsafe_allow_html=True)
+        
+        if st.button("🔴 Punch Out Now", key="qr_punch_out", use_container_width=True):
+            punch_event.mark("render")
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            with punch_event.phase("shift_index"):
+                shift_index = get_shift_index()
+                # Before deciding there was no punch-in, read punches other apps (a separately
+                # deployed punch_in.py) recorded since this process built its index
+                if shift_index is not None and shift_index.open_since(name) is None:
+                    refresh_shift_index()
+            # Saved through the configured storage backend (journaled and synced for Sheets)
+            with punch_event.phase("storage_write"):
+                saved = get_storage().record_punch(name, "Out", timestamp)
+            if saved:
+                st.success(f"🎉 Great job, {name}! You've successfully punched out. 🙏")
+                logging.info(f"Punch OUT: {name} - {timestamp}")
+                duration = shift_index.punch_out(name, timestamp) if shift_index is not None else None
+                if duration is not None:
+                    st.info(f"⏱️ Shift duration: {format_duration(duration)}")
+                elif shift_index is not None:
+                    st.warning("⚠️ We couldn't find a punch in for this name. Please let the volunteer coordinator know when you started.")
+                if not sheets_enabled:
+                    st.info(f"📝 Punch data: {name} - Out - {timestamp}")
+            else:
+                st.error("❌ Your punch out could not be saved.")
+                st.info(f"📝 Manual record: {name} - Out - {timestamp}")
+                st.info("💡 Please inform the volunteer coordinator of this punch out.")
+                logging.error(f"Punch OUT not saved: {name} - {timestamp}")
+            
+            verse = random.choice(volunteer_verses)
+            st.info(f"📖 Verse for you: {verse}")
+            punch_event.emit("saved" if saved else "failed")
+        
+        st.markdown('</div>', unsafe_allow_html=True)
+    else:
+        st.info("📝 Please enter your name to punch out.")
@@ -0,0 +1,144 @@
+"""
+Volunteer registration view, the default page
+"""
+
+import logging
+from datetime import datetime
+from functools import partial
+
+import streamlit as st
+
+from capacity import get_capacity_index, refresh_capacity_index, volunteer_key
+from catalog import get_catalog
+from dedupe import get_registration_index, save_registration
+from events import Event
+from profiling import section
+from slots import find_overlaps
+
+
+def slot_label(capacity_index, station_name, day, slot):
+    """Slot with its open spots, e.g. '1:30 pm - 4:30 pm (3 left)'"""
+    remaining = capacity_index.remaining(station_name, day, slot) if capacity_index is not None else None
+    if remaining is None:
+        return slot
+    return f"{slot} (full)" if remaining == 0 else f"{slot} ({remaining} left)"
+
+
+def render():
+    """Registration form"""
+    registration_event = Event("registration", page="app")
+    catalog = get_catalog()
+    # Registration
+    st.markdown("<h1>Volunteer Registration Form </h1>", unsafe_allow_html=True)
+    st.markdown("<p>Please fill out your information below.</p>", unsafe_allow_html=True)
+
+    # Station choice sits outside the form so changing it reruns the page and
+    # only the chosen station's slot widgets are built
+    with section("station_select"):
+        st.subheader("Station Assignment")
+        station_name = st.radio(
+            "Select your preferred station*", catalog.station_names(),
+            format_func=lambda name: catalog.station(name).title, horizontal=True, key="station_choice"
+        )
+        station = catalog.station(station_name)
+    
+    with st.form("registration_form"):
+        with section("personal_info"):
+            st.subheader("Personal Information")
+            col1, col2 = st.columns(2)
+            first_name = col1.text_input("First Name*", max_chars=50)
+            last_name = col2.text_input("Last Name*", max_chars=50)
+            cell_phone = st.text_input("Cell Phone*")
+            email = st.text_input("Email")
+            age = st.radio("Age*", ["14-18", "18+"])
+
+        with section("station_widgets"):
+            st.markdown(f"**{station.title} time slots:**")
+            if station.description:
+                st.caption(station.description)
+
+            # Counts come from the in-memory capacity index, not a sheet read
+            capacity_index = get_capacity_index()
+            selected_slots = {}
+            day_tabs = st.tabs(list(catalog.days))
+            for day, day_tab in zip(catalog.days, day_tabs):
+                with day_tab:
+                    # Option labels stay fixed: multiselect keeps selections by label, so a count in
+                    # the label would drop a selection as soon as someone else signed up
+                    selected_slots[day] = st.multiselect(
+                        f"{day} Availability", station.day_slots(day), key=f"{station.id}_{day.lower()}"
+                    )
+                    if station.capacity is not None and station.day_slots(day):
+                        st.caption("Open spots: " + " · ".join(map(partial(slot_label, capacity_index, station.name, day), station.day_slots(day))))
+
+        submitted = st.form_submit_button("Submit Registration")
+        if submitted:
+            with section("submit"):
+                registration_event.mark("render")
+                with registration_event.phase("validation"):
+                    valid = bool(first_name and last_name and cell_phone) and not any(
+                        catalog.invalid_slots(station.name, day, slots) for day, slots in selected_slots.items()
+                    )
+                if not valid:
+                    st.error("❌ Please fill out all required fields (*)")
+                    registration_event.emit("invalid")
+                    return
+                if not station.accepts(age):
+                    st.error(f"❌ {station.name} needs volunteers 18 or older, please choose another station")
+                    registration_event.emit("invalid", station=station.name)
+                    return
+                volunteer_name = f"{first_name} {last_name}"
+                volunteer = volunteer_key(cell_phone, email, volunteer_name)
+                # Pick up sign-ups other apps saved since the counts were built before deciding
+                refresh_capacity_index()
+                # A resubmission (same phone or email, and name) replaces the earlier row, so that row's
+                # slots are set aside while this one is checked and put back if it isn't saved
+                registration_index = get_registration_index()
+                position, previous = registration_index.find(cell_phone, email, volunteer_name) if registration_index is not None else (None, None)
+                if previous is not None and capacity_index is not None:
+                    capacity_index.remove_row(previous)
+                replaced = False
+                try:
+                    with registration_event.phase("overlap_check"):
+                        overlaps = [(day, first, second) for day, slots in selected_slots.items() for first, second in find_overlaps(slots)]
+                        booked = capacity_index.conflicts(volunteer, selected_slots) if capacity_index is not None else []
+                    if overlaps:
+                        st.error("❌ These time slots overlap, please pick one of each pair: " + "; ".join(f"{day} {first} / {second}" for day, first, second in overlaps))
+                        registration_event.emit("invalid", station=station.name)
+                        return
+                    if booked:
+                        st.error("❌ You're already signed up at overlapping times: " + "; ".join(f"{day} {slot} (overlaps {existing})" for day, slot, existing in booked))
+                        registration_event.emit("conflict", station=station.name)
+                        return
+                    with registration_event.phase("capacity"):
+                        full_slots = capacity_index.reserve(station.name, selected_slots, volunteer) if capacity_index is not None else []
+                    if full_slots:
+                        st.error("❌ These time slots are full, please choose others: " + ", ".join(f"{day} {slot}" for day, slot in full_slots))
+                        registration_event.emit("full", station=station.name)
+                        return
+
+                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    # One column per catalog day, in catalog order
+                    day_columns = [', '.join(selected_slots[day]) if selected_slots[day] else 'None' for day in catalog.days]
+
+                    # Saved through the configured storage backend (journaled and synced for Sheets)
+                    with registration_event.phase("storage_write"):
+                        row = [first_name, last_name, cell_phone, email, age, station.name] + day_columns + [timestamp]
+                        saved, replaced = save_registration(row, position)
+                    if saved and capacity_index is not None:
+                        capacity_index.note_saved(row, previous if replaced else None)
+                    if saved and replaced:
+                        st.success(f"✅ Thanks {first_name}! We already had you registered, so your registration has been updated to {station.name}. 🙏")
+                        logging.info(f"Volunteer registration updated: {first_name} {last_name} - {station.name}")
+                    elif saved:
+                        st.success(f"✅ Thank you {first_name}! Your registration for {station.name} has been recorded. 🙏")
+                        logging.info(f"New volunteer registration: {first_name} {last_name} - {station.name}")
+                    else:
+                        if capacity_index is not None:
+                            capacity_index.release(station.name, selected_slots, volunteer)
+                        st.error("❌ Failed to save registration. Please contact the church office.")
+                        logging.error(f"Registration failed for {first_name} {last_name}")
+                finally:
+                    if previous is not None and capacity_index is not None and not replaced:
+                        capacity_index.add_row(previous)
+                registration_event.emit("updated" if replaced else "saved" if saved else "failed", station=station.name)
@@ -5,13 +5,14 @@ Fixed QR Code Volunteer System - Works without Google Sheets
 
 import streamlit as st
 from datetime import datetime
-from geopy.distance import geodesic
 import random
-import logging
-import requests
+from events import Event
+from geofence import CHURCH_GEOFENCE
+from geolocation import browser_location, resolve_location
+from log_setup import configure_logging
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+configure_logging()
 
 # Page configuration
 st.set_page_config(
@@ -114,9 +115,6 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Configuration
-CHURCH_LOCATION = (39.8637, -74.8284)
-MAX_DISTANCE_METERS = 50000  # 50km for testing
-
 volunteer_verses = [
     "Each of you should use whatever gift you have received to serve others, as faithful stewards of God's grace. — 1 Peter 4:10",
     "Whatever you do, work at it with all your heart, as working for the Lord, not for human masters. — Colossians 3:23",
@@ -125,48 +123,24 @@ volunteer_verses = [
     "Carry each other's burdens, and in this way you will fulfill the law of Christ. — Galatians 6:2"
 ]
 
-# Location detection function
-@st.cache_data(ttl=300)
-def get_ip_location():
-    try:
-        services = [
-            "https://ipapi.co/json/",
-            "http://ip-api.com/json/",
-            "https://ipinfo.io/json"
-        ]
-        
-        for service in services:
-            try:
-                response = requests.get(service, timeout=5)
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    if 'latitude' in data and 'longitude' in data:
-                        return {
-                            'latitude': data['latitude'],
-                            'longitude': data['longitude'],
-                            'city': data.get('city', 'Unknown')
-                        }
-                    elif 'lat' in data and 'lon' in data:
-                        return {
-                            'latitude': data['lat'],
-                            'longitude': data['lon'],
-                            'city': data.get('city', 'Unknown')
-                        }
-                    elif 'loc' in data:
-                        lat, lon = data['loc'].split(',')
-                        return {
-                            'latitude': float(lat),
-                            'longitude': float(lon),
-                            'city': data.get('city', 'Unknown')
-                        }
-            except Exception:
-                continue
-        
-        return {'error': 'Unable to determine location'}
-        
-    except Exception as e:
-        return {'error': str(e)}
+def location_fields(coords):
+    """Coordinates and geofence result recorded with a punch; on_site is None without coordinates"""
+    return {
+        'location': coords.get('city', 'Unknown') if 'error' not in coords else 'Unknown',
+        'latitude': coords.get('latitude'),
+        'longitude': coords.get('longitude'),
+        'location_source': coords.get('source', 'ip'),
+        'on_site': CHURCH_GEOFENCE.contains_location(coords)
+    }
+
+
+def show_geofence_result(punch_record):
+    """Flag punches whose coordinates fall outside the church grounds for the coordinator"""
+    if punch_record['on_site'] is False:
+        st.warning("📍 Your location looks outside the church grounds. This punch is recorded and flagged for the volunteer coordinator to review.")
+    elif punch_record['on_site'] is None:
+        st.caption("📍 Location unavailable, punch recorded without a site check")
+
 
 # Initialize session state for data storage
 if 'punch_data' not in st.session_state:
@@ -175,6 +149,9 @@ if 'punch_data' not in st.session_state:
 # Check for QR code parameters
 qr_action = st.query_params.get("action")
 
+# Request timing, emitted as a structured event when a punch is submitted
+punch_event = Event("punch", action={"punch_in": "In", "punch_out": "Out"}.get(qr_action), page="working_qr")
+
 if qr_action == "punch_in":
     # PUNCH IN INTERFACE
     # Add logo in corner
@@ -188,27 +165,32 @@ if qr_action == "punch_in":
     name = st.text_input("Full Name", placeholder="Enter your full name", key="punch_in_name")
     
     if name:
-        # Location verification (silent)
-        with st.spinner("🔍 Verifying your location..."):
-            coords = get_ip_location()
-        
+        # Location verification (silent): the phone's own coordinates, IP lookup only as a fallback
+        browser_coords = browser_location(key="punch_in_location")
+
         if st.button("🟢 PUNCH IN NOW", key="btn_punch_in"):
+            punch_event.mark("render")
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            with punch_event.phase("geolocation"):
+                coords = resolve_location(browser_coords)
             
             # Store in session state
             punch_record = {
                 'name': name,
                 'action': 'Punch In',
                 'timestamp': timestamp,
-                'location': coords.get('city', 'Unknown') if 'error' not in coords else 'Unknown'
+                **location_fields(coords)
             }
-            st.session_state.punch_data.append(punch_record)
+            with punch_event.phase("storage_write"):
+                st.session_state.punch_data.append(punch_record)
             
             st.success(f"🌟 Welcome {name}! You've successfully punched in at {timestamp}!")
+            show_geofence_result(punch_record)
             st.balloons()
             
             verse = random.choice(volunteer_verses)
             st.info(f"📖 {verse}")
+            punch_event.emit("saved", location_source=punch_record['location_source'], on_site=punch_record['on_site'])
                     
     else:
         st.info("👆 Please enter your name above to begin")
@@ -226,27 +208,32 @@ elif qr_action == "punch_out":
     name = st.text_input("Full Name", placeholder="Enter your full name", key="punch_out_name")
     
     if name:
-        # Location verification (silent)
-        with st.spinner("🔍 Verifying your location..."):
-            coords = get_ip_location()
-                
+        # Location verification (silent): the phone's own coordinates, IP lookup only as a fallback
+        browser_coords = browser_location(key="punch_out_location")
+
         if st.button("🔴 PUNCH OUT NOW", key="btn_punch_out"):
+            punch_event.mark("render")
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            with punch_event.phase("geolocation"):
+                coords = resolve_location(browser_coords)
             
             # Store in session state
             punch_record = {
                 'name': name,
                 'action': 'Punch Out',
                 'timestamp': timestamp,
-                'location': coords.get('city', 'Unknown') if 'error' not in coords else 'Unknown'
+                **location_fields(coords)
             }
-            st.session_state.punch_data.append(punch_record)
+            with punch_event.phase("storage_write"):
+                st.session_state.punch_data.append(punch_record)
             
             st.success(f"🎉 Great job, {name}! You've successfully punched out at {timestamp}!")
+            show_geofence_result(punch_record)
             st.balloons()
             
             verse = random.choice(volunteer_verses)
             st.info(f"📖 {verse}")
+            punch_event.emit("saved", location_source=punch_record['location_source'], on_site=punch_record['on_site'])
                     
     else:
         st.info("👆 Please enter your name above to begin")
@@ -260,4 +247,6 @@ else:
     if st.session_state.punch_data:
         st.markdown("### All Punch Records")
         for i, record in enumerate(st.session_state.punch_data, 1):
-            st.text(f"{i}. {record['name']} - {record['action']} - {record['timestamp']} ({record['location']})")
\ No newline at end of file
+            site = {True: "on site", False: "OFF SITE", None: "site unknown"}[record['on_site']]
+            coordinates = f", {float(record['latitude']):.5f}, {float(record['longitude']):.5f}" if record['on_site'] is not None else ""
+            st.text(f"{i}. {record['name']} - {record['action']} - {record['timestamp']} ({record['location']}{coordinates}, {site})")
\ No newline at end of file
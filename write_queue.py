@@ -0,0 +1,287 @@
+"""
+Write-behind queue for Google Sheets appends
+Rows are acknowledged right away and flushed in batches by a background thread.
+Process-wide queues keep their pending rows in the local SQLite journal, so
+nothing is lost when the process restarts before a flush.
+
+Delivery is at-least-once: if append_rows times out on our side after Google
+has already stored the batch, the retry writes those rows a second time.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+
+import metrics
+import sheets
+from journal import PUNCH, REGISTRATION, get_journal
+from ratelimit import call_sheets
+
+# Flush every FLUSH_INTERVAL_SECONDS or as soon as MAX_BATCH_ROWS rows are waiting
+FLUSH_INTERVAL_SECONDS = 0.5
+MAX_BATCH_ROWS = 50
+
+# In-memory queues refuse rows beyond MAX_PENDING_ROWS so the page can fall back to a manual record
+MAX_PENDING_ROWS = 1000
+
+# After a failed flush, wait this long before retrying (doubling up to MAX_BACKOFF_SECONDS)
+INITIAL_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+
+# A queue that has not flushed successfully for this long is reported as unhealthy
+STALE_ERROR_SECONDS = 60.0
+
+
+class WriteBehindQueue:
+    """Coalesce pending rows and write them to a worksheet with one append_rows call
+
+    With a journal, pending rows live in the journal under the queue name and
+    the synced watermark advances after each successful append_rows.
+    """
+
+    def __init__(self, get_worksheet, name="punch", on_error=None, journal=None, flush_interval=FLUSH_INTERVAL_SECONDS,
+                 max_batch=MAX_BATCH_ROWS, max_pending=MAX_PENDING_ROWS):
+        self.get_worksheet = get_worksheet
+        self.journal = journal
+        self.on_error = on_error
+        self.name = name
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+        # Flush statistics
+        self._flush_count = 0
+        self._flushed_rows = 0
+        self._failed_flushes = 0
+        self._total_flush_seconds = 0.0
+        self._last_flush_seconds = None
+        self._last_success_at = None
+        self._max_flush_seconds = 0.0
+        self._last_error = None
+        self._rejected_rows = 0
+
+        # Backoff state after failed flushes
+        self._backoff_seconds = 0.0
+        self._retry_at = 0.0
+        self._failing_since = None
+
+    def start(self):
+        """Start the background flusher if it is not running yet"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-write-behind", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, row):
+        """Queue a row for the next flush; False if the row could not be stored"""
+        with self._lock:
+            if self.journal is not None:
+                try:
+                    self.journal.append(self.name, row)
+                except Exception as e:
+                    self._rejected_rows += 1
+                    logging.error(f"Journal write failed ({self.name}): {str(e)}")
+                    return False
+            elif len(self._pending) >= self.max_pending:
+                self._rejected_rows += 1
+                return False
+            else:
+                self._pending.append(list(row))
+            depth = self._depth()
+        self.start()
+        if depth >= self.max_batch:
+            self._wakeup.set()
+        return True
+
+    def healthy(self):
+        """False when an in-memory queue has been failing to flush for longer than STALE_ERROR_SECONDS"""
+        with self._lock:
+            if self.journal is not None:
+                # Journaled rows are already durable and sync once Sheets recovers
+                return True
+            return self._failing_since is None or time.monotonic() - self._failing_since < STALE_ERROR_SECONDS
+
+    def flush(self, force=False):
+        """Write every pending row to the worksheet, returning how many were written
+
+        While backing off after a failure this is a no-op unless force is set, and a journaled
+        queue is a no-op while another process sharing the journal is syncing the same kind.
+        """
+        with self._flush_lock:
+            if self.journal is None:
+                return self._flush_batches(force)
+            with self.journal.sync_lock(self.name) as claimed:
+                if not claimed:
+                    return 0
+                return self._flush_batches(force)
+
+    def _flush_batches(self, force):
+        written = 0
+        while True:
+            with self._lock:
+                if not force and time.monotonic() < self._retry_at:
+                    break
+                batch, last_id = self._peek()
+                if not batch:
+                    break
+
+            worksheet = self.get_worksheet()
+            if worksheet is None:
+                break
+
+            started = time.perf_counter()
+            try:
+                call_sheets(worksheet.append_rows, batch, write=True)
+            except Exception as e:
+                # Rows stay queued and are retried once the backoff expires
+                with self._lock:
+                    self._failed_flushes += 1
+                    self._last_error = str(e)
+                    if self._failing_since is None:
+                        self._failing_since = time.monotonic()
+                    self._backoff_seconds = min(MAX_BACKOFF_SECONDS, max(INITIAL_BACKOFF_SECONDS, self._backoff_seconds * 2))
+                    self._retry_at = time.monotonic() + self._backoff_seconds
+                logging.error(f"Write-behind flush failed ({self.name}, {len(batch)} rows), "
+                              f"retrying in {self._backoff_seconds:.0f}s: {str(e)}")
+                if self.on_error is not None:
+                    self.on_error(e)
+                break
+            elapsed = time.perf_counter() - started
+
+            with self._lock:
+                if self.journal is not None:
+                    self.journal.mark_synced(self.name, last_id)
+                else:
+                    for _ in batch:
+                        self._pending.popleft()
+                self._flush_count += 1
+                self._flushed_rows += len(batch)
+                self._total_flush_seconds += elapsed
+                self._last_flush_seconds = elapsed
+                self._last_success_at = time.time()
+                self._max_flush_seconds = max(self._max_flush_seconds, elapsed)
+                self._last_error = None
+                self._failing_since = None
+                self._backoff_seconds = 0.0
+                self._retry_at = 0.0
+            written += len(batch)
+        return written
+
+    def close(self, timeout=10.0):
+        """Stop the background flusher and write whatever is still pending"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush(force=True)
+        remaining = self.depth()
+        if remaining and self.journal is not None:
+            logging.warning(f"Write-behind queue ({self.name}) closed with {remaining} rows left in the journal")
+        elif remaining:
+            logging.error(f"Write-behind queue ({self.name}) closed with {remaining} unsaved rows")
+
+    def depth(self):
+        """Number of rows waiting to be written"""
+        with self._lock:
+            return self._depth()
+
+    def _depth(self):
+        if self.journal is not None:
+            return self.journal.pending_count(self.name)
+        return len(self._pending)
+
+    def _peek(self):
+        """Next batch of pending rows plus the journal id of its last row"""
+        if self.journal is not None:
+            entries = self.journal.unsynced(self.name, self.max_batch)
+            return [row for _, row in entries], (entries[-1][0] if entries else None)
+        return [self._pending[i] for i in range(min(self.max_batch, len(self._pending)))], None
+
+    def stats(self):
+        """Queue depth and flush latency figures for health reporting"""
+        with self._lock:
+            avg = self._total_flush_seconds / self._flush_count if self._flush_count else None
+            return {
+                "queue_depth": self._depth(),
+                "flush_count": self._flush_count,
+                "flushed_rows": self._flushed_rows,
+                "failed_flushes": self._failed_flushes,
+                "rejected_rows": self._rejected_rows,
+                "last_flush_ms": round(self._last_flush_seconds * 1000, 1) if self._last_flush_seconds is not None else None,
+                "avg_flush_ms": round(avg * 1000, 1) if avg is not None else None,
+                "max_flush_ms": round(self._max_flush_seconds * 1000, 1),
+                "last_success_at": self._last_success_at,
+                "backoff_seconds": self._backoff_seconds,
+                "last_error": self._last_error
+            }
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+# Process-wide queues, shared by every Streamlit session in this server
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def _queue_depths():
+    with _queues_lock:
+        queues = list(_queues.values())
+    return {(queue.name,): queue.depth() for queue in queues}
+
+
+metrics.gauge("volunteer_write_queue_depth", "Rows waiting to be written to Google Sheets", _queue_depths, ("queue",))
+
+
+def get_queue(name, get_worksheet):
+    """Return the process-wide journal-backed queue for name, creating it on first use"""
+    with _queues_lock:
+        queue = _queues.get(name)
+        if queue is None:
+            queue = WriteBehindQueue(get_worksheet, name=name, on_error=sheets.handle_error, journal=get_journal())
+            _queues[name] = queue
+            # Replay rows a previous process journaled but never synced
+            if queue.depth():
+                queue.start()
+    return queue
+
+
+def queue_stats():
+    """stats() of the queues this process has already created, by name; never creates one"""
+    with _queues_lock:
+        queues = list(_queues.values())
+    return {queue.name: queue.stats() for queue in queues}
+
+
+def get_punch_queue():
+    """Return the process-wide queue for punch_sheet rows"""
+    return get_queue(PUNCH, sheets.get_punch_sheet)
+
+
+def get_registration_queue():
+    """Return the process-wide queue for reg_sheet rows"""
+    return get_queue(REGISTRATION, sheets.get_reg_sheet)
+
+
+def close_all():
+    """Flush and stop every queue (registered to run at interpreter shutdown)"""
+    with _queues_lock:
+        queues = list(_queues.values())
+    for queue in queues:
+        queue.close()
+
+
+atexit.register(close_all)